@@ -2,6 +2,12 @@ import os
 import re
 import pymel.core as pm
 import general as hjk
+from buildContext import batchBuild
+from connectionPlan import connectPairs
+from matrixConstraint import constrain, orientTo, aimTo
+from influencePrune import pruneSkins
+from jointFreeze import freezeJoints
+from fbxNormalize import NormalizePipeline
 
 
 class RawData:
@@ -163,22 +169,17 @@ class RawData:
             }
 
 
+    @batchBuild()
     def cleanUp(self):
         # null check
         sel = pm.ls(sl=True)
         if not sel:
             pm.warning("Please, select bodies.")
             return
-        # main flows
-        self.cutJntKeyframe()
-        unBindedJoints = self.unbindSkin(*sel)
-        self.deleteBlendShape(*sel)
-        self.deleteUselessJnt(*unBindedJoints)
-        self.resetRotation(*self.bindJnt)
-        self.unitChange()
-        # delete "RL_BoneRoot" joint
-        pm.parent(self.allJnt[1], w=True)
-        pm.delete(self.allJnt[0])
+        # main flows, each step only works on what it finds,
+        # so a clean scene is left as it is.
+        pipeline = NormalizePipeline(self.allJnt, self.delJnt, self.bindJnt)
+        return pipeline.run(sel)
 
 
     def cutJntKeyframe(self):
@@ -190,17 +191,17 @@ class RawData:
 
 
     def unbindSkin(self, *arg):
-        """ *arg must be mesh type. """
+        """ *arg must be mesh type.
+        The weights of delJnt go to their nearest kept parent joint,
+        and they are removed from each skinCluster at once.
+        Returns the joints removed from any mesh.
+         """
+        report = pruneSkins(arg, self.delJnt)
         result = []
-        for geo in arg:
-            skinClt = pm.listHistory(geo, type="skinCluster")
-            skinClt = skinClt[0]
-            try:
-                for jnt in self.delJnt:
-                    pm.skinCluster(skinClt, e=True, ri=jnt)
-                    result.append(jnt)
-            except:
-                continue
+        for geo, info in report.items():
+            if not info["skinCluster"]:
+                pm.warning(f"{geo} has no skinCluster.")
+            result += [i for i in info["removed"] if i not in result]
         return result
 
 
@@ -228,14 +229,8 @@ class RawData:
 
 
     def resetRotation(self, *arg):
-        xyz = ["X", "Y", "Z"]
-        for jnt in arg:
-            jnt = pm.PyNode(jnt)
-            rot = jnt.getRotation()
-            for i, r in zip(xyz, rot):
-                exists = pm.getAttr(f"{jnt}.jointOrient{i}")
-                pm.setAttr(f"{jnt}.jointOrient{i}", r + exists)
-                pm.setAttr(f"{jnt}.rotate{i}", 0)
+        """ Rotations go into the jointOrients, see freezeJoints. """
+        return freezeJoints(arg)
 
 
     def unitChange(self):
@@ -253,6 +248,7 @@ class RawData:
         pm.playbackOptions(min=0, max=120)
 
 
+    @batchBuild()
     def symmetryJoints(self):
         for i in self.bindJnt:
             if "_L" in i:
@@ -274,6 +270,7 @@ class CopyRigJoints:
         self.rigBonesGroup = "rigBones"
 
 
+    @batchBuild()
     def createGroup(self):
         fullPath = pm.Env().sceneName()
         try:
@@ -285,6 +282,7 @@ class CopyRigJoints:
         rg.createRigGroups(createGrpName)
 
 
+    @batchBuild()
     def copyHipsJoint(self):
         if not pm.objExists(self.srcRoot):
             return
@@ -299,6 +297,7 @@ class CopyRigJoints:
             pm.rename(i, new)
 
 
+    @batchBuild()
     def copyArmsJoint(self):
         for side in ["L", "R"]:
             for handle in ["IK", "FK"]:
@@ -328,6 +327,7 @@ class CopyRigJoints:
                     pass
 
 
+    @batchBuild()
     def copyLegsJoint(self):
         for side in ["L", "R"]:
             for handle in ["IK", "FK"]:
@@ -353,7 +353,9 @@ class CopyRigJoints:
 
 
 class RigArms:
-    def __init__(self):
+    def __init__(self, backend: str="constraint"):
+        """ backend is "constraint" or "matrix", see matrixConstraint. """
+        self.backend = backend
         # Left
         self.leftTopGroup = "cc_LeftArm_grp"
         self.leftScapulaJnt = "rig_L_Clavicle"
@@ -437,6 +439,7 @@ class RigArms:
         self.fkCtrlsSize = [11, 9, 7]
 
 
+    @batchBuild()
     def cleanUp(self):
         leftScapula = [self.leftScapulaCtrl, self.leftScapulaCtrlGrp]
         rightScapula = [self.rightScapulaCtrl, self.rightScapulaCtrlGrp]
@@ -452,6 +455,7 @@ class RigArms:
                 continue
 
 
+    @batchBuild()
     def rigArmsIK(self):
         if not all([pm.objExists(i) for i in self.leftIKJnts]):
             return
@@ -483,6 +487,7 @@ class RigArms:
             self.addArmsAttr(ccWrist)
 
 
+    @batchBuild()
     def rigArmsFK(self):
         if not all([pm.objExists(i) for i in self.leftFKJnts]):
             return
@@ -514,13 +519,14 @@ class RigArms:
                 ccGrp = hjk.groupingWithOwnPivot(cc)
                 ccGrp = ccGrp[0]
                 pm.rotate(ccGrp, [rot, 0, 0], r=True, os=True, fo=True)
-                pm.parentConstraint(cc, jnt, mo=True, w=1.0)
+                constrain(cc, jnt, "parent", self.backend)
                 fkGroups.append(ccGrp)
                 fkGroups.append(cc)
             hjk.parentHierarchically(*fkGroups)
             self.topGrouping(topGrp, ctrlsGrp[:1:])
 
 
+    @batchBuild()
     def rigScapula(self):
         if not pm.objExists(self.leftScapulaJnt):
             return
@@ -551,7 +557,7 @@ class RigArms:
             pm.rotate(ctrlsGrp, [rot, 0, 0], r=True, os=True, fo=True)
             pm.rotate(ccScapula, [0, 0, mirrorRot])
             pm.makeIdentity(ccScapula, a=True, t=0, r=1, s=0, jo=0, n=0, pn=1)
-            pm.parentConstraint(ccScapula, jnt, mo=True)
+            constrain(ccScapula, jnt, "parent", self.backend)
             nullGrp = pm.group(em=True, n=spaceGrp)
             pm.matchTransform(nullGrp, ccScapula, pos=True)
             pm.parent(nullGrp, ccScapula)
@@ -561,7 +567,7 @@ class RigArms:
         pm.rotate(controller, [0, 0, 90])
         pm.makeIdentity(controller, a=True, t=0, r=1, s=0, jo=0, n=0, pn=1)
         pm.matchTransform(controller, joint, pos=True)
-        pm.pointConstraint(controller, joint, mo=True)
+        constrain(controller, joint, "point", self.backend)
         hjk.groupingWithOwnPivot(controller)
 
 
@@ -587,7 +593,7 @@ class RigArms:
         ctrlGrp = ctrlGrp[0]
         # rot = 0 if side=="Left" else 180
         # pm.rotate(ctrlGrp, [rot, 0, 0], r=True, os=True, fo=True)
-        pm.orientConstraint(ctrl, joint, mo=True, w=1)
+        constrain(ctrl, joint, "orient", self.backend)
         try:
             pm.parent(ikHandle, ctrl)
             pm.setAttr(f"{ikHandle}.visibility", 0)
@@ -627,7 +633,9 @@ class RigArms:
 
 
 class RigLegs:
-    def __init__(self):
+    def __init__(self, backend: str="constraint"):
+        """ backend is "constraint" or "matrix", see matrixConstraint. """
+        self.backend = backend
         # Left
         self.leftTopGroup = "cc_LeftLeg_grp"
         self.leftFootJnt = "rig_L_Foot_IK"
@@ -738,6 +746,7 @@ class RigLegs:
             ]
 
 
+    @batchBuild()
     def cleanUp(self):
         leftArms = self.leftIKCtrls + self.leftIKCtrlsGrp
         leftArms += self.leftFKCtrls + self.leftFKCtrlsGrp
@@ -753,6 +762,7 @@ class RigLegs:
                 continue
 
 
+    @batchBuild()
     def createLocators(self):
         locators = [self.leftLocators, self.rightLocators]
         for loc in locators:
@@ -761,6 +771,7 @@ class RigLegs:
                 pm.move(loc, pos)
 
 
+    @batchBuild()
     def rigLegsIK(self):
         ikJoints = [self.leftIKJnts, self.rightIKJnts]
         for jnts in ikJoints:
@@ -817,6 +828,7 @@ class RigLegs:
             self.connectLegsAttr(ccFoot, connAttrs, mirrorConstant)
 
 
+    @batchBuild()
     def rigLegsFK(self):
         if not all([pm.objExists(i) for i in self.leftFKJnts]):
             return
@@ -848,7 +860,7 @@ class RigLegs:
                 ccGrp = hjk.groupingWithOwnPivot(cc)
                 ccGrp = ccGrp[0]
                 pm.rotate(ccGrp, [rot, 0, 0], r=True, os=True, fo=True)
-                pm.parentConstraint(cc, jnt, mo=True, w=1.0)
+                constrain(cc, jnt, "parent", self.backend)
                 fkGroups.append(ccGrp)
                 fkGroups.append(cc)
             hjk.parentHierarchically(*fkGroups)
@@ -859,7 +871,7 @@ class RigLegs:
         pm.rotate(controller, [0, 0, mirrorConstant*(-90)])
         pm.makeIdentity(controller, a=True, t=0, r=1, s=0, jo=0, n=0, pn=1)
         pm.matchTransform(controller, joint, pos=True)
-        pm.pointConstraint(controller, joint, mo=True)
+        constrain(controller, joint, "point", self.backend)
         hjk.groupingWithOwnPivot(controller)
 
 
@@ -886,8 +898,7 @@ class RigLegs:
         alo.lineUp(*temp)
         pm.matchTransform(ballLoc, ballJnt, pos=True)
         pm.matchTransform(ankleLoc, ankleJnt, pos=True)
-        pm.aimConstraint(ankleJnt, ballLoc, aim=(0, 0, -1))
-        pm.delete(ballLoc, cn=True)
+        aimTo(ballLoc, ankleJnt, aim=(0, 0, -1))
         # grouping
         mergeList = [ctrl] + locs
         hjk.parentHierarchically(*mergeList)
@@ -998,7 +1009,9 @@ class RigLegs:
 
 
 class RigFingers:
-    def __init__(self):
+    def __init__(self, backend: str="constraint"):
+        """ backend is "constraint" or "matrix", see matrixConstraint. """
+        self.backend = backend
         self.leftTopGroup = "cc_LeftHandFingers_grp"
         self.rightTopGroup = "cc_RightHandFingers_grp"
         self.leftFingerJnts = [
@@ -1085,6 +1098,7 @@ class RigFingers:
             ]
 
 
+    @batchBuild()
     def cleanUp(self):
         leftArms = self.leftCtrls + self.leftCtrlsGrp + [self.leftTopGroup]
         rightArms = self.rightCtrls + self.rightCtrlsGrp + [self.rightTopGroup]
@@ -1096,6 +1110,7 @@ class RigFingers:
                 continue
 
 
+    @batchBuild()
     def rigFingers(self):
         fingerJnt = [self.leftFingerJnts, self.rightFingerJnts]
         for jnts in fingerJnt:
@@ -1123,15 +1138,14 @@ class RigFingers:
                 cc = pm.circle(ch=False, r=size, nr=(1, 0, 0), n=ctrl)
                 cc = cc[0]
                 pm.matchTransform(cc, jnt, pos=True)
-                pm.orientConstraint(jnt, cc, o=(0, 0, 90), w=1)
-                pm.delete(cc, cn=True)
+                orientTo(cc, jnt, offset=(0, 0, 90))
                 ccGrp = hjk.groupingWithOwnPivot(cc)[0]
                 pm.rotate(ccGrp, [rot, 0, 0], r=True, os=True, fo=True)
-                pm.parentConstraint(cc, jnt, mo=True, w=1.0)
+                constrain(cc, jnt, "parent", self.backend)
                 fingerGrp.append(ccGrp)
                 fingerGrp.append(cc)
             for i in range(0, len(fingerGrp), 6):
-                hjk.parentHierarchically(fingerGrp[i:i+6])
+                hjk.parentHierarchically(*fingerGrp[i:i+6])
                 pm.parent(fingerGrp[i], topGrp)
 
 
@@ -1211,15 +1225,11 @@ class Finish:
         self.lock_sclVis += leftFingers + rightFingers
 
 
+    @batchBuild()
     def connectJntAndJnt(self):
         raw = RawData()
-        for cc in raw.bindJnt[1:]:
-            rig = cc.replace("CC_Base_", "rig_")
-            try:
-                pm.connectAttr(f"{rig}.translate", f"{cc}.translate", f=True)
-                pm.connectAttr(f"{rig}.rotate", f"{cc}.rotate", f=True)
-            except:
-                continue
+        pairs = [(cc.replace("CC_Base_", "rig_"), cc) for cc in raw.bindJnt[1:]]
+        connectPairs(pairs, ["translate", "rotate"])
 
 
 # rd = RawData()
@@ -0,0 +1,221 @@
+""" Benchmarks of the rig tools on the in-memory scene of fakeScene.
+
+Each workload reports the wall time and how many scene commands it made.
+The counts don't depend on the machine, so they can be compared
+across commits. Latency adds a fixed cost per command,
+to see how an algorithm behaves when every call is as slow as in Maya.
+
+>>> import benchmarkSuite
+>>> result = benchmarkSuite.runSuite(latency=20e-6, output="bench.json")
+>>> benchmarkSuite.compareResults("before.json", "bench.json")
+"""
+import os
+import sys
+import json
+import time
+import random
+import platform
+import subprocess
+import fakeScene
+
+
+def gitCommit() -> str:
+    folder = os.path.dirname(os.path.abspath(__file__))
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], \
+            cwd=folder, capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except:
+        return ""
+
+
+def randomTransform(node, spread: float=50.0) -> None:
+    fakeScene.xform(node, t=[random.uniform(-spread, spread) for _ in "xyz"])
+    fakeScene.rotate(node, [random.uniform(-90, 90) for _ in "xyz"])
+
+
+def setupMirrorCopy(numberOfObjects: int=500) -> list:
+    result = []
+    for i in range(numberOfObjects):
+        ctrl = fakeScene.circle(n=f"cc_Left{i}", nr=(1, 0, 0))[0]
+        randomTransform(ctrl)
+        result.append(ctrl)
+    return result
+
+
+def workMirrorCopy(objects: list) -> None:
+    import general
+    for i in objects:
+        general.mirrorCopy(i)
+
+
+def setupMixamo():
+    import quickRig
+    return quickRig.MixamoCharacter()
+
+
+def workMixamo(character) -> None:
+    character.createBones()
+    character.createRig_All()
+
+
+def setupRename(numberOfNodes: int=10000) -> None:
+    for i in range(numberOfNodes):
+        fakeScene.group(em=True, n=f"asset_old_{i}")
+    fakeScene.select("asset_old_*")
+
+
+def workRename(arg=None) -> None:
+    import rename
+    rename.Rename().changeWords("old", "new")
+
+
+class PaintData:
+    """ Stands in for VertexSelector, only the json part is needed. """
+    def __init__(self, data: dict):
+        self.data = data
+
+
+    def getJsonFilePath(self) -> str:
+        return "vertexForSkinWeight.json"
+
+
+    def loadJsonFile(self, fullPath) -> dict:
+        return self.data
+
+
+def setupPaint(divisions: int=100, numberOfJoints: int=4) -> PaintData:
+    """ A plane of (divisions + 1) ** 2 vertices,
+    each joint paints one band of it.
+     """
+    plane = fakeScene.polyPlane(n="paintPlane", sx=divisions, sy=divisions)[0]
+    joints = []
+    for i in range(numberOfJoints):
+        fakeScene.select(cl=True)
+        joints.append(fakeScene.joint(p=(0, 0, i), n=f"paint_jnt{i}"))
+    fakeScene.skinCluster(joints, plane)
+    count = (divisions + 1) ** 2
+    band = count // numberOfJoints
+    data = {}
+    for idx, jnt in enumerate(joints):
+        vertices = range(idx * band, min(count, (idx + 1) * band))
+        data[jnt.name()] = {plane.name(): [f".vtx[{i}]" for i in vertices]}
+    return PaintData(data)
+
+
+def workPaint(paintData: PaintData) -> None:
+    import vertexSelector
+    vertexSelector.VertexSelector.paintAllWeightsOne(paintData)
+
+
+def setupPrune(numberOfVertices: int=2000) -> tuple:
+    """ A CC character, and the joints accuRig removes. """
+    import influencePrune
+    from accuRig import RawData
+    raw = RawData()
+    return influencePrune.characterScene(raw.allJnt, numberOfVertices), \
+        raw.delJnt
+
+
+def workPrunePerJoint(arg: tuple) -> None:
+    import influencePrune
+    influencePrune.removePerJoint(*arg)
+
+
+def workPrune(arg: tuple) -> None:
+    import influencePrune
+    influencePrune.pruneSkins(*arg)
+
+
+WORKLOADS = {
+    "mirrorCopy_500": (setupMirrorCopy, workMirrorCopy),
+    "mixamo_build": (setupMixamo, workMixamo),
+    "rename_10k": (setupRename, workRename),
+    "paintWeights": (setupPaint, workPaint),
+    "prune_perJoint": (setupPrune, workPrunePerJoint),
+    "prune_onePass": (setupPrune, workPrune),
+    }
+
+
+def runWorkload(name: str, seed: int=0) -> dict:
+    """ Setup runs in a new scene and is not measured. """
+    setup, work = WORKLOADS[name]
+    random.seed(seed)
+    fakeScene.newScene()
+    arg = setup()
+    fakeScene.STATS.reset()
+    timer = time.perf_counter()
+    work(arg)
+    seconds = time.perf_counter() - timer
+    counts = dict(fakeScene.STATS.counts.most_common())
+    result = {
+        "seconds": round(seconds, 4),
+        "commands": fakeScene.STATS.total(),
+        "counts": counts,
+        "nodes": len(fakeScene.SCENE.nodes),
+        }
+    return result
+
+
+def runSuite(latency: float=0.0, workloads: list=[], output: str="", \
+             latencies: dict={}) -> dict:
+    """ Runs the workloads and writes the result to output as json.
+    latency is the seconds added to every command,
+    latencies sets it per command, like {"skinPercent": 1e-4}.
+     """
+    fakeScene.install(latency, latencies)
+    names = workloads if workloads else list(WORKLOADS.keys())
+    result = {
+        "commit": gitCommit(),
+        "python": platform.python_version(),
+        "latency": latency,
+        "latencies": latencies,
+        "workloads": {},
+        }
+    for name in names:
+        result["workloads"][name] = runWorkload(name)
+        data = result["workloads"][name]
+        print(f"{name:<16}{data['seconds']:>10.4f}s{data['commands']:>10} cmds")
+    if output:
+        with open(output, "w") as txt:
+            json.dump(result, txt, indent=4)
+    return result
+
+
+def compareResults(before, after) -> dict:
+    """ before and after are results or paths of the json files.
+    Returns the ratio of after to before per workload,
+    and the commands whose count changed.
+     """
+    data = []
+    for i in [before, after]:
+        if isinstance(i, str):
+            with open(i, "r") as txt:
+                i = json.load(txt)
+        data.append(i)
+    before, after = data
+    result = {}
+    for name, new in after["workloads"].items():
+        old = before["workloads"].get(name)
+        if not old:
+            continue
+        counts = {}
+        for cmd in set(old["counts"]) | set(new["counts"]):
+            a = old["counts"].get(cmd, 0)
+            b = new["counts"].get(cmd, 0)
+            if a != b:
+                counts[cmd] = (a, b)
+        result[name] = {
+            "seconds": (old["seconds"], new["seconds"]),
+            "speedup": round(old["seconds"] / max(new["seconds"], 1e-9), 2),
+            "commands": (old["commands"], new["commands"]),
+            "counts": counts,
+            }
+        print(name, before["commit"], "->", after["commit"], result[name])
+    return result
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    output = sys.argv[2] if len(sys.argv) > 2 else ""
+    runSuite(latency, output=output)
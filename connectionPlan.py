@@ -0,0 +1,283 @@
+import time
+import pymel.core as pm
+
+
+CHANNELS = {
+    "t": "translate",
+    "r": "rotate",
+    "s": "scale",
+    "v": "visibility"
+    }
+
+
+def channelsOf(t=False, r=False, s=False, v=False) -> list:
+    """ The same options as quickRig.connectAttributes.
+    >>> channelsOf(t=True, r=True)
+    >>> ['translate', 'rotate']
+     """
+    flags = {"t": t, "r": r, "s": s, "v": v}
+    result = [CHANNELS[k] for k, on in flags.items() if on]
+    return result
+
+
+BACKENDS = ["cmds", "modifier"]
+
+
+class ConnectionPlan:
+    def __init__(self, backend: str="cmds"):
+        """ Collects (source plug, destination plug) pairs,
+        checks them all before anything changes, and applies them.
+        backend="cmds" connects with maya.cmds, so Ctrl+Z undoes it.
+        backend="modifier" applies everything with one MDGModifier.
+        It is faster, but it is not on the undo queue,
+        only plan.undo() undoes it.
+        >>> plan = ConnectionPlan()
+        >>> for jnt in joints:
+        >>>     plan.add(jnt.replace("jnt_", "fbx_"), jnt, ["translate"])
+        >>> plan.connect()
+        >>> plan.undo()
+         """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend is one of {BACKENDS}: {backend}")
+        self.backend = backend
+        self.pairs = []
+        self.failures = {}
+        self.plugs = {}
+        self.applied = []
+        self.modifier = None
+
+
+    def add(self, source, destination, attrs: list=[]):
+        """ With attrs, the same attributes of two objects are paired.
+        Without attrs, source and destination are plugs.
+        >>> plan.add("rig_Hips", "jnt_Hips", ["translate", "rotate"])
+        >>> plan.add("cc_IKFK.LArm_IK0FK1", "blendColors1.blender")
+         """
+        if attrs:
+            pairs = [(f"{source}.{i}", f"{destination}.{i}") for i in attrs]
+        else:
+            pairs = [(str(source), str(destination))]
+        self.pairs += pairs
+        return self
+
+
+    def validate(self) -> dict:
+        """ Look up every plug once.
+        Returns the failed pairs, {"src -> dst": reason}.
+         """
+        import maya.api.OpenMaya as om2
+        self.failures = {}
+        self.plugs = {}
+        missing = set()
+        for pair in self.pairs:
+            for plug in pair:
+                if plug in self.plugs or plug in missing:
+                    continue
+                try:
+                    sel = om2.MSelectionList()
+                    sel.add(plug)
+                    self.plugs[plug] = sel.getPlug(0)
+                except:
+                    missing.add(plug)
+        for src, dst in self.pairs:
+            lost = [i for i in (src, dst) if i in missing]
+            if lost:
+                self.failures[f"{src} -> {dst}"] = f"Not found: {lost}"
+        return self.failures
+
+
+    def valid(self) -> list:
+        result = []
+        for src, dst in self.pairs:
+            if f"{src} -> {dst}" in self.failures:
+                continue
+            result.append((self.plugs[src], self.plugs[dst]))
+        return result
+
+
+    def connect(self, force: bool=True, dryRun: bool=False) -> dict:
+        """ Connect all valid pairs in one step.
+        With force, a destination connected to another source
+        is disconnected first, like connectAttr -f.
+        So are the children of a compound destination,
+        translateX of translate for example.
+        dryRun validates and reports without changing the scene.
+         """
+        self.validate()
+        ops = []
+        done = []
+        skipped = []
+        for srcPlug, dstPlug in self.valid():
+            src, dst = srcPlug.name(), dstPlug.name()
+            if dstPlug.isDestination and dstPlug.source().name() == src:
+                skipped.append(f"{src} -> {dst}")
+                continue
+            inputs = incoming(dstPlug)
+            if inputs and not force:
+                names = [i[0].name() for i in inputs]
+                self.failures[f"{src} -> {dst}"] = f"Connected from {names}"
+                continue
+            ops += [("disconnect", i, j) for i, j in inputs]
+            ops.append(("connect", srcPlug, dstPlug))
+            done.append(f"{src} -> {dst}")
+        return self.finish(ops, done, skipped, dryRun)
+
+
+    def disconnect(self, dryRun: bool=False) -> dict:
+        """ Break the pairs that are connected. """
+        self.validate()
+        ops = []
+        done = []
+        skipped = []
+        for srcPlug, dstPlug in self.valid():
+            src, dst = srcPlug.name(), dstPlug.name()
+            isConnected = dstPlug.isDestination
+            if not isConnected or dstPlug.source().name() != src:
+                skipped.append(f"{src} -> {dst}")
+                continue
+            ops.append(("disconnect", srcPlug, dstPlug))
+            done.append(f"{src} -> {dst}")
+        return self.finish(ops, done, skipped, dryRun)
+
+
+    def finish(self, ops: list, done: list, skipped: list, \
+               dryRun: bool) -> dict:
+        if not dryRun and ops:
+            self.apply(ops)
+        result = {
+            "done": done,
+            "skipped": skipped,
+            "failed": dict(self.failures),
+            "dryRun": dryRun
+            }
+        return result
+
+
+    def apply(self, ops: list) -> None:
+        """ ops are ("connect" or "disconnect", source, destination). """
+        if self.backend == "cmds":
+            applyCommands(ops)
+            self.modifier = None
+        else:
+            self.modifier = applyModifier(ops)
+        self.applied = ops
+
+
+    def undo(self) -> None:
+        """ Undoes the last connect or disconnect of this plan.
+        With backend="cmds", Ctrl+Z does the same.
+         """
+        if self.modifier:
+            self.modifier.undoIt()
+        elif self.applied:
+            inverse = {"connect": "disconnect", "disconnect": "connect"}
+            ops = [(inverse[i], j, k) for i, j, k in reversed(self.applied)]
+            applyCommands(ops)
+        self.modifier = None
+        self.applied = []
+
+
+def incoming(plug) -> list:
+    """ (source, destination) connected to plug,
+    or to its children if it is a compound.
+     """
+    result = []
+    if plug.isDestination:
+        result.append((plug.source(), plug))
+    if plug.isCompound:
+        for i in range(plug.numChildren()):
+            child = plug.child(i)
+            if child.isDestination:
+                result.append((child.source(), child))
+    return result
+
+
+def applyCommands(ops: list) -> None:
+    import maya.cmds as cmds
+    for kind, src, dst in ops:
+        if kind == "connect":
+            cmds.connectAttr(src.name(), dst.name())
+        else:
+            cmds.disconnectAttr(src.name(), dst.name())
+
+
+def applyModifier(ops: list):
+    import maya.api.OpenMaya as om2
+    mod = om2.MDGModifier()
+    for kind, src, dst in ops:
+        if kind == "connect":
+            mod.connect(src, dst)
+        else:
+            mod.disconnect(src, dst)
+    mod.doIt()
+    return mod
+
+
+def report(result: dict) -> dict:
+    failed = result["failed"]
+    if failed:
+        pm.warning("List of failures: ", failed)
+    else:
+        verb = "Planned" if result["dryRun"] else "Done"
+        pm.displayInfo(f"{verb}: {len(result['done'])}, " \
+            f"skipped: {len(result['skipped'])}.")
+    return result
+
+
+def connectPairs(pairs: list, attrs: list=[], force: bool=True, \
+                 dryRun: bool=False, disconnect: bool=False, \
+                 backend: str="cmds") -> dict:
+    """ pairs = [(source, destination), ...]
+    >>> connectPairs([("rig_Hips", "jnt_Hips")], ["translate", "rotate"])
+    >>> {'done': [...], 'skipped': [], 'failed': {}, 'dryRun': False}
+     """
+    plan = ConnectionPlan(backend)
+    for src, dst in pairs:
+        plan.add(src, dst, attrs)
+    if disconnect:
+        result = plan.disconnect(dryRun)
+    else:
+        result = plan.connect(force, dryRun)
+    return report(result)
+
+
+def benchmarkConnections(numberOfJoints: int=300, \
+                         attrs: list=["translate", "rotate", "scale"]) -> dict:
+    """ Wire rig joints to bind joints,
+    with connectAttr per channel and with a ConnectionPlan
+    of each backend.
+    Runs in Maya, or outside of it after fakeScene.install().
+    >>> benchmarkConnections()
+    >>> {'connectAttr': 0.61, 'validate': 0.01, 'cmds': 0.3, \\
+    >>>     'modifier': 0.05}
+     """
+    for prefix in ["rig_", "jnt_"]:
+        pm.select(cl=True)
+        for i in range(numberOfJoints):
+            if not pm.objExists(f"{prefix}bench{i}"):
+                pm.joint(p=(0, i, 0), n=f"{prefix}bench{i}")
+    rigs = [f"rig_bench{i}" for i in range(numberOfJoints)]
+    result = {}
+    timer = time.perf_counter()
+    for rig in rigs:
+        jnt = rig.replace("rig_", "jnt_")
+        for i in attrs:
+            try:
+                pm.connectAttr(f"{rig}.{i}", f"{jnt}.{i}", f=True)
+            except:
+                continue
+    result["connectAttr"] = time.perf_counter() - timer
+    for backend in BACKENDS:
+        plan = ConnectionPlan(backend)
+        for rig in rigs:
+            plan.add(rig, rig.replace("rig_", "jnt_"), attrs)
+        plan.disconnect()
+        timer = time.perf_counter()
+        plan.validate()
+        result["validate"] = time.perf_counter() - timer
+        timer = time.perf_counter()
+        plan.connect()
+        result[backend] = time.perf_counter() - timer
+    pm.delete(rigs[0], rigs[0].replace("rig_", "jnt_"))
+    print(result)
+    return result
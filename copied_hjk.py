@@ -4,11 +4,16 @@ import json
 import shutil
 import math
 import sympy
+import numpy as np
 import functools
 import maya.OpenMaya as om
 import pymel.core as pm
 import maya.mel as mel
-import pathlib
+from versionIndex import versionIndex
+from exprCompiler import expressionToNodes, expressionsToNodes
+from curveShape import readCVs, matchCurveShapes
+from frameMath import aimMatrix, threePointFrame, composeMatrix
+from selectionCapture import captureRanges
 
 
 class Han:
@@ -548,21 +553,14 @@ class MatchPivot:
 
     # Decide the direction.
     # Input is a list of 3 points.
-    def select3Points(self, sel: list) -> str:
-        # shp: shape
-        shp = sel[0].split('.')[0]
-        # Object's name
-        obj = pm.listRelatives(shp, p=True)
-        obj = obj[0]
-        # pPlane's name
-        pPlane = pm.polyPlane(sx=1, sy=1, ax=(0, 1, 0), cuv=2, ch=False)
-        pPlane = pPlane[0]
-        vtx = pm.ls(f"{pPlane}.vtx[0:2]", fl=True)
-        all = vtx + sel
-        pm.select(all)
-        mel.eval("snap3PointsTo3Points(0);")
-        pm.select(cl=True)
-        return pPlane
+    # Returns the matrix a unit polyPlane gets from snap3PointsTo3Points.
+    def select3Points(self, sel: list) -> list:
+        p0, p1, p2 = [pm.pointPosition(i) for i in sel]
+        rot = threePointFrame(p0, p1, p2)
+        # The plane's vtx[0] is at (-0.5, 0, 0.5) from its pivot.
+        pos = np.add(p0, np.array([0.5, 0, -0.5]) @ rot)
+        result = composeMatrix(rot, pos).ravel().tolist()
+        return result
 
     
     def main(self) -> None:
@@ -571,47 +569,34 @@ class MatchPivot:
         if not chk:
             pass
         else:
-            obj = self.select3Points(sel)
+            matrix = self.select3Points(sel)
             loc = pm.spaceLocator()
-            pm.matchTransform(loc, obj, pos=True, rot=True)
-            pm.delete(obj)
+            pm.xform(loc, m=matrix, ws=True)
 
 
 class MatchCuvShp:
-    def __init__(self):
+    def __init__(self, space: str="world"):
         """ Match the curve shape from A to B.
-        Select only nurbsCurves. """
+        Select only nurbsCurves.
+        space is "world" or "object". """
+        self.space = space
         self.main()
 
 
     # Number of Object's cv.
     def numberOfCV(self, obj: str) -> int:
-        cv = f'{obj}.cv[0:]'
-        pm.select(cv)
-        cvSel = pm.ls(sl=True, fl=True)
-        cvNum = len(cvSel)
-        result = cvNum
-        pm.select(cl=True)
+        result = len(readCVs([obj])[str(obj)]["points"])
         return result
 
         
     # Match the point to point.
     # Change the shape of the curve controller from A to B
+    # Curves with a different number of cvs get B resampled.
     def matchShape(self, obj: list) -> list:
         A_list = obj[0:-1]
         B = obj[-1] # The last selection is Base.
-        numB = self.numberOfCV(B) # number of B.cv
-        failed = []
-        for A in A_list:
-            numA = self.numberOfCV(A)
-            if numA == numB > 0:
-                for k in range(numA):
-                    cvA = f'{A}.cv[{k}]'
-                    cvB = f'{B}.cv[{k}]'
-                    p1, p2, p3 = pm.pointPosition(cvB)
-                    pm.move(p1, p2, p3, cvA, a=True)
-            else:
-                failed.append(A)
+        result = matchCurveShapes(B, A_list, self.space)
+        failed = result["failed"]
         return failed
 
 
@@ -825,21 +810,13 @@ class VertexSeletor:
 
 
     def vertexNum(self) -> dict:
-        """ Make a list of vertex numbers only. """
-        sel = pm.ls(sl=True)
-        obj = pm.ls(sel, o=True)
-        shapes = set(obj)
+        """ Make a list of vertex, edge and face numbers only,
+        each mesh gets its own.
+         """
         result = {}
-        for shp in shapes:
-            com = re.compile(f'(?<={shp}).+[0-9]+:*[0-9]*.+')
-            vtxNum = []
-            for j in sel:
-                try:
-                    tmp = com.search(j.name())
-                    vtxNum.append(tmp.group(0))
-                except:
-                    continue
-            result[shp.getParent().name()] = vtxNum
+        for kind in ["vtx", "e", "f"]:
+            for mesh, ranges in captureRanges(kind).items():
+                result.setdefault(mesh, []).extend(ranges)
         return result
 
 
@@ -913,22 +890,19 @@ class LineConnect:
                 pos = pm.xform(i, q=1, ws=1, rp=1)
                 tmp.append(pos)
             aPos, oPos = tmp
-        cuv = pm.curve(d=1, p=[aPos, oPos], n=self.name)
-        sPiv = f"{cuv}.scalePivot"
-        rPiv = f"{cuv}.rotatePivot"
+        # The start locator aims at the end, the line is built in its space.
+        direction = np.subtract(oPos, aPos)
+        length = np.linalg.norm(direction)
+        matrix = composeMatrix(aimMatrix(direction), aPos)
+        matrix = matrix.ravel().tolist()
+        points = [(length * i / 3, 0, 0) for i in range(4)]
+        cuv = pm.curve(d=1, p=points, n=self.name)
+        pm.xform(cuv, m=matrix, ws=True)
         aLoc = pm.spaceLocator(n=f"{cuv}_startLoc")
         oLoc = pm.spaceLocator(n=f"{cuv}_endLoc")
-        a1, a2, a3 = aPos
+        pm.xform(aLoc, m=matrix, ws=True)
         o1, o2, o3 = oPos
-        pm.move(a1, a2, a3, aLoc, r=True)
         pm.move(o1, o2, o3, oLoc, r=True)
-        pm.move(a1, a2, a3, sPiv, rPiv, rpr=True)
-        pm.aimConstraint(oLoc, aLoc)
-        pm.delete(aLoc, cn=True)
-        pm.parent(cuv, aLoc)
-        pm.makeIdentity(cuv, a=True, t=1, r=1, s=1, n=0, pn=1)
-        pm.parent(cuv, w=True)
-        pm.rebuildCurve(cuv, d=1, ch=0, s=3, rpo=1, end=1, kr=0, kt=0)
         pm.xform(cuv, cpc=True)
         return cuv, aLoc, oLoc
 
@@ -952,7 +926,8 @@ class LineConnect:
         expr += "float $D = `mag<<$dX-$uX, $dY-$uY, $dZ-$uZ>>`;" + BR
         expr += f"{cuv}.Distance = $D;" + BR
         expr += f"{cuv}.Ratio = $D / {cuvLen};"
-        pm.expression(s=expr, o='', ae=1, uc='all')
+        # The same arithmetic as utility nodes, without the expression.
+        expressionToNodes(expr, f"{cuv}_distance")
 
 
     # create group
@@ -1050,15 +1025,24 @@ class Colors:
 
 
 class SolariBoard:
-    def __init__(self):
+    def __init__(self, ctrl: str="", cards: list=[], useNodes: bool=False):
         """ A Class to create a solariBoard. 
         Select the cards in order and call this function. 
         Enter the <name of the controller> in the "input() window". 
         The number of cards must be 5 or more. 
         Use setRange node, plusMinusEverage node and expression. 
         Cards turned upside down can be problematic.
+        With useNodes=True, the visibility expressions are 
+        compiled to condition nodes, all cards at once.
+        Those that only set the visibility inside 'if' stay MEL, 
+        because they hold the last value.
+        If ctrl and cards are given, input() is not used.
          """
-        self.main()
+        self.useNodes = useNodes
+        if ctrl and cards:
+            self.build([pm.PyNode(ctrl)], [pm.PyNode(i) for i in cards])
+        else:
+            self.main()
 
 
     # main Function
@@ -1067,9 +1051,13 @@ class SolariBoard:
         if not ctrlName:
             print("No Controllers.")
             return
+        sel = pm.ls(sl=True)
+        self.build(ctrlName, sel)
+
+
+    def build(self, ctrlName: list, sel: list) -> None:
         self.createChannel(ctrlName)
         ctrl = ctrlName[0]
-        sel = pm.ls(sl=True)
         num = len(sel)
         if num < 5:
             print("The minimum number must be 5 or more.")
@@ -1129,31 +1117,20 @@ class SolariBoard:
     def setRangeNodes(self, num: int) -> list:
         """ Create a setRange node. 
         The end of the setRange node is unusual.
+        X, Y and Z of max, oldMin and oldMax go in one setAttr each.
           """
         result = []
         for i in range(num):
             tmp = pm.shadingNode("setRange", au=True)
             if i != (num - 1):
-                pm.setAttr(f"{tmp}.maxX", 180)
-                pm.setAttr(f"{tmp}.maxY", 180)
-                pm.setAttr(f"{tmp}.maxZ", 180)
-                pm.setAttr(f"{tmp}.oldMinX", i)
-                pm.setAttr(f"{tmp}.oldMinY", i + 1)
-                pm.setAttr(f"{tmp}.oldMinZ", i + 2)
-                pm.setAttr(f"{tmp}.oldMaxX", i + 1)
-                pm.setAttr(f"{tmp}.oldMaxY", i + 2)
-                pm.setAttr(f"{tmp}.oldMaxZ", i + 3)
+                pm.setAttr(f"{tmp}.max", 180, 180, 180)
+                pm.setAttr(f"{tmp}.oldMin", i, i + 1, i + 2)
+                pm.setAttr(f"{tmp}.oldMax", i + 1, i + 2, i + 3)
             else:
                 pm.setAttr(f"{tmp}.minX", 180)
-                pm.setAttr(f"{tmp}.maxX", 360)
-                pm.setAttr(f"{tmp}.maxY", 180)
-                pm.setAttr(f"{tmp}.maxZ", 180)
-                pm.setAttr(f"{tmp}.oldMinX", i)
-                pm.setAttr(f"{tmp}.oldMinY", 0)
-                pm.setAttr(f"{tmp}.oldMinZ", 1)
-                pm.setAttr(f"{tmp}.oldMaxX", i + 1)
-                pm.setAttr(f"{tmp}.oldMaxY", 1)
-                pm.setAttr(f"{tmp}.oldMaxZ", 2)
+                pm.setAttr(f"{tmp}.max", 360, 180, 180)
+                pm.setAttr(f"{tmp}.oldMin", i, 0, 1)
+                pm.setAttr(f"{tmp}.oldMax", i + 1, 1, 2)
             result.append(tmp)
         return result
 
@@ -1184,6 +1161,7 @@ class SolariBoard:
         _2nd = sel[1]
         _end = sel[-2]
         last = sel[-1]
+        sources = {}
         for j, k in enumerate(sel):
             rotX = "rotateX"
             vis = "visibility"
@@ -1213,7 +1191,14 @@ class SolariBoard:
                 expr += f"if (({sel[j-1]}.{rotX} > 0) && "
                 expr += f"({sel[j-1]}.{rotX} < 360)) {k}.{vis} = 1;\n"
                 expr += f"if ({sel[j+1]}.{rotX} == 180) {k}.{vis} = 0;\n"
-            pm.expression(s=expr, o='', ae=1, uc='all')
+            sources[f"{k}_visibility"] = expr
+        rejected = list(sources)
+        if self.useNodes:
+            values = [0, 180, 360, 540]
+            rejected = expressionsToNodes(sources, values)[1]
+        # An 'if' without 'else' holds the last value, only MEL can.
+        for i in rejected:
+            pm.expression(s=sources[i], o='', ae=1, uc='all')
 
 
 def createCuv_thruPoint(startFrame: int, endFrame: int) -> list:
@@ -1629,23 +1614,18 @@ def createJson(original_func):
             dir = os.path.dirname(fullPath)
             name_Ext = os.path.basename(fullPath)
             name, ext = os.path.splitext(name_Ext)
-            jsonAll = [i for i in os.listdir(dir) if i.endswith('.json')]
-            verDict = {}
-            for i in jsonAll:
-                tmp = re.search('(.*)[_v]([0-9]{4})[.].*', i)
-                num = int(tmp.group(2))
-                verDict[num] = tmp.group(1)
-            if not verDict:
-                jsonFile = dir + "/" + name + ".json"
+            latest = versionIndex.latest(dir, ext="json", skip=False)
+            if not latest:
                 data = {}
             else:
-                verMax = max(verDict.keys())
-                jsonFile = f"{dir}/{verDict[verMax]}v%04d.json" % verMax
+                jsonFile = f"{dir}/{latest.name}"
                 with open(jsonFile) as JSON:
                     data = json.load(JSON)
             result = original_func(data, *args, **kwargs)
-            with open(dir + "/" + name + ".json", 'w') as JSON:
+            newFile = dir + "/" + name + ".json"
+            with open(newFile, 'w') as JSON:
                 json.dump(data, JSON, indent=4)
+            versionIndex.register(newFile)
             return result
     return wrapper
 
@@ -2066,27 +2046,10 @@ def getMaxVersion(fullPath: str) -> int:
     """ Given an address, it lists the Maya files in that folder. 
     And check if there is a version in the file name, 
     returns the largest number. 
+    The folder is cached in versionIndex and listed again 
+    only when its contents change.
         """
-    folder = pathlib.Path(fullPath)
-    if folder.is_file():
-        folder = folder.parent
-    pattern1 = re.compile(".*v(\d{4})") # v0001 ~ v9999
-    number = []
-    for i in folder.glob("*.ma"):
-        ver = pattern1.match(i.name)
-        if not ver:
-            continue
-        num = ver.group(1)
-        num = int(num)
-        if num == 9999:
-            continue
-        else:
-            number.append(num)
-    try:
-        result = max(number)
-    except:
-        result = 0
-    return result
+    return versionIndex.latestVersion(fullPath, ext="ma")
 
 
 def copyHJK():
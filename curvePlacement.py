@@ -0,0 +1,210 @@
+import time
+import numpy as np
+import pymel.core as pm
+from frameMath import normalized, aimMatrix, eulerFromMatrix
+
+
+def curveData(cuv) -> dict:
+    """ Read the curve once.
+    cvs are world positions, knots are the full knot vector,
+    Maya's knots() is missing the first and the last one.
+    >>> curveData("cuv_mizzenSub1_copied")
+    >>> {'cvs': array([[...]]), 'knots': array([...]), 'degree': 3, ...}
+     """
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    sel.add(str(cuv))
+    dag = sel.getDagPath(0)
+    dag.extendToShape()
+    fn = om2.MFnNurbsCurve(dag)
+    cvs = np.array(fn.cvPositions(om2.MSpace.kWorld), dtype=float)[:, :3]
+    knots = np.array(fn.knots(), dtype=float)
+    degree = fn.degree
+    if fn.form == om2.MFnNurbsCurve.kPeriodic:
+        head = knots[0] - (knots[1] - knots[0])
+        tail = knots[-1] + (knots[-1] - knots[-2])
+    else:
+        head, tail = knots[0], knots[-1]
+    knots = np.concatenate([[head], knots, [tail]])
+    n = len(cvs)
+    result = {
+        "shape": dag.partialPathName(),
+        "cvs": cvs,
+        "knots": knots,
+        "degree": degree,
+        "domain": (knots[degree], knots[n]),
+        }
+    return result
+
+
+def basisMatrix(knots: np.ndarray, degree: int, params) -> np.ndarray:
+    """ Cox-de Boor for every parameter at once.
+    Returns (len(params), number of cvs), points = basis @ cvs.
+     """
+    u = np.asarray(params, dtype=float)[:, None]
+    n = len(knots) - degree - 1
+    left, right = knots[:-1], knots[1:]
+    basis = ((left <= u) & (u < right)).astype(float)
+    # The end of the domain belongs to the last span that isn't empty.
+    last = np.nonzero(left[:n] < right[:n])[0][-1]
+    atEnd = u[:, 0] >= knots[n]
+    basis[atEnd] = 0.0
+    basis[atEnd, last] = 1.0
+    for p in range(1, degree + 1):
+        count = len(knots) - p - 1
+        a = knots[p : p + count] - knots[:count]
+        b = knots[p + 1 : p + 1 + count] - knots[1 : 1 + count]
+        a = np.where(a == 0, np.inf, a)
+        b = np.where(b == 0, np.inf, b)
+        first = (u - knots[:count]) / a * basis[:, :count]
+        second = (knots[p + 1 : p + 1 + count] - u) / b \
+            * basis[:, 1 : 1 + count]
+        basis = first + second
+    return basis[:, :n]
+
+
+def straightCurvePoints(length: float, spans: int=3, \
+                        degree: int=3) -> list:
+    """ The cvs of a straight curve along x, with uniform knots.
+    The same curve as rebuildCurve of a line, without the rebuild.
+    >>> straightCurvePoints(1.0)
+    >>> [(0.0, 0, 0), (0.111, 0, 0), (0.333, 0, 0), ..., (1.0, 0, 0)]
+     """
+    knots = [0] * degree + list(range(1, spans)) + [spans] * degree
+    count = spans + degree
+    result = []
+    for i in range(count):
+        x = sum(knots[i : i + degree]) / degree / spans * length
+        result.append((x, 0, 0))
+    return result
+
+
+def curvePoints(data: dict, params) -> np.ndarray:
+    basis = basisMatrix(data["knots"], data["degree"], params)
+    return basis @ data["cvs"]
+
+
+def arcLengthTable(data: dict, samplesPerSpan: int=64) -> tuple:
+    """ Returns (params, lengths), lengths[i] is the length of the curve
+    from the start to params[i].
+     """
+    start, end = data["domain"]
+    spans = len(data["cvs"]) - data["degree"]
+    params = np.linspace(start, end, max(spans, 1) * samplesPerSpan + 1)
+    points = curvePoints(data, params)
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    lengths = np.concatenate([[0.0], np.cumsum(steps)])
+    return params, lengths
+
+
+def equalSpacingParams(data: dict, number: int, \
+                       samplesPerSpan: int=64) -> np.ndarray:
+    """ Parameters of number points with the same arc length between them,
+    the first and the last are the ends of the curve.
+    The same as motionPath with fractionMode.
+     """
+    params, lengths = arcLengthTable(data, samplesPerSpan)
+    if number < 2:
+        return params[:1]
+    targets = np.linspace(0.0, lengths[-1], number)
+    result = np.interp(targets, lengths, params)
+    return result
+
+
+def curveTangents(data: dict, params) -> np.ndarray:
+    """ Unit tangents by central difference, one-sided at the ends. """
+    start, end = data["domain"]
+    params = np.asarray(params, dtype=float)
+    eps = (end - start) * 1e-4
+    before = curvePoints(data, np.clip(params - eps, start, end))
+    after = curvePoints(data, np.clip(params + eps, start, end))
+    return normalized(after - before)
+
+
+def curveFrames(tangents: np.ndarray, worldUp=(0, 1, 0)) -> np.ndarray:
+    """ Rotation rows (n, 3, 3), x is the tangent and y is toward worldUp.
+    The same as motionPath with follow, followAxis x, upAxis y.
+     """
+    return aimMatrix(np.atleast_2d(tangents), worldUp)
+
+
+def chainFrames(points: np.ndarray, worldUp=(0, 1, 0)) -> np.ndarray:
+    """ x aims at the next point, y is toward worldUp,
+    the last one copies the one before.
+    The same as orientJoints(joints, "xyz", "yup").
+     """
+    points = np.asarray(points, dtype=float)
+    if len(points) < 2:
+        return np.identity(3)[None].repeat(len(points), axis=0)
+    aims = np.diff(points, axis=0)
+    aims = np.vstack([aims, aims[-1:]])
+    return curveFrames(aims, worldUp)
+
+
+def createJointChain(positions, frames, names: list=[]) -> list:
+    """ One joint command per joint.
+    Each jointOrient is the rotation relative to the parent joint,
+    so nothing is oriented or frozen afterwards.
+    >>> createJointChain([(0,0,0), (0,5,0)], chainFrames(...), ["a", "b"])
+    >>> [nt.Joint('a'), nt.Joint('b')]
+     """
+    positions = np.asarray(positions, dtype=float)
+    frames = np.asarray(frames, dtype=float)
+    local = frames.copy()
+    # world_i = local_i @ world_(i-1)
+    local[1:] = frames[1:] @ np.transpose(frames[:-1], (0, 2, 1))
+    orients = eulerFromMatrix(local).tolist()
+    pm.select(cl=True)
+    result = []
+    for i, (pos, orient) in enumerate(zip(positions.tolist(), orients)):
+        name = names[i] if i < len(names) else "joint1"
+        result.append(pm.joint(p=pos, o=orient, n=name))
+    pm.select(cl=True)
+    return result
+
+
+def createJointsOnCurve(cuv, number: int, names: list=[], \
+                        orient: str="chain", worldUp=(0, 1, 0)) -> list:
+    """ Joints with the same spacing on the curve, as a chain.
+    orient="chain" aims each joint at the next one,
+    orient="tangent" follows the curve like a motionPath.
+    >>> createJointsOnCurve("cuv_mizzenSub1_copied", 20)
+    >>> createJointsOnCurve(cuv, 5, names=[f"jnt_rope{i}" for i in range(5)])
+     """
+    data = curveData(cuv)
+    params = equalSpacingParams(data, number)
+    points = curvePoints(data, params)
+    if orient == "tangent":
+        frames = curveFrames(curveTangents(data, params), worldUp)
+    else:
+        frames = chainFrames(points, worldUp)
+    result = createJointChain(points, frames, names)
+    return result
+
+
+def benchmarkCurvePlacement(numberOfRopes: int=100, \
+                            numberOfJoints: int=20) -> dict:
+    """ 20 joints on each of 100 ropes,
+    with motionPath nodes and with createJointsOnCurve.
+    >>> benchmarkCurvePlacement()
+    >>> {'motionPath': 41.2, 'analytic': 1.3}
+     """
+    import maya.cmds as cmds
+    from general import createJointOnCurveSameSpacing_motionPath
+    result = {}
+    for method in ["motionPath", "analytic"]:
+        cmds.file(new=True, force=True)
+        curves = []
+        for i in range(numberOfRopes):
+            points = [(i, j * 4.0, np.sin(j + i) * 2.0) for j in range(7)]
+            curves.append(pm.curve(p=points, d=3, n=f"cuv_bench{i}"))
+        timer = time.perf_counter()
+        for cuv in curves:
+            if method == "motionPath":
+                pm.select(cuv)
+                createJointOnCurveSameSpacing_motionPath(numberOfJoints)
+            else:
+                createJointsOnCurve(cuv, numberOfJoints)
+        result[method] = time.perf_counter() - timer
+    print(result)
+    return result
@@ -0,0 +1,128 @@
+import time
+import numpy as np
+import pymel.core as pm
+
+
+def readCVs(curves: list) -> dict:
+    """ The cvs of all curves, read through one MSelectionList.
+    Returns {curve: {"shape", "points", "matrix", "overlap"}},
+    points are in object space, matrix is the world matrix of the shape,
+    overlap is the number of repeated cvs of a periodic curve.
+    >>> readCVs(["cc_LeftArm_FK", "cc_RightArm_FK"])
+     """
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    for i in curves:
+        sel.add(str(i))
+    result = {}
+    for idx, cuv in enumerate(curves):
+        dag = sel.getDagPath(idx)
+        dag.extendToShape()
+        fn = om2.MFnNurbsCurve(dag)
+        points = fn.cvPositions(om2.MSpace.kObject)
+        periodic = fn.form == om2.MFnNurbsCurve.kPeriodic
+        result[str(cuv)] = {
+            "shape": dag.partialPathName(),
+            "points": np.array(points, dtype=float)[:, :3],
+            "matrix": np.array(dag.inclusiveMatrix()).reshape(4, 4),
+            "overlap": fn.degree if periodic else 0,
+            }
+    return result
+
+
+def worldPoints(data: dict) -> np.ndarray:
+    points = data["points"]
+    homo = np.hstack([points, np.ones((len(points), 1))])
+    return (homo @ data["matrix"])[:, :3]
+
+
+def resampleCVs(points: np.ndarray, count: int, \
+                overlap: int=0) -> np.ndarray:
+    """ count points at the same arc length along the cv polygon,
+    the ends stay where they are.
+    A periodic curve is resampled as a loop,
+    and its first overlap cvs are repeated at the end.
+     """
+    points = np.asarray(points, dtype=float)
+    if overlap:
+        unique = points[:-overlap]
+        loop = np.vstack([unique, unique[:1]])
+        result = resampleCVs(loop, count - overlap + 1)[:-1]
+        return np.vstack([result, result[:overlap]])
+    if len(points) == count:
+        return points.copy()
+    steps = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    lengths = np.concatenate([[0.0], np.cumsum(steps)])
+    if lengths[-1] == 0:
+        return np.repeat(points[:1], count, axis=0)
+    targets = np.linspace(0.0, lengths[-1], count)
+    result = [np.interp(targets, lengths, points[:, i]) for i in range(3)]
+    return np.stack(result, axis=1)
+
+
+def writeCVs(data: dict, points: np.ndarray, space: str="object") -> None:
+    """ All cvs of one curve with one setAttr, so it can be undone.
+    points are in world space with space="world".
+     """
+    import maya.cmds as cmds
+    points = np.asarray(points, dtype=float)
+    if space == "world":
+        homo = np.hstack([points, np.ones((len(points), 1))])
+        points = (homo @ np.linalg.inv(data["matrix"]))[:, :3]
+    plug = f"{data['shape']}.controlPoints[0:{len(points) - 1}]"
+    cmds.setAttr(plug, *points.ravel().tolist())
+
+
+def matchCurveShapes(template, targets: list, space: str="object", \
+                     resample: bool=True) -> dict:
+    """ The shape of template is copied to every target.
+    With space="object" the targets keep their own transforms,
+    with space="world" their cvs go where the template cvs are.
+    A target with another number of cvs gets the template resampled,
+    or is a failure when resample is False.
+    >>> matchCurveShapes("cc_base", ["cc_LeftArm_FK", "cc_RightArm_FK"])
+    >>> {'done': ['cc_LeftArm_FK', 'cc_RightArm_FK'], 'failed': []}
+     """
+    targets = [str(i) for i in targets]
+    data = readCVs([template] + targets)
+    base = data[str(template)]
+    points = worldPoints(base) if space == "world" else base["points"]
+    resampled = {}
+    result = {"done": [], "failed": []}
+    for cuv in targets:
+        target = data[cuv]
+        count = len(target["points"])
+        if count != len(points) and not resample:
+            result["failed"].append(cuv)
+            continue
+        if count not in resampled:
+            resampled[count] = resampleCVs(points, count, base["overlap"])
+        writeCVs(target, resampled[count], space)
+        result["done"].append(cuv)
+    return result
+
+
+def benchmarkMatchShapes(numberOfCurves: int=300) -> dict:
+    """ Match 300 controllers to one template,
+    cv by cv with pointPosition and move, and with matchCurveShapes.
+    >>> benchmarkMatchShapes()
+    >>> {'pointPosition': 3.1, 'bulk': 0.05}
+     """
+    import maya.cmds as cmds
+    result = {}
+    for method in ["pointPosition", "bulk"]:
+        cmds.file(new=True, force=True)
+        template = pm.circle(n="bench_template", s=8, r=2, ch=False)[0]
+        targets = [pm.circle(n=f"bench_cc{i}", s=8, ch=False)[0] \
+            for i in range(numberOfCurves)]
+        timer = time.perf_counter()
+        if method == "pointPosition":
+            for cuv in targets:
+                for k in range(len(pm.ls(f"{cuv}.cv[0:]", fl=True))):
+                    x, y, z = pm.pointPosition(f"{template}.cv[{k}]")
+                    pm.move(x, y, z, f"{cuv}.cv[{k}]", a=True)
+        else:
+            matchCurveShapes(template, targets, "world")
+        result[method] = time.perf_counter() - timer
+    print(result)
+    return result
@@ -0,0 +1,283 @@
+import csv
+import time
+import queue
+import sqlite3
+import calendar
+import datetime
+import itertools
+from contextlib import contextmanager
+
+
+ACCESS_DRIVER = r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
+
+
+def accessConnector(dbPath: str):
+    """ Returns a function that opens a MS Access connection.
+    pyodbc is imported here, so the sqlite backend works without it.
+    >>> pool = ConnectionPool(accessConnector("../folder/file.accdb"))
+     """
+    import pyodbc
+    connStr = f"{ACCESS_DRIVER}DBQ={dbPath};"
+    def connect():
+        conn = pyodbc.connect(connStr)
+        return conn
+    return connect
+
+
+def sqliteConnector(dbPath: str=":memory:"):
+    """ Returns a function that opens a sqlite connection.
+    It stands in for MS Access, to test and benchmark on Linux.
+    A memory database is shared by all connections of the pool.
+     """
+    if dbPath == ":memory:":
+        dbPath = f"file:dbIngest{time.time_ns()}?mode=memory&cache=shared"
+    def connect():
+        conn = sqlite3.connect(dbPath, uri=True, check_same_thread=False)
+        return conn
+    return connect
+
+
+class ConnectionPool:
+    def __init__(self, connect, size: int=4):
+        """ Reuses opened connections instead of connecting per statement.
+        >>> pool = ConnectionPool(sqliteConnector("C:/file.db"))
+        >>> with pool.connection() as conn:
+        >>>     conn.cursor().execute("SELECT 1")
+         """
+        self.connect = connect
+        self.size = size
+        self.idle = queue.LifoQueue(maxsize=size)
+        self.opened = []
+        # The first connection keeps a shared memory database alive.
+        self.idle.put(self.open())
+
+
+    def open(self):
+        conn = self.connect()
+        self.opened.append(conn)
+        return conn
+
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = self.open()
+        try:
+            yield conn
+        finally:
+            try:
+                self.idle.put_nowait(conn)
+            except queue.Full:
+                self.opened.remove(conn)
+                conn.close()
+
+
+    def closeAll(self) -> None:
+        for conn in self.opened:
+            conn.close()
+        self.opened = []
+        self.idle = queue.LifoQueue(maxsize=self.size)
+
+
+class Ingestor:
+    def __init__(self, pool: ConnectionPool):
+        """ Batch inserts and pushed down queries over a ConnectionPool.
+        Column names are quoted as [name],
+        which both MS Access and sqlite understand.
+         """
+        self.pool = pool
+
+
+    def insertRows(self, table: str, columns: list, rows, \
+                   chunkSize: int=5000) -> int:
+        """ Insert rows with executemany in chunks of chunkSize.
+        With pyodbc, fast_executemany sends a chunk as one array.
+        rows can be a generator. Returns the number of rows.
+        >>> insertRows("table", ["team", "name", "date"], \
+        >>>     [("myTeam", "myName", "2022-09-08")])
+         """
+        cols = ", ".join(f"[{i}]" for i in columns)
+        marks = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO [{table}] ({cols}) VALUES ({marks})"
+        count = 0
+        rows = iter(rows)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            if hasattr(cursor, "fast_executemany"):
+                cursor.fast_executemany = True
+            try:
+                while True:
+                    chunk = list(itertools.islice(rows, chunkSize))
+                    if not chunk:
+                        break
+                    cursor.executemany(sql, chunk)
+                    count += len(chunk)
+                conn.commit()
+            except:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return count
+
+
+    def ingestCsv(self, csvPath: str, table: str, chunkSize: int=5000, \
+                  encoding: str="utf-8") -> int:
+        """ Stream a csv file into the table, like pandas to_sql.
+        The first line is the column names.
+        Empty cells are NULL, numbers are int or float.
+        A missing table is created with the types of the first chunk.
+        Only one chunk of rows is in memory at a time.
+         """
+        with open(csvPath, newline="", encoding=encoding) as f:
+            reader = csv.reader(f)
+            columns = next(reader)
+            rows = (typedRow(i) for i in reader)
+            first = list(itertools.islice(rows, chunkSize))
+            if not self.hasTable(table):
+                self.createTable(table, columns, first)
+            rows = itertools.chain(first, rows)
+            count = self.insertRows(table, columns, rows, chunkSize)
+        return count
+
+
+    def hasTable(self, table: str) -> bool:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT * FROM [{table}] WHERE 1=0")
+                return True
+            except:
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
+
+
+    def createTable(self, table: str, columns: list, rows: list) -> None:
+        """ CREATE TABLE with the column types of rows.
+        A column is INTEGER or DOUBLE if all its values are,
+        otherwise TEXT.
+         """
+        types = [columnType(row[i] for row in rows if i < len(row)) \
+            for i in range(len(columns))]
+        cols = ", ".join(f"[{i}] {j}" for i, j in zip(columns, types))
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"CREATE TABLE [{table}] ({cols})")
+                conn.commit()
+            finally:
+                cursor.close()
+
+
+    def select(self, table: str, columns: list=[], where: str="", \
+               params: tuple=()) -> list:
+        cols = ", ".join(f"[{i}]" for i in columns) if columns else "*"
+        sql = f"SELECT {cols} FROM [{table}]"
+        if where:
+            sql += f" WHERE {where}"
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                result = cursor.fetchall()
+            finally:
+                cursor.close()
+        return result
+
+
+    def selectDateRange(self, table: str, dateColumn: str, start, end, \
+                        columns: list=[]) -> list:
+        """ The date filter runs in the database as a parameterized query.
+        start is included, end is excluded.
+        >>> selectDateRange("table", "DATE", *monthRange("2022-08"))
+         """
+        where = f"[{dateColumn}] >= ? AND [{dateColumn}] < ?"
+        return self.select(table, columns, where, (start, end))
+
+
+def typedCell(value: str):
+    """ A csv cell as NULL, int, float or str.
+    >>> [typedCell(i) for i in ["", "3", "2.5", "1e3", "myTeam"]]
+    >>> [None, 3, 2.5, 1000.0, 'myTeam']
+     """
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def typedRow(row: list) -> tuple:
+    return tuple(typedCell(i) for i in row)
+
+
+def columnType(values) -> str:
+    """ The SQL type of a column, NULL fits every type. """
+    values = [i for i in values if i is not None]
+    if values and all(isinstance(i, int) for i in values):
+        return "INTEGER"
+    if values and all(isinstance(i, (int, float)) for i in values):
+        return "DOUBLE"
+    return "TEXT"
+
+
+def monthRange(month: str) -> tuple:
+    """ Returns the first day of the month and of the next month.
+    >>> monthRange("2022-08")
+    >>> ("2022-08-01", "2022-09-01")
+     """
+    year, mon = [int(i) for i in month.split("-")[:2]]
+    days = calendar.monthrange(year, mon)[1]
+    first = datetime.date(year, mon, 1)
+    nextFirst = first + datetime.timedelta(days=days)
+    return first.isoformat(), nextFirst.isoformat()
+
+
+def benchmarkIngest(numberOfRows: int=100000, chunkSize: int=5000) -> dict:
+    """ Compare row by row inserts with a fresh connection per statement,
+    and chunked executemany over the pool, on sqlite.
+    >>> benchmarkIngest()
+    >>> {'perStatement': 3.2, 'executemany': 0.15, 'dateQuery': 0.01}
+     """
+    dbPath = f"file:benchmarkIngest{time.time_ns()}?mode=memory&cache=shared"
+    pool = ConnectionPool(sqliteConnector(dbPath))
+    ddl = "CREATE TABLE [{}] ([team] TEXT, [name] TEXT, [date] TEXT)"
+    with pool.connection() as conn:
+        for table in ["perStatement", "executemany"]:
+            conn.execute(ddl.format(table))
+    start = datetime.date(2022, 1, 1)
+    rows = [
+        ("myTeam", f"name{i}", \
+            (start + datetime.timedelta(days=i % 365)).isoformat())
+        for i in range(numberOfRows)
+        ]
+    result = {}
+    # Row by row, a connection per statement.
+    sql = "INSERT INTO [perStatement] ([team], [name], [date]) VALUES (?, ?, ?)"
+    timer = time.perf_counter()
+    for row in rows:
+        conn = sqlite3.connect(dbPath, uri=True)
+        conn.execute(sql, row)
+        conn.commit()
+        conn.close()
+    result["perStatement"] = time.perf_counter() - timer
+    ingestor = Ingestor(pool)
+    timer = time.perf_counter()
+    ingestor.insertRows("executemany", ["team", "name", "date"], rows, chunkSize)
+    result["executemany"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    found = ingestor.selectDateRange("executemany", "date", *monthRange("2022-08"))
+    result["dateQuery"] = time.perf_counter() - timer
+    result["dateRows"] = len(found)
+    pool.closeAll()
+    print(result)
+    return result
@@ -0,0 +1,689 @@
+import re
+import math
+import time
+import random
+
+
+class ExpressionError(Exception):
+    """ The expression can't be compiled to utility nodes. """
+
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+|//[^\n]*)
+    |(?P<number>\d+\.\d*|\.\d+|\d+)
+    |(?P<var>\$\w+)
+    |(?P<plug>[A-Za-z_][\w:|]*\.[A-Za-z_][\w\[\]]*(?:\.[A-Za-z_][\w\[\]]*)*)
+    |(?P<name>[A-Za-z_]\w*)
+    |(?P<op>==|!=|<=|>=|&&|\|\||<<|>>|[-+*/<>()=;,{}`])
+    """, re.VERBOSE)
+
+
+# condition.operation
+COMPARE = {"==": 0, "!=": 1, ">": 2, ">=": 3, "<": 4, "<=": 5}
+CHECK = [
+    lambda a, b: a == b, lambda a, b: a != b, lambda a, b: a > b, 
+    lambda a, b: a >= b, lambda a, b: a < b, lambda a, b: a <= b, 
+    ]
+PRIORITY = [["||"], ["&&"], list(COMPARE), ["+", "-"], ["*", "/"]]
+
+
+def tokenize(source: str) -> list:
+    result = []
+    pos = 0
+    while pos < len(source):
+        match = TOKEN.match(source, pos)
+        if not match:
+            raise ExpressionError(f"Unknown syntax: {source[pos:pos+20]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        result.append((kind, match.group(kind)))
+    return result
+
+
+class Parser:
+    def __init__(self, source: str):
+        """ Parses the stateless subset of MEL the rig tools write.
+        - float $var = expr;
+        - node.attr = expr;
+        - if (expr) statement
+        - + - * / == != < <= > >= && || ( ) and `mag<<a, b, c>>`
+         """
+        self.tokens = tokenize(source)
+        self.pos = 0
+
+
+    def peek(self, offset: int=0) -> tuple:
+        idx = self.pos + offset
+        return self.tokens[idx] if idx < len(self.tokens) else (None, None)
+
+
+    def take(self, value: str=None) -> tuple:
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise ExpressionError(f"Expected {value!r}, found {token[1]!r}")
+        self.pos += 1
+        return token
+
+
+    def parse(self) -> list:
+        result = []
+        while self.peek()[0] is not None:
+            result.append(self.statement())
+        return result
+
+
+    def statement(self) -> tuple:
+        kind, value = self.peek()
+        if value == "float":
+            self.take()
+            var = self.take()[1]
+            self.take("=")
+            expr = self.expression()
+            self.take(";")
+            return ("decl", var, expr)
+        if value == "if":
+            self.take()
+            self.take("(")
+            cond = self.expression()
+            self.take(")")
+            if self.peek()[1] == "{":
+                self.take("{")
+                body = []
+                while self.peek()[1] != "}":
+                    body.append(self.statement())
+                self.take("}")
+            else:
+                body = [self.statement()]
+            if self.peek()[1] == "else":
+                raise ExpressionError("'else' is not supported.")
+            return ("if", cond, body)
+        if kind in ["plug", "var"]:
+            self.take()
+            self.take("=")
+            expr = self.expression()
+            self.take(";")
+            return ("assign", value, expr)
+        raise ExpressionError(f"Unsupported statement at {value!r}")
+
+
+    def expression(self, level: int=0) -> tuple:
+        if level == len(PRIORITY):
+            return self.unary()
+        left = self.expression(level + 1)
+        while self.peek()[1] in PRIORITY[level]:
+            op = self.take()[1]
+            right = self.expression(level + 1)
+            left = ("bin", op, left, right)
+        return left
+
+
+    def unary(self) -> tuple:
+        kind, value = self.peek()
+        if value == "-":
+            self.take()
+            return ("neg", self.unary())
+        if value == "(":
+            self.take()
+            expr = self.expression()
+            self.take(")")
+            return expr
+        if value == "`":
+            self.take()
+            expr = self.unary()
+            self.take("`")
+            return expr
+        if value == "mag":
+            self.take()
+            self.take("<<")
+            items = [self.expression(3)]
+            while self.peek()[1] == ",":
+                self.take()
+                items.append(self.expression(3))
+            self.take(">>")
+            if len(items) != 3:
+                raise ExpressionError("mag needs three components.")
+            return ("mag", items)
+        if kind == "number":
+            self.take()
+            return ("num", float(value))
+        if kind in ["plug", "var"]:
+            self.take()
+            return (kind, value)
+        raise ExpressionError(f"Unsupported token {value!r}")
+
+
+def evaluate(statements: list, inputs: dict, defaults: dict={}) -> dict:
+    """ Runs the parsed expression once in Python.
+    Targets that are not assigned keep the value of defaults.
+    >>> evaluate(Parser("a.tx = b.tx * 2;").parse(), {"b.tx": 3})
+    >>> {"a.tx": 6.0}
+     """
+    env = dict(defaults)
+    variables = {}
+    def value(expr):
+        kind = expr[0]
+        if kind == "num":
+            return expr[1]
+        if kind == "var":
+            return variables[expr[1]]
+        if kind == "plug":
+            return env[expr[1]] if expr[1] in env else inputs[expr[1]]
+        if kind == "neg":
+            return -value(expr[1])
+        if kind == "mag":
+            return math.sqrt(sum(value(i) ** 2 for i in expr[1]))
+        op, a, b = expr[1], value(expr[2]), value(expr[3])
+        if op == "+": return a + b
+        if op == "-": return a - b
+        if op == "*": return a * b
+        if op == "/": return a / b
+        if op == "&&": return float(bool(a) and bool(b))
+        if op == "||": return float(bool(a) or bool(b))
+        return float(CHECK[COMPARE[op]](a, b))
+    def run(statement):
+        kind = statement[0]
+        if kind == "decl":
+            variables[statement[1]] = value(statement[2])
+        elif kind == "assign" and statement[1].startswith("$"):
+            variables[statement[1]] = value(statement[2])
+        elif kind == "assign":
+            env[statement[1]] = value(statement[2])
+        elif value(statement[1]):
+            for i in statement[2]:
+                run(i)
+    for i in statements:
+        run(i)
+    result = {k: v for k, v in env.items() if k in targetsOf(statements)}
+    return result
+
+
+def targetsOf(statements: list) -> list:
+    result = []
+    for i in statements:
+        if i[0] == "assign" and not i[1].startswith("$"):
+            if i[1] not in result:
+                result.append(i[1])
+        elif i[0] == "if":
+            for j in targetsOf(i[2]):
+                if j not in result:
+                    result.append(j)
+    return result
+
+
+class Graph:
+    def __init__(self, prefix: str="expr"):
+        """ A list of utility nodes waiting to be created.
+        Each node is {"name", "type", "values", "inputs"}.
+        values are constants, inputs are connections from plugs.
+        The nodes are stored in the order they depend on each other.
+        outputs is {target plug: value}, a value is a float or a plug.
+         """
+        self.prefix = prefix
+        self.nodes = []
+        self.outputs = {}
+        self.modifier = None
+
+
+    def add(self, nodeType: str, attrs: dict, output: str) -> str:
+        name = f"{self.prefix}_{nodeType}{len(self.nodes) + 1}"
+        node = {"name": name, "type": nodeType, "values": {}, "inputs": {}}
+        for attr, value in attrs.items():
+            if isinstance(value, str):
+                node["inputs"][attr] = value
+            else:
+                node["values"][attr] = value
+        self.nodes.append(node)
+        return f"{name}.{output}"
+
+
+    def undo(self) -> None:
+        """ Undoes createGraph(graph, backend="modifier").
+        With backend="cmds", Ctrl+Z does it.
+         """
+        if self.modifier:
+            self.modifier.undoIt()
+        self.modifier = None
+
+
+    def evaluate(self, inputs: dict) -> dict:
+        """ Runs the nodes in Python, to check them without Maya. """
+        plugs = dict(inputs)
+        def get(node, attr, default=0.0):
+            if attr in node["inputs"]:
+                return plugs[node["inputs"][attr]]
+            return node["values"].get(attr, default)
+        for node in self.nodes:
+            name, nodeType = node["name"], node["type"]
+            if nodeType == "plusMinusAverage":
+                a, b = get(node, "input1D[0]"), get(node, "input1D[1]")
+                op = get(node, "operation", 1)
+                plugs[f"{name}.output1D"] = a + b if op == 1 else a - b
+            elif nodeType == "multDoubleLinear":
+                plugs[f"{name}.output"] = \
+                    get(node, "input1") * get(node, "input2")
+            elif nodeType == "multiplyDivide":
+                plugs[f"{name}.outputX"] = \
+                    get(node, "input1X") / get(node, "input2X", 1.0)
+            elif nodeType == "distanceBetween":
+                p1 = [get(node, f"point1{i}") for i in "XYZ"]
+                p2 = [get(node, f"point2{i}") for i in "XYZ"]
+                plugs[f"{name}.distance"] = math.dist(p1, p2)
+            elif nodeType == "condition":
+                a, b = get(node, "firstTerm"), get(node, "secondTerm")
+                op = int(get(node, "operation"))
+                check = CHECK[op](a, b)
+                attr = "colorIfTrueR" if check else "colorIfFalseR"
+                plugs[f"{name}.outColorR"] = get(node, attr)
+        result = {}
+        for target, value in self.outputs.items():
+            result[target] = plugs[value] if isinstance(value, str) else value
+        return result
+
+
+class Compiler:
+    def __init__(self, prefix: str="expr"):
+        """ Turns parsed statements into a Graph.
+        Constants are folded.
+        A target that is read before it is written, or only set inside
+        an 'if', keeps the last frame's value in MEL.
+        Nodes can't hold it, so it raises ExpressionError.
+        An 'if' after the target is set is a condition node.
+         """
+        self.graph = Graph(prefix)
+        self.variables = {}
+        self.assigned = {}
+        self.booleans = set()
+
+
+    def compile(self, statements: list) -> Graph:
+        self.targets = targetsOf(statements)
+        for i in statements:
+            self.statement(i, None)
+        self.graph.outputs = dict(self.assigned)
+        return self.graph
+
+
+    def statement(self, statement, cond) -> None:
+        kind = statement[0]
+        if kind == "if":
+            inner = self.value(statement[1])
+            if cond is not None:
+                inner = self.logic("&&", cond, inner)
+            for i in statement[2]:
+                self.statement(i, inner)
+            return
+        name, value = statement[1], self.value(statement[2])
+        if name.startswith("$"):
+            if cond is not None:
+                raise ExpressionError("Variables can't be set inside 'if'.")
+            self.variables[name] = value
+            return
+        if cond is not None:
+            current = self.current(name)
+            value = self.select(cond, value, current)
+        self.assigned[name] = value
+
+
+    def current(self, plug: str):
+        if plug not in self.assigned:
+            raise ExpressionError(f"{plug} is only set inside 'if', " \
+                "it keeps its last value.")
+        return self.assigned[plug]
+
+
+    def value(self, expr):
+        kind = expr[0]
+        if kind == "num":
+            return expr[1]
+        if kind == "var":
+            if expr[1] not in self.variables:
+                raise ExpressionError(f"Unknown variable: {expr[1]}")
+            return self.variables[expr[1]]
+        if kind == "plug":
+            plug = expr[1]
+            if plug in self.assigned:
+                return self.assigned[plug]
+            if plug in self.targets:
+                raise ExpressionError(f"{plug} is read before it is set.")
+            return plug
+        if kind == "neg":
+            return self.arithmetic("*", self.value(expr[1]), -1.0)
+        if kind == "mag":
+            return self.magnitude(expr[1])
+        op = expr[1]
+        a, b = self.value(expr[2]), self.value(expr[3])
+        if op in ["&&", "||"]:
+            return self.logic(op, a, b)
+        if op in COMPARE:
+            return self.compare(op, a, b)
+        return self.arithmetic(op, a, b)
+
+
+    def arithmetic(self, op, a, b):
+        if not isinstance(a, str) and not isinstance(b, str):
+            return {"+": a + b, "-": a - b, "*": a * b, "/": a / b}[op]
+        if op in ["+", "-"]:
+            attrs = {"operation": 1 if op == "+" else 2, \
+                "input1D[0]": a, "input1D[1]": b}
+            return self.graph.add("plusMinusAverage", attrs, "output1D")
+        if op == "*":
+            attrs = {"input1": a, "input2": b}
+            return self.graph.add("multDoubleLinear", attrs, "output")
+        attrs = {"operation": 2, "input1X": a, "input2X": b}
+        return self.graph.add("multiplyDivide", attrs, "outputX")
+
+
+    def compare(self, op, a, b):
+        if not isinstance(a, str) and not isinstance(b, str):
+            return float(CHECK[COMPARE[op]](a, b))
+        attrs = {"firstTerm": a, "secondTerm": b, \
+            "operation": COMPARE[op], "colorIfTrueR": 1.0, \
+            "colorIfFalseR": 0.0}
+        result = self.graph.add("condition", attrs, "outColorR")
+        self.booleans.add(result)
+        return result
+
+
+    def truth(self, a):
+        """ 0 or 1, like MEL does for && and ||. """
+        if not isinstance(a, str):
+            return float(bool(a))
+        if a in self.booleans:
+            return a
+        return self.compare("!=", a, 0.0)
+
+
+    def select(self, cond, whenTrue, whenFalse):
+        if not isinstance(cond, str):
+            return whenTrue if cond else whenFalse
+        attrs = {"firstTerm": cond, "secondTerm": 0.0, "operation": 1, \
+            "colorIfTrueR": whenTrue, "colorIfFalseR": whenFalse}
+        result = self.graph.add("condition", attrs, "outColorR")
+        if whenTrue in [0.0, 1.0] or whenTrue in self.booleans:
+            if whenFalse in [0.0, 1.0] or whenFalse in self.booleans:
+                self.booleans.add(result)
+        return result
+
+
+    def logic(self, op, a, b):
+        a, b = self.truth(a), self.truth(b)
+        if op == "&&":
+            return self.select(a, b, 0.0)
+        return self.select(a, 1.0, b)
+
+
+    def magnitude(self, items: list):
+        """ mag<<a-b, c-d, e-f>> becomes one distanceBetween node,
+        point1 is (a, c, e) and point2 is (b, d, f).
+         """
+        attrs = {}
+        for axis, item in zip("XYZ", items):
+            if item[0] == "bin" and item[1] == "-":
+                attrs[f"point1{axis}"] = self.value(item[2])
+                attrs[f"point2{axis}"] = self.value(item[3])
+            else:
+                attrs[f"point1{axis}"] = self.value(item)
+                attrs[f"point2{axis}"] = 0.0
+        if not any(isinstance(i, str) for i in attrs.values()):
+            p1 = [attrs[f"point1{i}"] for i in "XYZ"]
+            p2 = [attrs[f"point2{i}"] for i in "XYZ"]
+            return math.dist(p1, p2)
+        return self.graph.add("distanceBetween", attrs, "distance")
+
+
+def compileExpression(source: str, prefix: str="expr") -> Graph:
+    """
+    >>> graph = compileExpression("cuv.Ratio = `mag<<b.tx-a.tx, \\
+    >>>     b.ty-a.ty, b.tz-a.tz>>` / 10;")
+    >>> graph.nodes
+    >>> [distanceBetween, multiplyDivide]
+     """
+    statements = Parser(source).parse()
+    return Compiler(prefix).compile(statements)
+
+
+def inputsOf(graph: Graph, statements: list) -> list:
+    """ Plugs read by the expression, that are not its targets. """
+    result = []
+    def walk(expr):
+        if expr[0] == "plug" and expr[1] not in result:
+            result.append(expr[1])
+        elif expr[0] == "neg":
+            walk(expr[1])
+        elif expr[0] == "mag":
+            for i in expr[1]:
+                walk(i)
+        elif expr[0] == "bin":
+            walk(expr[2])
+            walk(expr[3])
+    def visit(statement):
+        if statement[0] == "if":
+            walk(statement[1])
+            for i in statement[2]:
+                visit(i)
+        else:
+            walk(statement[2])
+    for i in statements:
+        visit(i)
+    targets = targetsOf(statements)
+    return [i for i in result if i not in targets]
+
+
+def verify(source: str, graph: Graph, defaults: dict={}, samples: int=200, \
+           values: list=[], seed: int=0) -> float:
+    """ Evaluates the expression and the graph on the same inputs.
+    Inputs are random numbers, mixed with the given values so that
+    the == branches are visited too.
+    Returns the largest difference, raises if it is over 1e-6.
+    >>> verify(source, compileExpression(source), values=[0, 180, 360])
+    >>> 0.0
+     """
+    rand = random.Random(seed)
+    statements = Parser(source).parse()
+    plugs = inputsOf(graph, statements)
+    numbers = list(values) + [0.0, 1.0]
+    result = 0.0
+    for _ in range(samples):
+        inputs = {}
+        for i in plugs:
+            if rand.random() < 0.5:
+                inputs[i] = float(rand.choice(numbers))
+            else:
+                inputs[i] = rand.uniform(-1000, 1000)
+        try:
+            expected = evaluate(statements, inputs, defaults)
+        except ZeroDivisionError:
+            continue
+        actual = graph.evaluate(inputs)
+        for target, value in expected.items():
+            result = max(result, abs(value - actual[target]))
+    if result > 1e-6:
+        raise ExpressionError(f"The nodes differ from the expression: {result}")
+    return result
+
+
+BACKENDS = ["cmds", "modifier"]
+
+
+def createGraph(graph: Graph, backend: str="cmds") -> list:
+    """ Creates all nodes of the graph, sets their values
+    and makes their connections.
+    backend="cmds" uses maya.cmds, so Ctrl+Z undoes it
+    inside the undo chunk of the caller.
+    backend="modifier" uses one MDGModifier. It is faster,
+    but it is not on the undo queue, only graph.undo() undoes it.
+    Returns the names of the created nodes.
+    >>> createGraph(compileExpression(source, "card1"))
+    >>> ['card1_condition1', 'card1_plusMinusAverage2']
+     """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend is one of {BACKENDS}: {backend}")
+    if backend == "cmds":
+        return createCommands(graph)
+    return createModifier(graph)
+
+
+def renamed(names: dict, plug: str) -> str:
+    """ plug with the name its node got in Maya. """
+    node, attr = plug.split(".", 1)
+    return f"{names.get(node, node)}.{attr}"
+
+
+def createCommands(graph: Graph) -> list:
+    import maya.cmds as cmds
+    names = {}
+    for node in graph.nodes:
+        names[node["name"]] = cmds.createNode(node["type"], \
+            n=node["name"], skipSelect=True)
+    def setValue(target: str, value):
+        # 16 values are a matrix.
+        if isinstance(value, (list, tuple)):
+            cmds.setAttr(target, *value, type="matrix")
+        else:
+            cmds.setAttr(target, value)
+    for node in graph.nodes:
+        name = names[node["name"]]
+        for attr, value in node["values"].items():
+            setValue(f"{name}.{attr}", value)
+        for attr, source in node["inputs"].items():
+            cmds.connectAttr(renamed(names, source), f"{name}.{attr}", \
+                f=True)
+    for target, value in graph.outputs.items():
+        if isinstance(value, str):
+            cmds.connectAttr(renamed(names, value), target, f=True)
+        else:
+            setValue(target, value)
+    graph.modifier = None
+    return [str(i) for i in names.values()]
+
+
+def createModifier(graph: Graph) -> list:
+    """ Nodes are created and renamed in the first doIt,
+    the values and connections in the second.
+     """
+    import maya.api.OpenMaya as om2
+    mod = om2.MDGModifier()
+    objects = []
+    for node in graph.nodes:
+        obj = mod.createNode(node["type"])
+        mod.renameNode(obj, node["name"])
+        objects.append(obj)
+    mod.doIt()
+    names = {}
+    for node, obj in zip(graph.nodes, objects):
+        names[node["name"]] = om2.MFnDependencyNode(obj).name()
+    def plugOf(plug: str):
+        sel = om2.MSelectionList()
+        sel.add(renamed(names, plug))
+        return sel.getPlug(0)
+    def connect(source: str, target: str):
+        # Like connectAttr -f, an existing input is replaced.
+        src, dst = plugOf(source), plugOf(target)
+        if dst.isDestination:
+            mod.disconnect(dst.source(), dst)
+        mod.connect(src, dst)
+    def setValue(target: str, value):
+        if isinstance(value, (list, tuple)):
+            data = om2.MFnMatrixData().create(om2.MMatrix(value))
+            mod.newPlugValue(plugOf(target), data)
+        else:
+            mod.newPlugValueDouble(plugOf(target), value)
+    for node in graph.nodes:
+        for attr, value in node["values"].items():
+            setValue(f"{node['name']}.{attr}", value)
+        for attr, source in node["inputs"].items():
+            connect(source, f"{node['name']}.{attr}")
+    for target, value in graph.outputs.items():
+        if isinstance(value, str):
+            connect(value, target)
+        else:
+            setValue(target, value)
+    mod.doIt()
+    graph.modifier = mod
+    return list(names.values())
+
+
+def expressionToNodes(source: str, prefix: str="expr", \
+                      values: list=[]) -> list:
+    """ Compile the expression, verify it and create the nodes.
+    >>> expressionToNodes(f"{cuv}.Distance = `mag<<...>>`;", cuv)
+     """
+    graph = compileExpression(source, prefix)
+    verify(source, graph, values=values)
+    return createGraph(graph)
+
+
+def expressionsToNodes(sources: dict, values: list=[]) -> tuple:
+    """ Compiles and verifies every {prefix: source},
+    then creates the nodes of all of them with one createGraph.
+    Returns the created nodes and the prefixes that can't be compiled,
+    which should stay MEL expressions.
+    >>> expressionsToNodes({"card1_visibility": expr1, ...}, [0, 180])
+    >>> (['card1_visibility_condition1', ...], ['card5_visibility'])
+     """
+    graph = Graph()
+    rejected = []
+    for prefix, source in sources.items():
+        try:
+            compiled = compileExpression(source, prefix)
+            verify(source, compiled, values=values)
+        except ExpressionError:
+            rejected.append(prefix)
+            continue
+        graph.nodes += compiled.nodes
+        graph.outputs.update(compiled.outputs)
+    result = createGraph(graph) if graph.nodes or graph.outputs else []
+    return result, rejected
+
+
+def replaceExpression(expressionNode: str, values: list=[]) -> list:
+    """ Replaces an existing expression node with utility nodes.
+    The expression stays if it can't be compiled.
+     """
+    import maya.cmds as cmds
+    source = cmds.expression(expressionNode, q=True, s=True)
+    try:
+        result = expressionToNodes(source, expressionNode, values)
+    except ExpressionError as e:
+        cmds.warning(f"{expressionNode}: {e}")
+        return []
+    cmds.delete(expressionNode)
+    return result
+
+
+def measureFps(startFrame: int, endFrame: int) -> float:
+    import maya.cmds as cmds
+    timer = time.perf_counter()
+    for frame in range(startFrame, endFrame + 1):
+        cmds.currentTime(frame, update=True)
+        cmds.refresh(force=True)
+    duration = time.perf_counter() - timer
+    return (endFrame - startFrame + 1) / duration
+
+
+def benchmarkSolariBoard(numberOfCards: int=500, frames: int=100) -> dict:
+    """ Builds a SolariBoard in a new scene and compares playback fps
+    with one expression per card and with the compiled nodes.
+    >>> benchmarkSolariBoard()
+    >>> {'expression': 8.1, 'nodes': 41.7}
+     """
+    import maya.cmds as cmds
+    import pymel.core as pm
+    from copied_hjk import SolariBoard
+    result = {}
+    for useNodes in [False, True]:
+        cmds.file(new=True, force=True)
+        cards = [pm.polyPlane(n=f"card{i}", ch=False)[0] \
+            for i in range(numberOfCards)]
+        ctrl = pm.circle(n="cc_solari", ch=False)[0]
+        SolariBoard(ctrl=ctrl, cards=cards, useNodes=useNodes)
+        cmds.playbackOptions(min=0, max=frames)
+        key = "nodes" if useNodes else "expression"
+        cmds.setAttr(f"{ctrl}.Var", 0)
+        cmds.setKeyframe(f"{ctrl}.Var", t=0, v=0)
+        cmds.setKeyframe(f"{ctrl}.Var", t=frames, v=numberOfCards)
+        result[key] = measureFps(0, frames)
+    print(result)
+    return result
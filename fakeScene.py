@@ -0,0 +1,2488 @@
+""" In-memory stand-in for the parts of Maya the rig tools call.
+
+It models transforms, joints, curves, meshes, skinClusters,
+attributes and connections, and provides the subset of pymel.core
+(and a little of maya.cmds) that general, hjk, quickRig, accuRig
+and rename use. Every command is counted and can be given a latency,
+so algorithms can be timed without a live Maya session.
+
+>>> import fakeScene
+>>> fakeScene.install(latency=20e-6)
+>>> import general
+>>> general.mirrorCopy(pm.group(em=True, n="cc_Left"))
+>>> fakeScene.STATS.counts
+"""
+import os
+import re
+import sys
+import math
+import time
+import types
+import importlib.util
+import fnmatch
+import functools
+import itertools
+from collections import Counter
+import numpy as np
+
+
+class MayaNodeError(Exception):
+    pass
+
+
+class Stats:
+    def __init__(self):
+        self.counts = Counter()
+        self.latency = 0.0
+        self.latencies = {}
+
+
+    def reset(self) -> None:
+        self.counts = Counter()
+
+
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+STATS = Stats()
+
+
+def wait(seconds: float) -> None:
+    """ time.sleep is too coarse for micro seconds, so spin. """
+    if seconds <= 0:
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def command(func):
+    """ Counts the command and adds its latency. """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        STATS.counts[func.__name__] += 1
+        wait(STATS.latencies.get(func.__name__, STATS.latency))
+        return func(*args, **kwargs)
+    return wrapper
+
+
+# ============================================================================
+# Matrix helpers. Column vectors, rotate order xyz.
+
+
+def eulerToMatrix(rotate, order: str="xyz") -> np.ndarray:
+    rx, ry, rz = np.radians(rotate)
+    cx, sx = math.cos(rx), math.sin(rx)
+    cy, sy = math.cos(ry), math.sin(ry)
+    cz, sz = math.cos(rz), math.sin(rz)
+    x = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    y = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    z = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    axes = {"x": x, "y": y, "z": z}
+    # Column vectors, the first axis of the order is on the right.
+    return axes[order[2]] @ axes[order[1]] @ axes[order[0]]
+
+
+def matrixToEuler(rot: np.ndarray) -> list:
+    ry = math.asin(max(-1.0, min(1.0, -rot[2, 0])))
+    if abs(rot[2, 0]) < 0.999999:
+        rx = math.atan2(rot[2, 1], rot[2, 2])
+        rz = math.atan2(rot[1, 0], rot[0, 0])
+    else:
+        rx = math.atan2(-rot[1, 2], rot[1, 1])
+        rz = 0.0
+    return [math.degrees(rx), math.degrees(ry), math.degrees(rz)]
+
+
+def compose(t, r, s, jo=(0, 0, 0), order: str="xyz") -> np.ndarray:
+    result = np.identity(4)
+    result[:3, :3] = eulerToMatrix(jo) @ eulerToMatrix(r, order) \
+        @ np.diag(s)
+    result[:3, 3] = t
+    return result
+
+
+def decompose(matrix: np.ndarray) -> tuple:
+    t = matrix[:3, 3].tolist()
+    basis = matrix[:3, :3]
+    s = np.linalg.norm(basis, axis=0)
+    s[s == 0] = 1.0
+    rot = basis / s
+    if np.linalg.det(rot) < 0:
+        s[0] *= -1
+        rot[:, 0] *= -1
+    return t, matrixToEuler(rot), s.tolist()
+
+
+# ============================================================================
+# Scene
+
+
+ALIAS = {
+    "t": "translate", "r": "rotate", "s": "scale", "v": "visibility",
+    "jo": "jointOrient", "liw": "lockInfluenceWeights",
+    "tx": "translateX", "ty": "translateY", "tz": "translateZ",
+    "rx": "rotateX", "ry": "rotateY", "rz": "rotateZ",
+    "sx": "scaleX", "sy": "scaleY", "sz": "scaleZ",
+    }
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+# Abstract types that -type also matches.
+DERIVED_TYPES = {"animCurve": ["animCurveTL", "animCurveTA", "animCurveTU"]}
+COMPOUND = ["translate", "rotate", "scale", "jointOrient", "rotatePivot",
+            "scalePivot", "color1", "color2", "output", "input1", "input2",
+            "outputT", "outputR", "outputS", "min", "max", "oldMin",
+            "oldMax", "value", "outValue", "rotateAxis"]
+DAG_TYPES = ["transform", "joint", "ikHandle", "ikEffector", "clusterHandle"]
+SHAPE_TYPES = ["mesh", "nurbsCurve", "locator", "nurbsSurface"]
+COMPONENT = re.compile(r"^(.+?)\.(vtx|cv|ep)\[(\d+)(?::(\d*))?\]$")
+
+
+class Node:
+    def __init__(self, name: str, nodeType: str):
+        self.name = name
+        self.type = nodeType
+        self.parent = None
+        self.children = []
+        self.attrs = {"visibility": 1.0}
+        self.userAttrs = []
+        self.points = None
+        self.data = {}
+        # {attr: {"lock": True, ...}}, what isn't here is the default.
+        self.flags = {}
+        if nodeType in DAG_TYPES:
+            for i in ["translate", "rotate", "jointOrient"]:
+                for axis in "XYZ":
+                    self.attrs[i + axis] = 0.0
+            for axis in "XYZ":
+                self.attrs["scale" + axis] = 1.0
+            self.attrs["lockInfluenceWeights"] = 0.0
+            self.attrs["rotateOrder"] = 0.0
+
+
+    def isDag(self) -> bool:
+        return self.type in DAG_TYPES or self.type in SHAPE_TYPES \
+            or "Constraint" in self.type
+
+
+    def vector(self, attr: str) -> list:
+        return [self.attrs.get(attr + i, 0.0) for i in "XYZ"]
+
+
+    def setVector(self, attr: str, values) -> None:
+        for axis, value in zip("XYZ", values):
+            self.attrs[attr + axis] = float(value)
+
+
+    def localMatrix(self) -> np.ndarray:
+        if self.type not in DAG_TYPES:
+            return np.identity(4)
+        order = ROTATE_ORDERS[int(self.attrs.get("rotateOrder", 0))]
+        return compose(self.vector("translate"), self.vector("rotate"),
+                       self.vector("scale"), self.vector("jointOrient"), order)
+
+
+    def offsetParent(self) -> np.ndarray:
+        """ offsetParentMatrix, stored as Maya's 16 row vector floats. """
+        values = self.attrs.get("offsetParentMatrix")
+        if values is None:
+            return np.identity(4)
+        return np.array(values, dtype=float).reshape(4, 4).T
+
+
+    def worldMatrix(self) -> np.ndarray:
+        matrix = self.offsetParent() @ self.localMatrix()
+        node = self.parent
+        while node:
+            matrix = node.offsetParent() @ node.localMatrix() @ matrix
+            node = node.parent
+        return matrix
+
+
+    def setLocalMatrix(self, matrix: np.ndarray) -> None:
+        t, r, s = decompose(matrix)
+        self.setVector("translate", t)
+        self.setVector("rotate", r)
+        self.setVector("scale", s)
+        self.setVector("jointOrient", (0, 0, 0))
+
+
+    def setWorldMatrix(self, matrix: np.ndarray) -> None:
+        parentWorld = self.parent.worldMatrix() if self.parent \
+            else np.identity(4)
+        self.setLocalMatrix(np.linalg.inv(parentWorld @ self.offsetParent()) \
+            @ matrix)
+
+
+    def shapes(self) -> list:
+        return [i for i in self.children if i.type in SHAPE_TYPES]
+
+
+    def descendants(self) -> list:
+        result = []
+        for i in self.children:
+            result.append(i)
+            result += i.descendants()
+        return result
+
+
+class Scene:
+    def __init__(self):
+        self.nodes = {}
+        self.selection = []
+        # destination plug -> source plug
+        self.connections = {}
+        self.settings = {"time": "film", "linear": "cm", "frame": 0, \
+            "min": 1.0, "max": 120.0}
+        # node name -> {callback id: (function, clientData)}
+        self.callbacks = {}
+
+
+    def unique(self, name: str) -> str:
+        name = name.split("|")[-1] or "node"
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        idx = 1
+        while f"{base}{idx}" in self.nodes:
+            idx += 1
+        return f"{base}{idx}"
+
+
+    def create(self, nodeType: str, name: str="", parent: Node=None) -> Node:
+        node = Node(self.unique(name or f"{nodeType}1"), nodeType)
+        self.nodes[node.name] = node
+        if parent:
+            self.reparent(node, parent)
+        return node
+
+
+    def get(self, name) -> Node:
+        if isinstance(name, Node):
+            return name
+        if isinstance(name, PyNode):
+            return name.node
+        name = str(name).split("|")[-1]
+        if name not in self.nodes:
+            raise MayaNodeError(f"No object matches name: {name}")
+        return self.nodes[name]
+
+
+    def reparent(self, node: Node, parent: Node=None) -> None:
+        if node.parent:
+            node.parent.children.remove(node)
+        node.parent = parent
+        if parent:
+            parent.children.append(node)
+
+
+    def remove(self, node: Node) -> None:
+        for i in list(node.children):
+            self.remove(i)
+        if node.parent:
+            node.parent.children.remove(node)
+        self.nodes.pop(node.name, None)
+        prefix = node.name + "."
+        for dst, src in list(self.connections.items()):
+            if dst.startswith(prefix) or src.startswith(prefix):
+                del self.connections[dst]
+        self.selection = [i for i in self.selection if i is not node]
+
+
+    def rename(self, node: Node, newName: str) -> None:
+        old = node.name
+        del self.nodes[old]
+        node.name = self.unique(newName)
+        self.nodes[node.name] = node
+        prefix = old + "."
+        for dst, src in list(self.connections.items()):
+            newDst = node.name + dst[len(old):] if dst.startswith(prefix) \
+                else dst
+            newSrc = node.name + src[len(old):] if src.startswith(prefix) \
+                else src
+            if (newDst, newSrc) != (dst, src):
+                del self.connections[dst]
+                self.connections[newDst] = newSrc
+
+
+SCENE = Scene()
+# Stand-ins for files on disk, {path: function that builds the scene}.
+FILES = {}
+SAVED = []
+
+
+def newScene() -> Scene:
+    global SCENE
+    SCENE = Scene()
+    UNDO_QUEUE.clear()
+    return SCENE
+
+
+# ============================================================================
+# PyNode
+
+
+class PyNode:
+    def __new__(cls, name, *args):
+        if cls is PyNode and isinstance(name, str) and "." in name:
+            return Attribute(name)
+        return super().__new__(cls)
+
+
+    def __init__(self, name, *args):
+        if isinstance(name, PyNode):
+            self.node = name.node
+        elif isinstance(name, Node):
+            self.node = name
+        else:
+            self.node = SCENE.get(name)
+
+
+    def __str__(self):
+        return self.node.name
+
+
+    def __repr__(self):
+        return f"nt.{self.node.type.capitalize()}('{self.node.name}')"
+
+
+    def __eq__(self, other):
+        if isinstance(other, PyNode):
+            return self.node is other.node
+        return self.node.name == str(other)
+
+
+    def __hash__(self):
+        return id(self.node)
+
+
+    def __lt__(self, other):
+        return str(self) < str(other)
+
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return Attribute(f"{self.node.name}.{attr}")
+
+
+    def name(self, long: bool=False) -> str:
+        return self.node.name
+
+
+    def nodeName(self) -> str:
+        return self.node.name
+
+
+    def type(self) -> str:
+        return self.node.type
+
+
+    def nodeType(self) -> str:
+        return self.node.type
+
+
+    def exists(self) -> bool:
+        return self.node.name in SCENE.nodes
+
+
+    def getParent(self):
+        return wrap(self.node.parent) if self.node.parent else None
+
+
+    def getChildren(self, **kwargs):
+        return [wrap(i) for i in self.node.children]
+
+
+    def listRelatives(self, **kwargs):
+        return listRelatives(self, **kwargs)
+
+
+    def getShape(self):
+        shapes = self.node.shapes()
+        return wrap(shapes[0]) if shapes else None
+
+
+    def getShapes(self):
+        return [wrap(i) for i in self.node.shapes()]
+
+
+    def getRotation(self):
+        return self.node.vector("rotate")
+
+
+    def getTranslation(self, space: str="object"):
+        if space == "world":
+            return self.node.worldMatrix()[:3, 3].tolist()
+        return self.node.vector("translate")
+
+
+    def isReferenced(self) -> bool:
+        return False
+
+
+    # pymel nodes are used as names in string formatting and slicing.
+    def replace(self, *args):
+        return self.node.name.replace(*args)
+
+
+    def startswith(self, *args):
+        return self.node.name.startswith(*args)
+
+
+    def endswith(self, *args):
+        return self.node.name.endswith(*args)
+
+
+    def split(self, *args):
+        return self.node.name.split(*args)
+
+
+    def rsplit(self, *args):
+        return self.node.name.rsplit(*args)
+
+
+    def __contains__(self, text):
+        return text in self.node.name
+
+
+class Attribute:
+    def __init__(self, plug: str):
+        self.plug = str(plug)
+
+
+    def __str__(self):
+        return self.plug
+
+
+    def __repr__(self):
+        return f"Attribute('{self.plug}')"
+
+
+    def get(self):
+        return getAttr(self.plug)
+
+
+    def set(self, *args, **kwargs):
+        return setAttr(self.plug, *args, **kwargs)
+
+
+    def connect(self, other, **kwargs):
+        return connectAttr(self.plug, other, **kwargs)
+
+
+    def node(self):
+        return PyNode(self.plug.split(".", 1)[0])
+
+
+class Component(str):
+    """ A vertex or cv, like 'pPlane1.vtx[3]'. """
+    def name(self) -> str:
+        return str(self)
+
+
+    def node(self):
+        return PyNode(COMPONENT.match(self).group(1))
+
+
+def wrap(node: Node):
+    return PyNode(node)
+
+
+def asNames(args) -> list:
+    """ Flattens lists of names and PyNodes. """
+    result = []
+    for i in args:
+        if isinstance(i, (list, tuple, set)):
+            result += asNames(i)
+        elif i is not None:
+            result.append(i)
+    return result
+
+
+# ============================================================================
+# Plugs
+
+
+def splitPlug(plug) -> tuple:
+    plug = str(plug)
+    name, attr = plug.split(".", 1)
+    attr = ALIAS.get(attr, attr)
+    return SCENE.get(name), attr
+
+
+def readAttr(node: Node, attr: str):
+    if attr == "matrix" and node.type in DAG_TYPES:
+        return node.localMatrix().T.ravel().tolist()
+    if attr == "offsetParentMatrix" and node.type in DAG_TYPES:
+        return node.offsetParent().T.ravel().tolist()
+    if attr in COMPOUND and attr + "X" in node.attrs:
+        return node.vector(attr)
+    if attr not in node.attrs:
+        raise MayaNodeError(f"No attribute: {node.name}.{attr}")
+    return node.attrs[attr]
+
+
+FLAG_NAMES = {"l": "lock", "lock": "lock", "k": "keyable", \
+    "keyable": "keyable", "cb": "channelBox", "channelBox": "channelBox"}
+FLAG_DEFAULTS = {"lock": False, "keyable": True, "channelBox": False}
+ANGLE_ATTRS = ["rotate", "jointOrient", "rotateAxis"]
+DISTANCE_ATTRS = ["translate", "rotatePivot", "scalePivot"]
+
+
+def plugFlag(node: Node, attr: str, flag: str) -> bool:
+    """ A locked compound locks its children. """
+    if flag in node.flags.get(attr, {}):
+        return node.flags[attr][flag]
+    if flag == "lock" and attr[-1:] in ["X", "Y", "Z"] \
+            and node.flags.get(attr[:-1], {}).get("lock"):
+        return True
+    return FLAG_DEFAULTS[flag]
+
+
+def isLocked(node: Node, attr: str) -> bool:
+    children = [attr + i for i in "XYZ" if attr + i in node.attrs]
+    return any(plugFlag(node, i, "lock") for i in [attr] + children)
+
+
+@command
+def getAttr(plug, **kwargs):
+    node, attr = splitPlug(plug)
+    for key, flag in FLAG_NAMES.items():
+        if kwargs.get(key):
+            return plugFlag(node, attr, flag)
+    return readAttr(node, attr)
+
+
+CONTROL_POINTS = re.compile(r"^(?:controlPoints|cp)\[(\d+)(?::(\d+))?\]$")
+WEIGHT_LIST = re.compile( \
+    r"^(?:weightList|wl)\[(\d+)\]\.(?:weights|w)\[(\d+)(?::(\d+))?\]$")
+
+
+@command
+def setAttr(plug, *values, **kwargs):
+    node, attr = splitPlug(plug)
+    match = CONTROL_POINTS.match(attr)
+    if match and node.points is not None:
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        rows = np.asarray(values, dtype=float).reshape(-1, 3)
+        node.points[start : end + 1] = rows
+        setDirty(node)
+        return
+    match = WEIGHT_LIST.match(attr)
+    if match and node.type == "skinCluster":
+        row, start = int(match.group(1)), int(match.group(2))
+        end = int(match.group(3) or start)
+        for logical, value in zip(range(start, end + 1), values):
+            column = influenceColumn(node, logical)
+            node.data["weights"][row, column] = float(value)
+        return
+    flags = {FLAG_NAMES[k]: bool(v) for k, v in kwargs.items() \
+        if k in FLAG_NAMES}
+    if not values or kwargs.get("e") or kwargs.get("edit"):
+        if attr not in node.attrs and attr + "X" not in node.attrs:
+            raise MayaNodeError(f"No attribute: {plug}")
+        node.flags.setdefault(attr, {}).update(flags)
+        return
+    if isLocked(node, attr) and flags.get("lock") is not False:
+        raise RuntimeError(f"The attribute '{plug}' is locked " \
+            "or connected and cannot be modified.")
+    value = values[0] if len(values) == 1 else values
+    if kwargs.get("type") == "matrix":
+        node.attrs[attr] = np.asarray(value, dtype=float).ravel().tolist()
+    elif isinstance(value, (list, tuple)):
+        node.setVector(attr, value)
+    else:
+        node.attrs[attr] = float(value) if \
+            isinstance(value, (int, float, bool)) else value
+    if flags:
+        node.flags.setdefault(attr, {}).update(flags)
+
+
+@command
+def addAttr(node, ln: str="", **kwargs):
+    node = SCENE.get(node)
+    node.attrs[ln] = float(kwargs.get("dv", 0))
+    node.userAttrs.append(ln)
+
+
+@command
+def deleteAttr(plug, **kwargs):
+    node, attr = splitPlug(plug)
+    node.attrs.pop(attr, None)
+
+
+@command
+def attributeQuery(attr: str, node=None, ex: bool=False, **kwargs):
+    node = SCENE.get(node)
+    attr = ALIAS.get(attr, attr)
+    return attr in node.attrs or attr + "X" in node.attrs
+
+
+@command
+def connectAttr(source, destination, f: bool=False, **kwargs):
+    srcNode, srcAttr = splitPlug(source)
+    dstNode, dstAttr = splitPlug(destination)
+    dst = f"{dstNode.name}.{dstAttr}"
+    if dst in SCENE.connections and not f:
+        raise RuntimeError(f"{dst} is already connected.")
+    SCENE.connections[dst] = f"{srcNode.name}.{srcAttr}"
+
+
+@command
+def disconnectAttr(source, destination=None, **kwargs):
+    dstNode, dstAttr = splitPlug(destination)
+    dst = f"{dstNode.name}.{dstAttr}"
+    if dst not in SCENE.connections:
+        raise RuntimeError(f"{dst} is not connected.")
+    del SCENE.connections[dst]
+
+
+@command
+def listConnections(obj, s: bool=True, d: bool=True, type: str="", \
+                    **kwargs) -> list:
+    """ With c and p, [own plug, other plug, ...] like Maya. """
+    result = []
+    pairs = []
+    for obj in asNames([obj]):
+        obj = str(obj)
+        name = obj.split(".", 1)[0]
+        for dst, src in SCENE.connections.items():
+            if s and (dst == obj or dst.startswith(name + ".")):
+                result.append(src.split(".", 1)[0])
+                pairs += [dst, src]
+            if d and (src == obj or src.startswith(name + ".")):
+                result.append(dst.split(".", 1)[0])
+                pairs += [src, dst]
+    if (kwargs.get("c") or kwargs.get("connections")) \
+            and (kwargs.get("p") or kwargs.get("plugs")):
+        return pairs
+    nodes = [SCENE.nodes[i] for i in dict.fromkeys(result) if i in SCENE.nodes]
+    if type:
+        nodes = [i for i in nodes if i.type == type \
+            or i.type in DERIVED_TYPES.get(type, [])]
+    return [wrap(i) for i in nodes]
+
+
+# ============================================================================
+# Query
+
+
+def matchNames(pattern: str) -> list:
+    pattern = str(pattern)
+    match = COMPONENT.match(pattern)
+    if match:
+        return [pattern]
+    if any(c in pattern for c in "*?["):
+        return [SCENE.nodes[i] for i in fnmatch.filter(SCENE.nodes, pattern)]
+    name = pattern.split("|")[-1]
+    return [SCENE.nodes[name]] if name in SCENE.nodes else []
+
+
+def componentEnd(obj: str, start: str, end) -> int:
+    """ cv[3] ends at 3, cv[0:] ends at the last point. """
+    if end is None:
+        return int(start)
+    if end == "":
+        node = SCENE.get(obj)
+        shape = node if node.type in SHAPE_TYPES else node.shapes()[0]
+        return len(shape.points) - 1
+    return int(end)
+
+
+def expandComponents(name: str) -> list:
+    match = COMPONENT.match(name)
+    obj, kind, start, end = match.groups()
+    end = componentEnd(obj, start, end)
+    return [f"{obj}.{kind}[{i}]" for i in range(int(start), end + 1)]
+
+
+@command
+def ls(*args, sl: bool=False, fl: bool=False, type=None, dag: bool=False, \
+       o: bool=False, **kwargs) -> list:
+    if sl or kwargs.get("selection"):
+        items = list(SCENE.selection)
+    elif args:
+        items = []
+        for i in asNames(args):
+            items += matchNames(i)
+    else:
+        items = list(SCENE.nodes.values())
+    result = []
+    for i in items:
+        if isinstance(i, str):
+            if o:
+                i = SCENE.get(COMPONENT.match(i).group(1))
+                shapes = i.shapes()
+                result.append(shapes[0] if shapes else i)
+            elif fl:
+                result += expandComponents(i)
+            else:
+                result.append(i)
+            continue
+        result.append(i)
+        if dag:
+            result += i.descendants()
+    if type:
+        types_ = [type] if isinstance(type, str) else list(type)
+        result = [i for i in result if isinstance(i, Node) and (
+            i.type in types_ or ("transform" in types_ and i.type in DAG_TYPES)
+            )]
+    unique = []
+    for i in result:
+        if i not in unique:
+            unique.append(i)
+    return [wrap(i) if isinstance(i, Node) else Component(i) for i in unique]
+
+
+def selected(**kwargs) -> list:
+    return ls(sl=True, **kwargs)
+
+
+@command
+def objExists(name) -> bool:
+    name = str(name)
+    if "." in name and not COMPONENT.match(name):
+        try:
+            node, attr = splitPlug(name)
+        except MayaNodeError:
+            return False
+        return attr in node.attrs or attr + "X" in node.attrs
+    return bool(matchNames(name))
+
+
+@command
+def objectType(name, **kwargs) -> str:
+    return SCENE.get(name).type
+
+
+@command
+def nodeType(name, **kwargs) -> str:
+    names = asNames([name])
+    if not names:
+        return None
+    return SCENE.get(names[0]).type
+
+
+@command
+def listRelatives(*args, p: bool=False, s: bool=False, c: bool=False, \
+                  ad: bool=False, type=None, **kwargs) -> list:
+    result = []
+    for name in asNames(args):
+        node = SCENE.get(name)
+        if p or kwargs.get("parent"):
+            result += [node.parent] if node.parent else []
+        elif s or kwargs.get("shapes"):
+            result += node.shapes()
+        elif ad or kwargs.get("allDescendents"):
+            result += node.descendants()
+        else:
+            result += node.children
+    if type:
+        result = [i for i in result if i.type == type]
+    return [wrap(i) for i in result]
+
+
+@command
+def listHistory(*args, type: str="", **kwargs) -> list:
+    result = []
+    for name in asNames(args):
+        name = str(name)
+        match = COMPONENT.match(name)
+        node = SCENE.get(match.group(1) if match else name)
+        if not node.isDag():
+            # A deformer, its inputs like blendShape targets.
+            result += node.data.get("history", [])
+            continue
+        shapes = node.shapes() if node.type not in SHAPE_TYPES else [node]
+        for shape in shapes:
+            result += shape.data.get("history", [])
+            result.append(shape)
+    result = [i for i in result if i.name in SCENE.nodes]
+    if type:
+        result = [i for i in result if i.type == type]
+    return [wrap(i) for i in dict.fromkeys(result)]
+
+
+# ============================================================================
+# Selection and messages
+
+
+@command
+def select(*args, cl: bool=False, add: bool=False, af: bool=False, \
+           hi: bool=False, tgl: bool=False, **kwargs) -> None:
+    if cl or kwargs.get("clear"):
+        SCENE.selection = []
+        return
+    items = []
+    for i in asNames(args):
+        found = matchNames(i)
+        if not found:
+            raise MayaNodeError(f"No object matches name: {i}")
+        for j in found:
+            items.append(j)
+            if hi and isinstance(j, Node):
+                items += j.descendants()
+    if add or af or tgl:
+        SCENE.selection += [i for i in items if i not in SCENE.selection]
+    else:
+        SCENE.selection = items
+
+
+@command
+def warning(*args, **kwargs) -> None:
+    pass
+
+
+@command
+def displayInfo(*args, **kwargs) -> None:
+    pass
+
+
+# ============================================================================
+# Creation
+
+
+def componentPoints(name: str):
+    """ Returns the shape and the indices of a component name. """
+    match = COMPONENT.match(str(name))
+    obj, kind, start, end = match.groups()
+    node = SCENE.get(obj)
+    shape = node if node.type in SHAPE_TYPES else node.shapes()[0]
+    end = componentEnd(obj, start, end)
+    return shape, list(range(int(start), end + 1))
+
+
+def createShape(transform: Node, shapeType: str, points) -> Node:
+    shape = SCENE.create(shapeType, f"{transform.name}Shape", transform)
+    shape.points = np.asarray(points, dtype=float).reshape(-1, 3)
+    return shape
+
+
+@command
+def group(*args, em: bool=False, n: str="", w: bool=False, p=None, \
+          **kwargs) -> PyNode:
+    name = n or kwargs.get("name", "") or "group1"
+    parent = SCENE.get(p) if p else None
+    grp = SCENE.create("transform", name, parent)
+    if not em:
+        children = [SCENE.get(i) for i in asNames(args)] or \
+            [i for i in SCENE.selection if isinstance(i, Node)]
+        if children and children[0].parent and not parent:
+            SCENE.reparent(grp, children[0].parent)
+        for child in children:
+            world = child.worldMatrix()
+            SCENE.reparent(child, grp)
+            child.setWorldMatrix(world)
+    return wrap(grp)
+
+
+@command
+def createNode(nodeType: str, n: str="", p=None, **kwargs) -> PyNode:
+    parent = SCENE.get(p) if p else None
+    return wrap(SCENE.create(nodeType, n or kwargs.get("name", ""), parent))
+
+
+@command
+def shadingNode(nodeType: str, n: str="", **kwargs) -> PyNode:
+    node = SCENE.create(nodeType, n or kwargs.get("name", ""))
+    return wrap(node)
+
+
+@command
+def joint(*args, p=(0, 0, 0), n: str="", e: bool=False, **kwargs):
+    if e or kwargs.get("edit"):
+        # Orienting only changes jointOrient, which is not modeled.
+        return None
+    parent = None
+    joints = [i for i in SCENE.selection if isinstance(i, Node) \
+        and i.type == "joint"]
+    if joints:
+        parent = joints[-1]
+    node = SCENE.create("joint", n or kwargs.get("name", "") or "joint1", \
+        parent)
+    orient = kwargs.get("o", kwargs.get("orientation"))
+    if orient is None:
+        node.setWorldMatrix(compose(p, (0, 0, 0), (1, 1, 1)))
+    else:
+        parentWorld = parent.worldMatrix() if parent else np.identity(4)
+        local = np.linalg.inv(parentWorld) @ np.append(p, 1.0)
+        node.setVector("translate", local[:3])
+        node.setVector("jointOrient", orient)
+    SCENE.selection = [node]
+    return wrap(node)
+
+
+@command
+def spaceLocator(n: str="", p=(0, 0, 0), **kwargs) -> PyNode:
+    node = SCENE.create("transform", n or kwargs.get("name", "") or "locator1")
+    createShape(node, "locator", [(0, 0, 0)])
+    node.setVector("translate", p)
+    SCENE.selection = [node]
+    return wrap(node)
+
+
+@command
+def curve(p=(), ep=(), d: int=3, n: str="", **kwargs) -> PyNode:
+    """ ep points are used as cvs. """
+    node = SCENE.create("transform", n or kwargs.get("name", "") or "curve1")
+    shape = createShape(node, "nurbsCurve", list(p) or list(ep))
+    shape.data["degree"] = min(d, len(shape.points) - 1)
+    return wrap(node)
+
+
+@command
+def circle(nr=(0, 0, 1), r: float=1.0, s: int=8, n: str="", **kwargs):
+    node = SCENE.create("transform", n or kwargs.get("name", "") or "nurbsCircle1")
+    angles = np.linspace(0, 2 * np.pi, s, endpoint=False)
+    points = np.stack([np.cos(angles), np.sin(angles), np.zeros(s)], 1) * r
+    normal = np.asarray(nr, dtype=float)
+    if abs(normal[0]) > 0.5:
+        points = points[:, [2, 1, 0]]
+    elif abs(normal[1]) > 0.5:
+        points = points[:, [0, 2, 1]]
+    createShape(node, "nurbsCurve", points)
+    return [wrap(node), None]
+
+
+def polyGrid(name: str, points, faces) -> list:
+    node = SCENE.create("transform", name)
+    shape = createShape(node, "mesh", points)
+    shape.data["faces"] = faces
+    return [wrap(node), None]
+
+
+@command
+def polyPlane(n: str="", sx: int=10, sy: int=10, w: float=1.0, \
+              h: float=1.0, **kwargs) -> list:
+    x, z = np.meshgrid(np.linspace(-w / 2, w / 2, sx + 1), \
+        np.linspace(-h / 2, h / 2, sy + 1))
+    points = np.stack([x.ravel(), np.zeros(x.size), z.ravel()], 1)
+    faces = []
+    for j in range(sy):
+        for i in range(sx):
+            a = j * (sx + 1) + i
+            faces.append([a, a + sx + 1, a + sx + 2, a + 1])
+    return polyGrid(n or "pPlane1", points, faces)
+
+
+@command
+def polySphere(n: str="", r: float=1.0, sx: int=20, sy: int=20, **kwargs):
+    theta, phi = np.meshgrid(np.linspace(0, 2 * np.pi, sx, endpoint=False), \
+        np.linspace(0, np.pi, sy + 1)[1:-1])
+    ring = np.stack([np.sin(phi) * np.cos(theta), np.cos(phi), \
+        np.sin(phi) * np.sin(theta)], -1).reshape(-1, 3)
+    points = np.vstack([[0, 1, 0], ring, [0, -1, 0]]) * r
+    return polyGrid(n or "pSphere1", points, [])
+
+
+def vertexNormals(shape: Node) -> np.ndarray:
+    """ Object space. Face normals added up per vertex,
+    meshes without faces point away from their center.
+     """
+    points = shape.points
+    faces = shape.data.get("faces", [])
+    if not faces:
+        return points - points.mean(axis=0)
+    normals = np.zeros_like(points)
+    for face in faces:
+        corners = points[face]
+        normal = np.cross(corners - corners.mean(axis=0), \
+            np.roll(corners, -1, axis=0) - corners.mean(axis=0)).sum(axis=0)
+        normals[face] += normal
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.where(length == 0, 1.0, length)
+
+
+@command
+def polyNormalPerVertex(*args, q: bool=False, **kwargs) -> list:
+    """ One normal per vertex instead of one per face-vertex. """
+    shape, indices = componentPoints(asNames(args)[0])
+    rot = shape.parent.worldMatrix()[:3, :3]
+    normals = vertexNormals(shape)[indices] @ rot.T
+    return normals.ravel().tolist()
+
+
+# ============================================================================
+# Transforms
+
+
+def worldPosition(name) -> list:
+    name = str(name)
+    if COMPONENT.match(name):
+        shape, indices = componentPoints(name)
+        world = shape.parent.worldMatrix()
+        point = np.append(shape.points[indices[0]], 1.0)
+        return (world @ point)[:3].tolist()
+    return SCENE.get(name).worldMatrix()[:3, 3].tolist()
+
+
+@command
+def pointPosition(name, w: bool=True, **kwargs) -> list:
+    if not COMPONENT.match(str(name)):
+        raise RuntimeError(f"{name} is not a point.")
+    return worldPosition(name)
+
+
+@command
+def xform(*args, q: bool=False, ws: bool=False, os: bool=False, \
+          t=None, rp=None, ro=None, m=None, bb: bool=False, piv=None, \
+          **kwargs):
+    names = asNames(args) or [i for i in SCENE.selection]
+    if q or kwargs.get("query"):
+        name = names[0]
+        if bb:
+            points = []
+            for i in names:
+                if COMPONENT.match(str(i)):
+                    points.append(worldPosition(i))
+                    continue
+                node = SCENE.get(i)
+                for shape in [node] + node.descendants():
+                    if shape.points is None:
+                        continue
+                    world = shape.parent.worldMatrix()
+                    homo = np.hstack([shape.points, \
+                        np.ones((len(shape.points), 1))])
+                    points += (homo @ world.T)[:, :3].tolist()
+            if not points:
+                points = [worldPosition(names[0])]
+            points = np.asarray(points)
+            return points.min(0).tolist() + points.max(0).tolist()
+        if t or rp or kwargs.get("translation") or kwargs.get("rotatePivot"):
+            if ws:
+                return worldPosition(name)
+            return SCENE.get(name).vector("translate")
+        if m or kwargs.get("matrix"):
+            # Maya matrices are row vectors, the transpose of these.
+            node = SCENE.get(name)
+            matrix = node.worldMatrix() if ws else node.localMatrix()
+            return matrix.T.ravel().tolist()
+        if kwargs.get("rotation") or kwargs.get("r"):
+            node = SCENE.get(name)
+            if ws:
+                return decompose(node.worldMatrix())[1]
+            return node.vector("rotate")
+        return worldPosition(name)
+    for name in names:
+        node = SCENE.get(name)
+        if t is not None:
+            if ws:
+                world = node.worldMatrix()
+                world[:3, 3] = t
+                node.setWorldMatrix(world)
+            else:
+                node.setVector("translate", t)
+        if m is not None:
+            matrix = np.asarray(m, dtype=float).reshape(4, 4).T
+            if ws:
+                node.setWorldMatrix(matrix)
+            else:
+                node.setLocalMatrix(matrix)
+        if ro is not None or kwargs.get("rotation") is not None:
+            node.setVector("rotate", ro if ro is not None else kwargs["rotation"])
+
+
+def splitValues(args) -> tuple:
+    """ move(1, 2, 3, obj) and move(obj, (1, 2, 3)) are both valid. """
+    numbers = [i for i in args if isinstance(i, (int, float))]
+    rest = [i for i in args if not isinstance(i, (int, float))]
+    names = []
+    values = numbers
+    for i in rest:
+        if isinstance(i, (list, tuple)) and i and \
+                all(isinstance(j, (int, float)) for j in i):
+            values = list(i)
+        else:
+            names += asNames([i])
+    names = names or list(SCENE.selection)
+    return values, names
+
+
+@command
+def move(*args, r: bool=False, ws: bool=False, os: bool=False, **kwargs):
+    values, names = splitValues(args)
+    for name in names:
+        if isinstance(name, str) and COMPONENT.match(name):
+            shape, indices = componentPoints(name)
+            world = shape.parent.worldMatrix()
+            inverse = np.linalg.inv(world)
+            for idx in indices:
+                if r:
+                    shape.points[idx] += values
+                else:
+                    point = inverse @ np.append(values, 1.0)
+                    shape.points[idx] = point[:3]
+            setDirty(shape)
+            continue
+        if "." in str(name):
+            continue
+        node = SCENE.get(name)
+        if r:
+            node.setVector("translate", np.add(node.vector("translate"), values))
+        elif ws:
+            world = node.worldMatrix()
+            world[:3, 3] = values
+            node.setWorldMatrix(world)
+        else:
+            node.setVector("translate", values)
+
+
+@command
+def rotate(*args, r: bool=False, **kwargs):
+    values, names = splitValues(args)
+    for name in names:
+        node = SCENE.get(name)
+        if r:
+            values = np.add(node.vector("rotate"), values)
+        node.setVector("rotate", values)
+
+
+@command
+def scale(*args, r: bool=False, **kwargs):
+    values, names = splitValues(args)
+    for name in names:
+        node = SCENE.get(name)
+        if r:
+            values = np.multiply(node.vector("scale"), values)
+        node.setVector("scale", values)
+
+
+@command
+def matchTransform(target, source, pos: bool=False, rot: bool=False, \
+                   scl: bool=False, **kwargs) -> None:
+    target = SCENE.get(target)
+    source = SCENE.get(source)
+    everything = not (pos or rot or scl)
+    t, r, s = decompose(target.worldMatrix())
+    st, sr, ss = decompose(source.worldMatrix())
+    if pos or everything:   t = st
+    if rot or everything:   r = sr
+    if scl or everything:   s = ss
+    target.setWorldMatrix(compose(t, r, s))
+
+
+@command
+def makeIdentity(*args, a: bool=False, t: bool=True, r: bool=True, \
+                 s: bool=True, jo: bool=False, **kwargs) -> None:
+    """ Freezes the local transform into the shapes and children. """
+    for name in asNames(args) or list(SCENE.selection):
+        node = SCENE.get(name)
+        if jo or node.type not in DAG_TYPES:
+            continue
+        local = node.localMatrix()
+        tt = [0, 0, 0] if t else node.vector("translate")
+        rr = [0, 0, 0] if r else node.vector("rotate")
+        ss = [1, 1, 1] if s else node.vector("scale")
+        frozen = compose(tt, rr, ss)
+        bake = np.linalg.inv(frozen) @ local
+        for child in node.children:
+            if child.points is not None:
+                homo = np.hstack([child.points, np.ones((len(child.points), 1))])
+                child.points = (homo @ bake.T)[:, :3]
+                setDirty(child)
+            elif child.type in DAG_TYPES:
+                child.setLocalMatrix(bake @ child.localMatrix())
+        node.setVector("translate", tt)
+        node.setVector("rotate", rr)
+        node.setVector("scale", ss)
+
+
+@command
+def parent(*args, w: bool=False, r: bool=False, s: bool=False, **kwargs):
+    names = list(args)
+    if w or kwargs.get("world"):
+        target = None
+        children = asNames(names)
+    else:
+        target = names.pop()
+        if isinstance(target, (list, tuple)):
+            if not target:
+                raise RuntimeError("No parent given.")
+            target = target[0]
+        children = asNames(names)
+        target = SCENE.get(target)
+    result = []
+    for child in children:
+        child = SCENE.get(child)
+        if child.parent is target:
+            # pymel skips them instead of raising like maya.cmds.
+            result.append(wrap(child))
+            continue
+        world = child.worldMatrix()
+        SCENE.reparent(child, target)
+        if child.type in DAG_TYPES:
+            child.setWorldMatrix(world)
+        result.append(wrap(child))
+    return result
+
+
+@command
+def duplicate(*args, rr: bool=False, n: str="", **kwargs) -> list:
+    result = []
+    for name in asNames(args) or list(SCENE.selection):
+        source = SCENE.get(name)
+        copy = copyNode(source, source.parent, n or kwargs.get("name", ""))
+        result.append(wrap(copy))
+    return result
+
+
+def copyNode(source: Node, parent: Node, name: str="") -> Node:
+    copy = SCENE.create(source.type, name or source.name, parent)
+    copy.attrs = dict(source.attrs)
+    copy.userAttrs = list(source.userAttrs)
+    if source.points is not None:
+        copy.points = source.points.copy()
+    copy.data = {k: v for k, v in source.data.items() if k != "history"}
+    for child in source.children:
+        if "Constraint" in child.type:
+            continue
+        childName = child.name.replace(source.name, copy.name, 1)
+        copyNode(child, copy, childName)
+    return copy
+
+
+@command
+def rename(name, newName: str) -> PyNode:
+    node = SCENE.get(name)
+    SCENE.rename(node, str(newName))
+    return wrap(node)
+
+
+@command
+def delete(*args, cn: bool=False, **kwargs) -> None:
+    names = asNames(args) or list(SCENE.selection)
+    nodes = []
+    for name in names:
+        found = matchNames(name)
+        if not found:
+            raise MayaNodeError(f"No object matches name: {name}")
+        nodes += [i for i in found if isinstance(i, Node)]
+    for node in nodes:
+        if node.name not in SCENE.nodes:
+            continue
+        if cn:
+            for child in list(node.children):
+                if "Constraint" in child.type:
+                    SCENE.remove(child)
+        else:
+            SCENE.remove(node)
+
+
+@command
+def transformLimits(*args, **kwargs) -> None:
+    pass
+
+
+@command
+def rebuildCurve(*args, **kwargs) -> list:
+    return [PyNode(asNames(args)[0])]
+
+
+# ============================================================================
+# Rigging nodes
+
+
+def createConstraint(constraintType: str, args, kwargs) -> list:
+    names = asNames(args)
+    target = SCENE.get(names[-1])
+    node = SCENE.create(constraintType, f"{target.name}_{constraintType}1", \
+        target)
+    node.data["targets"] = [str(i) for i in names[:-1]]
+    for idx, driver in enumerate(node.data["targets"]):
+        plug = f"{node.name}.target[{idx}].targetParentMatrix"
+        SCENE.connections[plug] = f"{SCENE.get(driver).name}.parentMatrix[0]"
+    outputs = {
+        "parentConstraint": ["translate", "rotate"],
+        "pointConstraint": ["translate"],
+        "orientConstraint": ["rotate"],
+        "scaleConstraint": ["scale"],
+        "aimConstraint": ["rotate"],
+        "poleVectorConstraint": ["poleVector"],
+        }
+    for attr in outputs.get(constraintType, []):
+        output = "constraint" + attr[0].upper() + attr[1:]
+        SCENE.connections[f"{target.name}.{attr}"] = f"{node.name}.{output}"
+    return [wrap(node)]
+
+
+@command
+def parentConstraint(*args, **kwargs):
+    return createConstraint("parentConstraint", args, kwargs)
+
+
+@command
+def pointConstraint(*args, **kwargs):
+    return createConstraint("pointConstraint", args, kwargs)
+
+
+@command
+def orientConstraint(*args, **kwargs):
+    return createConstraint("orientConstraint", args, kwargs)
+
+
+@command
+def scaleConstraint(*args, **kwargs):
+    return createConstraint("scaleConstraint", args, kwargs)
+
+
+@command
+def aimConstraint(*args, **kwargs):
+    return createConstraint("aimConstraint", args, kwargs)
+
+
+@command
+def poleVectorConstraint(*args, **kwargs):
+    return createConstraint("poleVectorConstraint", args, kwargs)
+
+
+@command
+def cluster(*args, n: str="", **kwargs) -> list:
+    """ The handle doesn't deform anything. """
+    deformer = SCENE.create("cluster", n or "cluster1")
+    handle = SCENE.create("clusterHandle", f"{deformer.name}Handle")
+    return [wrap(deformer), wrap(handle)]
+
+
+@command
+def ikHandle(sj=None, ee=None, n: str="", **kwargs) -> list:
+    handle = SCENE.create("ikHandle", n or "ikHandle1")
+    handle.setWorldMatrix(SCENE.get(ee).worldMatrix())
+    effector = SCENE.create("ikEffector", "effector1", SCENE.get(ee).parent)
+    return [wrap(handle), wrap(effector)]
+
+
+@command
+def skinCluster(*args, e: bool=False, q: bool=False, ri=None, \
+                **kwargs):
+    """ Binds with every vertex weighted to the first influence. """
+    if e or kwargs.get("edit"):
+        skin = SCENE.get(asNames(args)[0])
+        if skin.type != "skinCluster":
+            skin = SCENE.get(listHistory(skin, type="skinCluster")[0])
+        removed = [] if ri is None else [str(i) for i in asNames([ri])]
+        for name in removed:
+            influences = skin.data["influences"]
+            if name not in influences:
+                raise RuntimeError(f"{name} is not an influence.")
+            for dst, src in list(SCENE.connections.items()):
+                if src == f"{name}.worldMatrix[0]" \
+                        and dst.startswith(f"{skin.name}.matrix["):
+                    del SCENE.connections[dst]
+            idx = influences.index(name)
+            weights = np.delete(skin.data["weights"], idx, axis=1)
+            total = weights.sum(1, keepdims=True)
+            total[total == 0] = 1.0
+            skin.data["weights"] = weights / total
+            influences.pop(idx)
+        if kwargs.get("ai") is not None:
+            skin.data["influences"].append(str(kwargs["ai"]))
+            connectInfluence(skin, SCENE.get(kwargs["ai"]))
+            weights = skin.data["weights"]
+            skin.data["weights"] = np.hstack([weights, \
+                np.zeros((len(weights), 1))])
+        if kwargs.get("siv") is not None:
+            idx = skin.data["influences"].index(str(kwargs["siv"]))
+            mesh = skin.data["mesh"]
+            vertices = np.nonzero(skin.data["weights"][:, idx] > 0)[0]
+            SCENE.selection = [f"{mesh.parent.name}.vtx[{i}]" for i in vertices]
+        return None
+    if q or kwargs.get("query"):
+        skin = SCENE.get(asNames(args)[0])
+        return [wrap(SCENE.get(i)) for i in skin.data["influences"]]
+    names = asNames(args)
+    joints = [SCENE.get(i) for i in names if SCENE.get(i).type == "joint"]
+    geo = [SCENE.get(i) for i in names if SCENE.get(i).type != "joint"][0]
+    shape = geo.shapes()[0]
+    skin = SCENE.create("skinCluster", "skinCluster1")
+    skin.data["influences"] = [i.name for i in joints]
+    skin.data["mesh"] = shape
+    weights = np.zeros((len(shape.points), len(joints)))
+    weights[:, 0] = 1.0
+    skin.data["weights"] = weights
+    for jnt in joints:
+        connectInfluence(skin, jnt)
+    shape.data.setdefault("history", []).append(skin)
+    return wrap(skin)
+
+
+def influenceColumn(skin: Node, logical: int) -> int:
+    """ The weights column of the influence on matrix[logical]. """
+    source = SCENE.connections[f"{skin.name}.matrix[{logical}]"]
+    return skin.data["influences"].index(source.split(".", 1)[0])
+
+
+def influenceIndex(skin: Node, name: str) -> int:
+    """ The logical index of the matrix plug of an influence. """
+    for dst, src in SCENE.connections.items():
+        if src == f"{name}.worldMatrix[0]" \
+                and dst.startswith(f"{skin.name}.matrix["):
+            return int(dst[dst.index("[") + 1 : -1])
+    raise RuntimeError(f"{name} is not an influence.")
+
+
+def connectInfluence(skin: Node, jnt: Node) -> None:
+    index = skin.data.get("nextMatrix", 0)
+    skin.data["nextMatrix"] = index + 1
+    plug = f"{skin.name}.matrix[{index}]"
+    SCENE.connections[plug] = f"{jnt.name}.worldMatrix[0]"
+
+
+@command
+def blendShape(*args, n: str="blendShape1", **kwargs) -> list:
+    """ The last object is the base, the others are targets. """
+    names = asNames(args) or list(SCENE.selection)
+    nodes = [SCENE.get(i) for i in names]
+    base = nodes[-1].shapes()[0]
+    node = SCENE.create("blendShape", n)
+    node.data["history"] = [i.shapes()[0] for i in nodes[:-1]] + [base]
+    base.data.setdefault("history", []).append(node)
+    return [wrap(node)]
+
+
+@command
+def skinPercent(skin, *components, tv=None, transformValue=None, \
+                q: bool=False, v: bool=False, **kwargs):
+    skin = SCENE.get(skin)
+    tv = tv or transformValue
+    influences = skin.data["influences"]
+    weights = skin.data["weights"]
+    for component in asNames(components):
+        shape, indices = componentPoints(component)
+        if q:
+            return weights[indices[0]].tolist()
+        if tv:
+            values = [tv] if isinstance(tv[0], str) else tv
+            for name, value in values:
+                idx = influences.index(str(name))
+                rows = weights[indices]
+                rest = rows.sum(1) - rows[:, idx]
+                remain = 1.0 - value
+                scale = np.where(rest > 0, remain / np.where(rest > 0, rest, 1), 0)
+                rows *= scale[:, None]
+                rows[:, idx] = value
+                weights[indices] = rows
+
+
+@command
+def pathAnimation(*args, c=None, **kwargs) -> PyNode:
+    """ Only the motionPath node, the object doesn't move. """
+    return wrap(SCENE.create("motionPath", "motionPath1"))
+
+
+@command
+def cutKey(*args, cl: bool=False, at=None, **kwargs) -> int:
+    """ With cl, the curves of the objects are deleted. """
+    if not (cl or kwargs.get("clear")):
+        return 0
+    attrs = [ALIAS.get(str(i), str(i)) for i in asNames([at])]
+    count = 0
+    for name in asNames(args):
+        node = SCENE.get(name)
+        for dst, src in list(SCENE.connections.items()):
+            plugNode, attr = dst.split(".", 1)
+            curve = SCENE.nodes.get(src.split(".", 1)[0])
+            if plugNode != node.name or not curve \
+                    or curve.type not in DERIVED_TYPES["animCurve"]:
+                continue
+            if attrs and attr not in attrs:
+                continue
+            SCENE.remove(curve)
+            count += 1
+    return count
+
+
+def curveType(attr: str) -> str:
+    if attr.startswith("translate"):
+        return "animCurveTL"
+    elif attr.startswith("rotate") or attr.startswith("jointOrient"):
+        return "animCurveTA"
+    return "animCurveTU"
+
+
+@command
+def setKeyframe(*args, at=None, attribute=None, **kwargs) -> int:
+    """ An animCurve drives each keyed plug, key values aren't kept. """
+    names = asNames(args) or list(SCENE.selection)
+    attrs = [ALIAS.get(str(i), str(i)) for i in asNames([at or attribute])]
+    plugs = []
+    for name in names:
+        if isinstance(name, str) and "." in name:
+            plugs.append(splitPlug(name))
+            continue
+        node = SCENE.get(name)
+        keyable = attrs or [i + axis for i in \
+            ["translate", "rotate", "scale"] for axis in "XYZ"]
+        plugs += [(node, i) for i in keyable]
+    for node, attr in plugs:
+        dst = f"{node.name}.{attr}"
+        if dst in SCENE.connections:
+            continue
+        curve = SCENE.create(curveType(attr), f"{node.name}_{attr}")
+        SCENE.connections[dst] = f"{curve.name}.output"
+    return len(plugs)
+
+
+@command
+def currentTime(*args, **kwargs):
+    if args:
+        SCENE.settings["frame"] = args[0]
+    return SCENE.settings["frame"]
+
+
+@command
+def currentUnit(q: bool=False, t: str="", l: str="", **kwargs):
+    if q:
+        return SCENE.settings["time"] if t or kwargs.get("time") \
+            else SCENE.settings["linear"]
+    if t:
+        SCENE.settings["time"] = t
+    if l:
+        SCENE.settings["linear"] = l
+
+
+@command
+def playbackOptions(*args, q: bool=False, **kwargs):
+    keys = [i for i in ["min", "max"] if i in kwargs]
+    if q:
+        return SCENE.settings[keys[0]] if keys else 0
+    for key in keys:
+        SCENE.settings[key] = float(kwargs[key])
+
+
+@command
+def expression(s: str="", **kwargs) -> PyNode:
+    node = SCENE.create("expression", kwargs.get("n", "expression1"))
+    node.data["source"] = s
+    return wrap(node)
+
+
+class Env:
+    def sceneName(self) -> str:
+        return ""
+
+
+# ============================================================================
+# maya.api.OpenMaya, the calls the batched modifiers make.
+# API calls are counted, but only get a latency if it is set by name.
+
+
+def apiCall(name: str) -> None:
+    STATS.counts[name] += 1
+    wait(STATS.latencies.get(name, 0.0))
+
+
+class MObject:
+    def __init__(self, node: Node=None):
+        self.node = node
+
+
+    def isNull(self) -> bool:
+        return self.node is None or self.node.name not in SCENE.nodes
+
+
+    def hasFn(self, kind) -> bool:
+        # The parent of a top node is the world.
+        return kind == MFn.kWorld and self.node is None
+
+
+MObject.kNullObj = MObject()
+
+
+class MObjectHandle:
+    def __init__(self, obj: MObject=None):
+        self.node = obj.node if obj is not None else None
+
+
+    def isValid(self) -> bool:
+        node = self.node
+        return node is not None and SCENE.nodes.get(node.name) is node
+
+
+    def object(self) -> MObject:
+        return MObject(self.node)
+
+
+    def __eq__(self, other) -> bool:
+        return self.node is other.node
+
+
+class MAttribute(MObject):
+    """ What MPlug.attribute returns, only the unit is known. """
+    def __init__(self, attr: str):
+        super().__init__(None)
+        self.attr = attr
+        base = attr[:-1] if attr[-1:] in ["X", "Y", "Z"] else attr
+        self.unit = MFnUnitAttribute.kAngle if base in ANGLE_ATTRS \
+            else MFnUnitAttribute.kDistance if base in DISTANCE_ATTRS else 0
+
+
+    def hasFn(self, kind) -> bool:
+        return kind == MFn.kUnitAttribute and bool(self.unit)
+
+
+class MFnUnitAttribute:
+    kAngle = 1
+    kDistance = 2
+    kTime = 3
+
+
+    def __init__(self, obj: MAttribute=None):
+        if not obj.hasFn(MFn.kUnitAttribute):
+            raise RuntimeError("(kInvalidParameter): Object is incompatible")
+        self.obj = obj
+
+
+    def unitType(self) -> int:
+        return self.obj.unit
+
+
+def flagProperty(flag: str) -> property:
+    """ MPlug.isLocked and the like, read and set on the plug. """
+    def getter(self) -> bool:
+        return plugFlag(*splitPlug(self.plug), flag)
+    def setter(self, value: bool) -> None:
+        apiCall(f"MPlug.{flag}")
+        node, attr = splitPlug(self.plug)
+        node.flags.setdefault(attr, {})[flag] = bool(value)
+    return property(getter, setter)
+
+
+class MPlug:
+    def __init__(self, plug: str=""):
+        self.plug = plug
+
+
+    def name(self) -> str:
+        return self.plug
+
+
+    def partialName(self, **kwargs) -> str:
+        return self.plug.split(".", 1)[1]
+
+
+    # Properties in maya.api.OpenMaya.
+    @property
+    def isNull(self) -> bool:
+        return not self.plug
+
+
+    @property
+    def isDestination(self) -> bool:
+        return self.plug in SCENE.connections
+
+
+    def node(self) -> MObject:
+        return MObject(SCENE.get(self.plug.split(".", 1)[0]))
+
+
+    def source(self):
+        return MPlug(SCENE.connections.get(self.plug, ""))
+
+
+    def asDouble(self) -> float:
+        return readAttr(*splitPlug(self.plug))
+
+
+    def asInt(self) -> int:
+        return int(readAttr(*splitPlug(self.plug)))
+
+
+    def asMAngle(self):
+        # Angles are stored in degrees here, Maya keeps radians.
+        return MAngle(readAttr(*splitPlug(self.plug)), MAngle.kDegrees)
+
+
+    isLocked = flagProperty("lock")
+    isKeyable = flagProperty("keyable")
+    isChannelBox = flagProperty("channelBox")
+
+
+    @property
+    def isCompound(self) -> bool:
+        node, attr = splitPlug(self.plug)
+        return attr in COMPOUND or attr + "X" in node.attrs
+
+
+    def numChildren(self) -> int:
+        return 3 if self.isCompound else 0
+
+
+    def child(self, index: int):
+        return MPlug(self.plug + "XYZ"[index])
+
+
+    def attribute(self) -> MAttribute:
+        return MAttribute(splitPlug(self.plug)[1])
+
+
+    def asMObject(self) -> MObject:
+        obj = MObject()
+        obj.value = readAttr(*splitPlug(self.plug))
+        return obj
+
+
+class MAngle:
+    kRadians = 1
+    kDegrees = 2
+
+
+    def __init__(self, value: float=0.0, unit: int=1):
+        self.radians = value if unit == MAngle.kRadians \
+            else math.radians(value)
+
+
+    def asDegrees(self) -> float:
+        return math.degrees(self.radians)
+
+
+    def asRadians(self) -> float:
+        return self.radians
+
+
+    @staticmethod
+    def uiUnit() -> int:
+        return MAngle.kDegrees
+
+
+class MDistance:
+    kInches = 1
+    kFeet = 2
+    kMillimeters = 5
+    kCentimeters = 6
+    kMeters = 8
+    CENTIMETERS = {1: 2.54, 2: 30.48, 5: 0.1, 6: 1.0, 8: 100.0}
+
+
+    def __init__(self, value: float=0.0, unit: int=6):
+        self.centimeters = value * MDistance.CENTIMETERS[unit]
+
+
+    def asCentimeters(self) -> float:
+        return self.centimeters
+
+
+    @staticmethod
+    def uiUnit() -> int:
+        return MDistance.kCentimeters
+
+
+# Plugs that exist on every transform but aren't stored as values.
+MATRIX_ATTRS = ["matrix", "offsetParentMatrix", "worldMatrix", \
+    "parentMatrix", "parentInverseMatrix", "worldInverseMatrix"]
+SHAPE_ATTRS = ["worldSpace", "local", "worldMesh", "outMesh"]
+# Every dag node has them, they are stored once they are set.
+DISPLAY_ATTRS = ["overrideEnabled", "overrideColor", "overrideRGBColors", \
+    "overrideDisplayType"]
+
+
+def hasPlug(node: Node, attr: str) -> bool:
+    """ Utility nodes accept any attribute, like target[0].weight. """
+    if not node.isDag():
+        return True
+    attr = attr.split("[")[0]
+    return attr in node.attrs or attr + "X" in node.attrs \
+        or attr in MATRIX_ATTRS or attr in DISPLAY_ATTRS \
+        or (node.type in SHAPE_TYPES and attr in SHAPE_ATTRS)
+
+
+class MDagPath(MObject):
+    def __init__(self, node=None):
+        super().__init__(node.node if isinstance(node, MObject) else node)
+
+
+    def extendToShape(self, index: int=0):
+        if self.node.shapes():
+            self.node = self.node.shapes()[index]
+        return self
+
+
+    def numberOfShapesDirectlyBelow(self) -> int:
+        return len(self.node.shapes())
+
+
+    def partialPathName(self) -> str:
+        return self.node.name
+
+
+    def fullPathName(self) -> str:
+        names, node = [], self.node
+        while node:
+            names.insert(0, node.name)
+            node = node.parent
+        return "|" + "|".join(names)
+
+
+    def transform(self) -> MObject:
+        node = self.node.parent if self.node.type in SHAPE_TYPES \
+            else self.node
+        return MObject(node)
+
+
+    def inclusiveMatrix(self):
+        """ Row vectors, like Maya. """
+        node = self.node.parent if self.node.type in SHAPE_TYPES \
+            else self.node
+        return MMatrix(node.worldMatrix().T.ravel().tolist())
+
+
+    def exclusiveMatrix(self):
+        node = self.node.parent if self.node.type in SHAPE_TYPES \
+            else self.node
+        parent = node.parent.worldMatrix() if node.parent else np.identity(4)
+        return MMatrix(parent.T.ravel().tolist())
+
+
+class MSelectionList:
+    def __init__(self):
+        self.items = []
+
+
+    def add(self, name: str):
+        apiCall("MSelectionList.add")
+        name = str(name)
+        if "." in name and not COMPONENT.match(name):
+            node, attr = splitPlug(name)
+            if not hasPlug(node, attr):
+                raise RuntimeError(f"(kInvalidParameter): {name}")
+            self.items.append(f"{node.name}.{attr}")
+        elif matchNames(name):
+            self.items.append(name)
+        else:
+            raise RuntimeError(f"(kInvalidParameter): {name}")
+        return self
+
+
+    def length(self) -> int:
+        return len(self.items)
+
+
+    def getPlug(self, index: int) -> MPlug:
+        return MPlug(self.items[index])
+
+
+    def getDagPath(self, index: int):
+        return MDagPath(SCENE.get(self.items[index].split(".", 1)[0]))
+
+
+    def getDependNode(self, index: int) -> MObject:
+        return MObject(SCENE.get(self.items[index].split(".", 1)[0]))
+
+
+    def getComponent(self, index: int) -> tuple:
+        """ The shape and its component, a null MObject for an object. """
+        item = self.items[index]
+        node = SCENE.get(item.split(".", 1)[0])
+        if not node.isDag():
+            raise TypeError(f"{item} is not a DAG node.")
+        match = COMPONENT.match(item)
+        if not match:
+            return MDagPath(node), MObject()
+        dag = MDagPath(node).extendToShape()
+        obj, kind, start, end = match.groups()
+        end = componentEnd(obj, start, end)
+        return dag, MComponent(kind, list(range(int(start), end + 1)))
+
+
+class MFn:
+    kMeshVertComponent = "vtx"
+    kMeshEdgeComponent = "e"
+    kMeshPolygonComponent = "f"
+    kCurveCVComponent = "cv"
+    kUnitAttribute = "unitAttribute"
+    kWorld = "world"
+
+
+class MComponent(MObject):
+    def __init__(self, kind: str, elements: list):
+        super().__init__(None)
+        self.kind = kind
+        self.elements = elements
+
+
+    def isNull(self) -> bool:
+        return False
+
+
+    def hasFn(self, fnType: str) -> bool:
+        return self.kind == fnType
+
+
+class MFnSingleIndexedComponent:
+    def __init__(self, obj: MComponent=None):
+        self.obj = obj
+
+
+    def create(self, fnType: str) -> MComponent:
+        self.obj = MComponent(fnType, [])
+        return self.obj
+
+
+    def setCompleteData(self, count: int) -> None:
+        self.obj.elements = list(range(count))
+
+
+    def addElements(self, elements: list) -> None:
+        self.obj.elements += list(elements)
+
+
+    def getElements(self) -> list:
+        return list(self.obj.elements)
+
+
+class MFnDagNode:
+    def __init__(self, obj: MObject):
+        self.node = obj.node
+
+
+    def partialPathName(self) -> str:
+        return self.node.name
+
+
+    @property
+    def typeName(self) -> str:
+        return self.node.type
+
+
+    def parent(self, index: int=0) -> MObject:
+        return MObject(self.node.parent)
+
+
+def setDirty(node: Node) -> None:
+    """ Calls the node dirty callbacks of an edited shape. """
+    for func, clientData in list(SCENE.callbacks.get(node.name, {}).values()):
+        func(MObject(node), clientData)
+
+
+class MNodeMessage:
+    ids = itertools.count(1)
+
+
+    @staticmethod
+    def addNodeDirtyCallback(obj: MObject, func, clientData=None) -> int:
+        apiCall("MNodeMessage.addNodeDirtyCallback")
+        callbackId = next(MNodeMessage.ids)
+        callbacks = SCENE.callbacks.setdefault(obj.node.name, {})
+        callbacks[callbackId] = (func, clientData)
+        return callbackId
+
+
+class MMessage:
+    @staticmethod
+    def removeCallback(callbackId: int) -> None:
+        for callbacks in SCENE.callbacks.values():
+            callbacks.pop(callbackId, None)
+
+
+class MGlobal:
+    @staticmethod
+    def getActiveSelectionList() -> MSelectionList:
+        apiCall("MGlobal.getActiveSelectionList")
+        sel = MSelectionList()
+        sel.items = [i if isinstance(i, str) else i.name \
+            for i in SCENE.selection]
+        return sel
+
+
+class MFnDependencyNode:
+    def __init__(self, obj: MObject=None):
+        self.obj = obj
+
+
+    def name(self) -> str:
+        return self.obj.node.name
+
+
+    @property
+    def typeName(self) -> str:
+        return self.obj.node.type
+
+
+    def findPlug(self, attr: str, wantNetworkedPlug: bool=False) -> MPlug:
+        attr = ALIAS.get(attr, attr)
+        if not hasPlug(self.obj.node, attr):
+            raise RuntimeError(f"No plug: {self.obj.node.name}.{attr}")
+        return MPlug(f"{self.obj.node.name}.{attr}")
+
+
+class MDGModifier:
+    """ Operations are queued and run by doIt, undoIt reverts them. """
+    def __init__(self):
+        self.queue = []
+        self.done = []
+
+
+    def createNode(self, nodeType: str) -> MObject:
+        obj = MObject()
+        self.queue.append(("createNode", obj, nodeType))
+        return obj
+
+
+    def renameNode(self, obj: MObject, name: str):
+        self.queue.append(("renameNode", obj, name))
+        return self
+
+
+    def connect(self, source: MPlug, destination: MPlug):
+        self.queue.append(("connect", source.plug, destination.plug))
+        return self
+
+
+    def disconnect(self, source: MPlug, destination: MPlug):
+        self.queue.append(("disconnect", source.plug, destination.plug))
+        return self
+
+
+    def newPlugValueDouble(self, plug: MPlug, value: float):
+        self.queue.append(("setDouble", plug.plug, value))
+        return self
+
+
+    def newPlugValue(self, plug: MPlug, data):
+        self.queue.append(("setDouble", plug.plug, data.value))
+        return self
+
+
+    def newPlugValueInt(self, plug: MPlug, value: int):
+        self.queue.append(("setDouble", plug.plug, int(value)))
+        return self
+
+
+    def newPlugValueBool(self, plug: MPlug, value: bool):
+        self.queue.append(("setDouble", plug.plug, bool(value)))
+        return self
+
+
+    def newPlugValueString(self, plug: MPlug, value: str):
+        self.queue.append(("setValue", plug.plug, str(value)))
+        return self
+
+
+    def newPlugValueMAngle(self, plug: MPlug, value: MAngle):
+        self.queue.append(("setDouble", plug.plug, value.asDegrees()))
+        return self
+
+
+    def newPlugValueMDistance(self, plug: MPlug, value: MDistance):
+        self.queue.append(("setDouble", plug.plug, value.asCentimeters()))
+        return self
+
+
+    def doIt(self) -> None:
+        # One doIt costs like one command.
+        STATS.counts["MDGModifier.doIt"] += 1
+        wait(STATS.latencies.get("MDGModifier.doIt", STATS.latency))
+        for op, a, b in self.queue:
+            if op == "createNode":
+                nodeType, parent = b if isinstance(b, tuple) else (b, None)
+                a.node = SCENE.create(nodeType, \
+                    parent=parent.node if parent else None)
+                undo = ("delete", a.node)
+            elif op == "renameNode":
+                undo = ("rename", a.node, a.node.name)
+                SCENE.rename(a.node, b)
+            elif op == "connect":
+                if b in SCENE.connections:
+                    raise RuntimeError(f"{b} is already connected.")
+                SCENE.connections[b] = a
+                undo = ("disconnect", b)
+            elif op == "disconnect":
+                if SCENE.connections.get(b) != a:
+                    raise RuntimeError(f"{a} is not connected to {b}.")
+                del SCENE.connections[b]
+                undo = ("connect", b, a)
+            elif op in ["setDouble", "setValue"]:
+                node, attr = splitPlug(a)
+                if isLocked(node, attr):
+                    raise RuntimeError(f"{a} is locked.")
+                undo = ("setDouble", node, attr, node.attrs.get(attr))
+                node.attrs[attr] = b if isinstance(b, list) \
+                    or op == "setValue" else float(b)
+            self.done.append(undo)
+        self.queue = []
+
+
+    def undoIt(self) -> None:
+        apiCall("MDGModifier.undoIt")
+        for undo in reversed(self.done):
+            if undo[0] == "delete":
+                SCENE.remove(undo[1])
+            elif undo[0] == "rename":
+                SCENE.rename(undo[1], undo[2])
+            elif undo[0] == "disconnect":
+                del SCENE.connections[undo[1]]
+            elif undo[0] == "connect":
+                SCENE.connections[undo[1]] = undo[2]
+            elif undo[0] == "setDouble":
+                undo[1].attrs[undo[2]] = undo[3]
+        self.done = []
+
+
+class MMatrix(list):
+    pass
+
+
+MSpace = types.SimpleNamespace(kObject=2, kWorld=4)
+
+
+class MFnNurbsCurve:
+    """ Open curves with uniform knots. """
+    kOpen = 1
+    kPeriodic = 3
+
+
+    def __init__(self, obj: MObject):
+        apiCall("MFnNurbsCurve")
+        node = obj.node
+        self.shape = node if node.type == "nurbsCurve" else node.shapes()[0]
+        self.degree = self.shape.data.get("degree", 3)
+        self.numCVs = len(self.shape.points)
+        self.form = self.kOpen
+
+
+    def cvPositions(self, space: int=MSpace.kObject) -> list:
+        points = self.shape.points
+        if space == MSpace.kWorld:
+            world = self.shape.parent.worldMatrix()
+            homo = np.hstack([points, np.ones((len(points), 1))])
+            points = (homo @ world.T)[:, :3]
+        return [(x, y, z, 1.0) for x, y, z in points.tolist()]
+
+
+    def knots(self) -> list:
+        spans = self.numCVs - self.degree
+        d = self.degree
+        return [0.0] * d + [float(i) for i in range(1, spans)] \
+            + [float(spans)] * d
+
+
+class MFnTransform:
+    """ Pivots are not modeled, the rotate pivot is the position. """
+    def __init__(self, obj: MObject):
+        apiCall("MFnTransform")
+        self.node = obj.node
+
+
+    def rotatePivot(self, space: int=MSpace.kObject) -> tuple:
+        if space == MSpace.kWorld:
+            return tuple(worldPosition(self.node.name)) + (1.0,)
+        return (0.0, 0.0, 0.0, 1.0)
+
+
+class MFnMesh:
+    def __init__(self, obj: MObject):
+        apiCall("MFnMesh")
+        node = obj.node
+        self.shape = node if node.type == "mesh" else node.shapes()[0]
+
+
+    def getPoints(self, space: int=MSpace.kObject) -> list:
+        points = self.shape.points
+        if space == MSpace.kWorld:
+            world = self.shape.parent.worldMatrix()
+            homo = np.hstack([points, np.ones((len(points), 1))])
+            points = (homo @ world.T)[:, :3]
+        return [(x, y, z, 1.0) for x, y, z in points.tolist()]
+
+
+    @property
+    def numVertices(self) -> int:
+        return len(self.shape.points)
+
+
+    def getTriangles(self) -> tuple:
+        """ Faces are split as fans. """
+        counts, vertices = [], []
+        for face in self.shape.data.get("faces", []):
+            counts.append(len(face) - 2)
+            for i in range(1, len(face) - 1):
+                vertices += [face[0], face[i], face[i + 1]]
+        return MIntArray(counts), MIntArray(vertices)
+
+
+    def getVertexNormals(self, angleWeighted: bool, \
+                         space: int=MSpace.kObject) -> list:
+        normals = vertexNormals(self.shape)
+        if space == MSpace.kWorld:
+            normals = normals @ self.shape.parent.worldMatrix()[:3, :3].T
+        return [tuple(i) for i in normals.tolist()]
+
+
+class MIntArray(list):
+    pass
+
+
+class MDoubleArray(list):
+    pass
+
+
+class MFnSkinCluster:
+    def __init__(self, obj: MObject):
+        apiCall("MFnSkinCluster")
+        self.skin = obj.node
+
+
+    def influenceObjects(self) -> list:
+        return [MDagPath(SCENE.get(i)) for i in self.skin.data["influences"]]
+
+
+    def indexForInfluenceObject(self, dag: MDagPath) -> int:
+        apiCall("MFnSkinCluster.indexForInfluenceObject")
+        return influenceIndex(self.skin, dag.node.name)
+
+
+    def getWeights(self, dag: MDagPath, components: MComponent) -> tuple:
+        apiCall("MFnSkinCluster.getWeights")
+        weights = self.skin.data["weights"][components.elements]
+        return MDoubleArray(weights.ravel().tolist()), weights.shape[1]
+
+
+    def setWeights(self, dag: MDagPath, components: MComponent, \
+                   influences: list, values: list, normalize: bool=True, \
+                   returnOldWeights: bool=False):
+        apiCall("MFnSkinCluster.setWeights")
+        weights = self.skin.data["weights"]
+        values = np.asarray(values, dtype=float).reshape( \
+            len(components.elements), len(influences))
+        rows = np.asarray(components.elements)
+        columns = np.asarray(influences)[None]
+        old = weights[rows[:, None], columns].ravel().tolist()
+        weights[rows[:, None], columns] = values
+        return MDoubleArray(old) if returnOldWeights else None
+
+
+class MPxCommand:
+    def __init__(self):
+        pass
+
+
+    def isUndoable(self) -> bool:
+        return False
+
+
+class MArgList(list):
+    pass
+
+
+class MFnPlugin:
+    def __init__(self, obj: MObject=None, vendor: str="", \
+                 version: str=""):
+        pass
+
+
+    def registerCommand(self, name: str, creator) -> None:
+        PLUGIN_COMMANDS[name] = creator
+
+
+    def deregisterCommand(self, name: str) -> None:
+        PLUGIN_COMMANDS.pop(name, None)
+
+
+# {command name: creator} of loaded plugins, and the commands to undo.
+PLUGIN_COMMANDS = {}
+PLUGINS = {}
+UNDO_QUEUE = []
+
+
+class MFnMatrixData:
+    def __init__(self, obj: MObject=None):
+        self.obj = obj
+
+
+    def create(self, matrix: MMatrix) -> MObject:
+        obj = MObject()
+        obj.value = list(matrix)
+        return obj
+
+
+    def matrix(self) -> MMatrix:
+        return MMatrix(self.obj.value)
+
+
+class MDagModifier(MDGModifier):
+    def createNode(self, nodeType: str, parent: MObject=None) -> MObject:
+        obj = MObject()
+        self.queue.append(("createNode", obj, (nodeType, parent)))
+        return obj
+
+
+def apiModule() -> types.ModuleType:
+    module = types.ModuleType("maya.api.OpenMaya")
+    for cls in [MObject, MObjectHandle, MPlug, MSelectionList, \
+            MFnDependencyNode, MDGModifier, MDagModifier, MMatrix, MFnMatrixData, MFnNurbsCurve, MDagPath, \
+            MFnMesh, MFnTransform, MFnSingleIndexedComponent, MFnDagNode, \
+            MGlobal, MFn, MNodeMessage, MMessage, MIntArray, MDoubleArray, \
+            MAngle, MDistance, MFnUnitAttribute, MPxCommand, MArgList, \
+            MFnPlugin]:
+        setattr(module, cls.__name__, cls)
+    module.MSpace = MSpace
+    return module
+
+
+# ============================================================================
+# maya.cmds, the calls buildContext makes.
+
+
+class Cmds(types.ModuleType):
+    def __init__(self):
+        super().__init__("maya.cmds")
+        self.undoChunks = 0
+
+
+    def undoInfo(self, **kwargs):
+        STATS.counts["undoInfo"] += 1
+        return None
+
+
+    def about(self, batch: bool=False, **kwargs):
+        return True
+
+
+    def evaluationManager(self, q: bool=False, mode: str="", **kwargs):
+        return ["parallel"] if q else None
+
+
+    def refresh(self, **kwargs):
+        STATS.counts["refresh"] += 1
+
+
+    def ogs(self, **kwargs):
+        return False
+
+
+    def flushUndo(self):
+        pass
+
+
+    def loadPlugin(self, *names, quiet: bool=False, **kwargs):
+        """ A path of a .py file runs its initializePlugin. """
+        STATS.counts["loadPlugin"] += 1
+        for name in names:
+            if not str(name).endswith(".py") or name in PLUGINS:
+                continue
+            spec = importlib.util.spec_from_file_location( \
+                os.path.basename(name)[:-3], name)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.initializePlugin(MObject())
+            PLUGINS[name] = module
+        return list(names)
+
+
+    def pluginInfo(self, name: str, q: bool=False, loaded: bool=False, \
+                   **kwargs):
+        return name in PLUGINS
+
+
+    def undo(self):
+        """ Only plugin commands are undone,
+        the rest of the scene has no undo.
+         """
+        if UNDO_QUEUE:
+            UNDO_QUEUE.pop().undoIt()
+
+
+    def runPluginCommand(self, name: str, *args):
+        STATS.counts[name] += 1
+        wait(STATS.latencies.get(name, STATS.latency))
+        cmd = PLUGIN_COMMANDS[name]()
+        result = cmd.doIt(MArgList(args))
+        if cmd.isUndoable():
+            UNDO_QUEUE.append(cmd)
+        return result
+
+
+    def file(self, *args, new: bool=False, o: bool=False, \
+             rename: str="", save: bool=False, **kwargs):
+        """ Opening a path runs the builder in FILES, if there is one.
+        Saved paths are kept in SAVED.
+         """
+        if new:
+            newScene()
+        if o or kwargs.get("open"):
+            newScene()
+            path = str(args[0])
+            if path not in FILES:
+                raise RuntimeError(f"File not found: {path}")
+            FILES[path]()
+            SCENE.settings["sceneName"] = path
+        if rename:
+            SCENE.settings["sceneName"] = rename
+        if save or kwargs.get("s"):
+            SAVED.append(SCENE.settings.get("sceneName", ""))
+            return SCENE.settings.get("sceneName", "")
+        if kwargs.get("q") or kwargs.get("query"):
+            return SCENE.settings.get("sceneName", "")
+
+
+    def __getattr__(self, name: str):
+        """ Other commands are the plugin and pymel.core ones. """
+        if name in PLUGIN_COMMANDS:
+            return functools.partial(self.runPluginCommand, name)
+        module = sys.modules[__name__]
+        if name.startswith("__") or not hasattr(module, name):
+            raise AttributeError(name)
+        return getattr(module, name)
+
+
+def install(latency: float=0.0, latencies: dict={}) -> types.ModuleType:
+    """ Registers this module as pymel.core, and the maya modules the
+    tools import, in sys.modules. Already imported tool modules keep
+    whatever they imported before, so call this first.
+    latency is the seconds added to every command,
+    latencies overrides it per command name.
+     """
+    STATS.latency = latency
+    STATS.latencies = dict(latencies)
+    module = sys.modules[__name__]
+    pymel = types.ModuleType("pymel")
+    pymel.core = module
+    sys.modules["pymel"] = pymel
+    sys.modules["pymel.core"] = module
+    maya = types.ModuleType("maya")
+    maya.cmds = Cmds()
+    sys.modules["maya"] = maya
+    sys.modules["maya.cmds"] = maya.cmds
+    for name in ["OpenMaya", "OpenMayaUI", "mel", "standalone"]:
+        sub = types.ModuleType(f"maya.{name}")
+        setattr(maya, name, sub)
+        sys.modules[f"maya.{name}"] = sub
+    api = types.ModuleType("maya.api")
+    api.OpenMaya = apiModule()
+    maya.api = api
+    sys.modules["maya.api"] = api
+    sys.modules["maya.api.OpenMaya"] = api.OpenMaya
+    api.OpenMayaAnim = types.ModuleType("maya.api.OpenMayaAnim")
+    api.OpenMayaAnim.MFnSkinCluster = MFnSkinCluster
+    sys.modules["maya.api.OpenMayaAnim"] = api.OpenMayaAnim
+    installQt()
+    return module
+
+
+def installQt() -> None:
+    """ Tool classes subclass QWidget. When PySide2 is not available
+    outside Maya, a plain base class takes its place,
+    the tools are driven by calling their methods.
+     """
+    if importlib.util.find_spec("PySide2") \
+            and importlib.util.find_spec("shiboken2"):
+        return
+    class QWidget:
+        def __init__(self, *args, **kwargs):
+            pass
+    widgets = types.ModuleType("PySide2.QtWidgets")
+    widgets.QWidget = QWidget
+    widgets.__all__ = ["QWidget"]
+    core = types.ModuleType("PySide2.QtCore")
+    core.Qt = types.SimpleNamespace(Window=0)
+    gui = types.ModuleType("PySide2.QtGui")
+    gui.QIntValidator = object
+    pyside = types.ModuleType("PySide2")
+    pyside.QtWidgets, pyside.QtCore, pyside.QtGui = widgets, core, gui
+    shiboken = types.ModuleType("shiboken2")
+    shiboken.wrapInstance = lambda *args: None
+    for name, module in [("PySide2", pyside), ("PySide2.QtWidgets", widgets),
+            ("PySide2.QtCore", core), ("PySide2.QtGui", gui),
+            ("shiboken2", shiboken)]:
+        sys.modules[name] = module
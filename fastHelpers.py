@@ -0,0 +1,489 @@
+""" maya.cmds and OpenMaya versions of the hot helpers of general and hjk.
+
+They take the same arguments, make the same scene and return
+the same types: where pymel returns PyNodes, so do they.
+The work is done with names, and a PyNode is only built
+for each node that is returned.
+checkBackends compares the types of the results too.
+Set RIGMODULES_BACKEND=fast before general or hjk is first imported
+to use them in place of the pymel ones.
+>>> os.environ["RIGMODULES_BACKEND"] = "fast"
+>>> import general
+>>> checkBackends()
+>>> benchmarkBackends()
+"""
+import time
+import numpy as np
+from frameMath import normalized
+from pivotGroups import groupByMode
+
+
+# The helpers each module swaps, their signatures are the same.
+GENERAL_HELPERS = ["getPosition", "groupingWithOwnPivot", "groupOwnPivot", \
+    "parentHierarchically", "setJointsStyle", "selectObjectOnly", \
+    "selectGroupOnly", "selectConstraintOnly", "selectJointOnly", \
+    "selectIKHandleOnly", "selectClusterOnly", "selectLocatorOnly", \
+    "selectNurbsCurveOnly"]
+HJK_HELPERS = ["groupOwnPivot", "parentHierarchically", "colorize", \
+    "selectObjectOnly", "selectGroupOnly", "selectConstraintOnly", \
+    "selectJointOnly", "selectIKHandleOnly", "selectClusterOnly", \
+    "selectLocatorOnly", "selectNurbsCurveOnly"]
+COLORS = {
+    "blue": 6,
+    "blue2": 18,
+    "pink": 9,
+    "red": 13,
+    "red2": 21,
+    "green": 14,
+    "green2": 23,
+    "yellow": 17,
+    }
+
+
+def dagPaths(items: list) -> list:
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    for i in items:
+        sel.add(str(i))
+    return [sel.getDagPath(i) for i in range(sel.length())]
+
+
+def selectedOr(args: tuple) -> list:
+    import maya.cmds as cmds
+    return [str(i) for i in args] if args else cmds.ls(sl=True) or []
+
+
+def nodeTypes(items: list) -> list:
+    """ (name, type, shape type) of each dag node, read with the API.
+    The shape type is of the first shape under it, "" without one.
+     """
+    import maya.api.OpenMaya as om2
+    result = []
+    for dag in dagPaths(items):
+        name = dag.partialPathName()
+        nodeType = om2.MFnDagNode(dag).typeName
+        shapeType = ""
+        if dag.numberOfShapesDirectlyBelow():
+            shape = om2.MDagPath(dag).extendToShape(0)
+            shapeType = om2.MFnDagNode(shape).typeName
+        result.append((name, nodeType, shapeType))
+    return result
+
+
+def pyNodes(names: list) -> list:
+    """ What pymel would have returned for the names. """
+    import pymel.core as pm
+    return [pm.PyNode(i) for i in names]
+
+
+def selectResult(result: list) -> list:
+    import maya.cmds as cmds
+    if result:
+        cmds.select(result)
+    else:
+        cmds.select(cl=True)
+    return pyNodes(result)
+
+
+def getPosition(selection: str) -> tuple:
+    """ Get the coordinates of an object or point.
+    >>> getPosition("pSphere1")
+    >>> getPosition("pSphere1.vtx[317]")
+    >>> (0.0, 0.0, 0.0)
+     """
+    import maya.api.OpenMaya as om2
+    import maya.cmds as cmds
+    if "." in str(selection):
+        return tuple(cmds.pointPosition(str(selection)))
+    fn = om2.MFnTransform(dagPaths([selection])[0])
+    return tuple(list(fn.rotatePivot(om2.MSpace.kWorld))[:3])
+
+
+def matchedGroup(name: str, matrix: list) -> str:
+    """ An empty group at the world position and rotation of matrix,
+    like matchTransform -pos -rot.
+     """
+    import maya.cmds as cmds
+    grp = str(cmds.group(em=True, n=name))
+    cmds.xform(grp, ws=True, m=matrix)
+    return grp
+
+
+def pivotMatrix(obj: str) -> list:
+    """ The world matrix of obj without its scale, 16 floats. """
+    matrix = np.array(dagPaths([obj])[0].inclusiveMatrix()).reshape(4, 4)
+    matrix[:3, :3] = normalized(matrix[:3, :3])
+    return matrix.ravel().tolist()
+
+
+def parentOf(obj: str) -> list:
+    import maya.cmds as cmds
+    return cmds.listRelatives(obj, p=True) or []
+
+
+def groupingWithOwnPivot(*arg) -> list:
+    import maya.cmds as cmds
+    selections = selectedOr(arg)
+    result = []
+    for i in selections:
+        grp = matchedGroup(f"{i}_grp", pivotMatrix(i))
+        parent = parentOf(i)
+        if parent:
+            cmds.parent(grp, parent[0])
+        cmds.parent(i, grp)
+        result.append(grp)
+    return pyNodes(result)
+
+
+def groupOwnPivot(*args, **kwargs) -> list:
+    """ Create a group with the same pivot.
+    >>> groupOwnPivot("pCube1", null=True)
+    >>> ["pCube1_grp", "pCube1_null", "pCube1"]
+     """
+    import maya.cmds as cmds
+    selections = selectedOr(args)
+    null = kwargs.get("null", False)
+    mode = kwargs.get("mode", "group")
+    if mode != "group":
+        return groupByMode(mode, selections, null, kwargs.get("n", ""))
+    # The objects come back as they were given, like with pymel.
+    sources = list(args) if args else pyNodes(selections)
+    result = []
+    for i, source in zip(selections, sources):
+        objName = kwargs.get("n", "") or i
+        names = [f"{objName}_grp", f"{objName}_null"] if null is True \
+            else [f"{objName}_grp"]
+        topGroup = parentOf(i)
+        matrix = pivotMatrix(i)
+        groups = [matchedGroup(name, matrix) for name in names]
+        parentHierarchically(*groups, i)
+        if topGroup:
+            cmds.parent(groups[0], topGroup[0])
+        result += pyNodes(groups) + [source]
+    return result
+
+
+def parentHierarchically(*args) -> list:
+    """ Hierarchically parent.
+    >>> parentHierarchically(*lst)
+    >>> parentHierarchically(parents, child)
+     """
+    import maya.cmds as cmds
+    sel = selectedOr(args)
+    if not sel:
+        return
+    for parents, child in zip(sel[:-1], sel[1:]):
+        try:
+            cmds.parent(child, parents)
+        except:
+            continue
+    return pyNodes(sel)
+
+
+def setJointsStyle(joints=[], drawStyle=2) -> list:
+    """ Change the drawing style of a joint. Default is 2: None. """
+    import maya.cmds as cmds
+    sel = joints if joints else pyNodes(cmds.ls(sl=True) or [])
+    result = []
+    for i in sel:
+        try:
+            cmds.setAttr(f"{i}.drawStyle", drawStyle)
+            result.append(i)
+        except:
+            continue
+    return result
+
+
+def colorize(*args, **kwargs):
+    """ Color an Object.
+    >>> colorize("pCube1", "pCube2", red=True)
+     """
+    import maya.api.OpenMaya as om2
+    import maya.cmds as cmds
+    sel = selectedOr(args)
+    if not sel or not kwargs:
+        return
+    idx = [COLORS[j] for j, k in kwargs.items() if j in COLORS and k]
+    for obj in sel:
+        try:
+            dag = dagPaths([obj])[0]
+            shp = om2.MDagPath(dag).extendToShape(0).partialPathName()
+            cmds.setAttr(f"{shp}.overrideEnabled", 1)
+            for i in idx:
+                cmds.setAttr(f"{shp}.overrideColor", i)
+        except:
+            continue
+
+
+def dagUnder(args: tuple, types: list) -> list:
+    """ Everything of types under args or the selection, one ls. """
+    import maya.cmds as cmds
+    if args:
+        return cmds.ls([str(i) for i in args], dag=True, type=types) or []
+    return cmds.ls(sl=True, dag=True, type=types) or []
+
+
+def shapeParents(args: tuple, types: list) -> list:
+    """ The transforms of the shapes of types under args. """
+    shapes = dagUnder(args, types)
+    return [i.transform() for i in dagPaths(shapes)]
+
+
+def selectObjectOnly(*args) -> list:
+    """ Selects only the object.
+    It also selects all objects under the selected.
+     """
+    import maya.api.OpenMaya as om2
+    parents = shapeParents(args, ["mesh", "nurbsSurface"])
+    names = [om2.MFnDagNode(i).partialPathName() for i in parents]
+    return selectResult(list(dict.fromkeys(names)))
+
+
+def selectNurbsCurveOnly(*args) -> list:
+    import maya.api.OpenMaya as om2
+    parents = shapeParents(args, ["nurbsCurve"])
+    return selectResult([om2.MFnDagNode(i).partialPathName() \
+        for i in parents])
+
+
+def selectTransforms(args: tuple, keep) -> list:
+    """ Transforms under args for which keep(type, shapeType) is true. """
+    transforms = dagUnder(args, ["transform"])
+    result = [name for name, nodeType, shapeType in nodeTypes(transforms) \
+        if keep(nodeType, shapeType)]
+    return selectResult(result)
+
+
+def selectGroupOnly(*args) -> list:
+    """ No shape, and not a joint, ikEffector, ikHandle or constraint. """
+    others = ["joint", "ikEffector", "ikHandle"]
+    return selectTransforms(args, lambda t, s: not (s or t in others \
+        or "Constraint" in t))
+
+
+def selectConstraintOnly(*args) -> list:
+    others = ["joint", "ikEffector", "ikHandle"]
+    return selectTransforms(args, lambda t, s: not (s or t in others) \
+        and "Constraint" in t)
+
+
+def selectJointOnly(*args) -> list:
+    return selectTransforms(args, lambda t, s: t == "joint")
+
+
+def selectIKHandleOnly(*args) -> list:
+    return selectTransforms(args, lambda t, s: t == "ikHandle")
+
+
+def selectClusterOnly(*args) -> list:
+    return selectTransforms(args, lambda t, s: s == "clusterHandle")
+
+
+def selectLocatorOnly(*args) -> list:
+    return selectTransforms(args, lambda t, s: s == "locator")
+
+
+def conformanceScene() -> dict:
+    """ A bit of everything the helpers look at, in a new scene. """
+    import maya.cmds as cmds
+    import pymel.core as pm
+    cmds.file(new=True, force=True)
+    top = str(pm.group(em=True, n="conform_top"))
+    pm.select(cl=True)
+    joints = [str(pm.joint(p=(0, i * 2, i), n=f"conform_jnt{i}")) \
+        for i in range(4)]
+    pm.parent(joints[0], top)
+    cmds.setAttr(f"{joints[1]}.rotate", 10, 20, 30)
+    cube = str(pm.polySphere(n="conform_cube", sx=6, sy=4)[0])
+    cmds.setAttr(f"{cube}.translate", 1, 2, 3)
+    cmds.setAttr(f"{cube}.rotate", 15, 45, 0)
+    cmds.setAttr(f"{cube}.scale", 2, 2, 2)
+    curve = str(pm.circle(n="conform_curve", ch=False)[0])
+    loc = str(pm.spaceLocator(n="conform_loc"))
+    cmds.setAttr(f"{loc}.translate", -4, 0, 2)
+    groups = [str(pm.group(em=True, n=f"conform_grp{i}")) for i in range(3)]
+    pm.parent(cube, curve, loc, groups, top)
+    pm.parentConstraint(loc, groups[2], mo=True)
+    ik = str(pm.ikHandle(sj=joints[1], ee=joints[3], n="conform_ikH")[0])
+    handle = str(pm.cluster(f"{curve}.cv[0:2]", n="conform_cls")[1])
+    pm.parent(ik, handle, top)
+    return {"top": top, "joints": joints, "cube": cube, "curve": curve, \
+        "loc": loc, "groups": groups}
+
+
+def sceneState() -> dict:
+    """ Parent and world matrix of every dag node, the selection,
+    and the attributes the helpers set.
+     """
+    import maya.cmds as cmds
+    state = {"selection": sorted(str(i) for i in cmds.ls(sl=True) or [])}
+    for i in cmds.ls(dag=True) or []:
+        i = str(i)
+        parent = cmds.listRelatives(i, p=True) or [""]
+        matrix = cmds.xform(i, q=True, m=True, ws=True) \
+            if cmds.objectType(i) not in ["mesh", "nurbsCurve", "locator"] \
+            else []
+        attrs = []
+        for attr in ["drawStyle", "overrideEnabled", "overrideColor"]:
+            try:
+                attrs.append(cmds.getAttr(f"{i}.{attr}"))
+            except:
+                attrs.append(None)
+        state[i] = (str(parent[0]), np.round(matrix, 5).tolist(), attrs)
+    return state
+
+
+def plain(value):
+    """ Results of both backends as rounded numbers,
+    and names with their type, so a str isn't taken for a PyNode.
+     """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return [plain(i) for i in value]
+    if isinstance(value, float):
+        return round(value, 5)
+    return f"{type(value).__name__}({value})"
+
+
+# (helper, args of the scene, kwargs, selected before, order matters)
+CASES = [
+    ("getPosition", lambda s: [s["cube"]], {}, None, True),
+    ("getPosition", lambda s: [f"{s['cube']}.vtx[3]"], {}, None, True),
+    ("groupingWithOwnPivot", lambda s: [s["cube"], s["loc"]], {}, None, True),
+    ("groupOwnPivot", lambda s: [s["cube"], s["joints"][2]], {}, None, True),
+    ("groupOwnPivot", lambda s: [s["loc"]], {"null": True, "n": "newName"}, \
+        None, True),
+    ("groupOwnPivot", lambda s: [], {}, "loc", True),
+    ("parentHierarchically", lambda s: s["groups"][:2] + [s["curve"]], {}, \
+        None, True),
+    ("setJointsStyle", lambda s: [s["joints"]], {}, None, True),
+    ("colorize", lambda s: [s["curve"], s["cube"]], {"red": True}, None, True),
+    ("selectObjectOnly", lambda s: [], {}, "top", False),
+    ("selectGroupOnly", lambda s: [], {}, "top", True),
+    ("selectConstraintOnly", lambda s: [], {}, "top", True),
+    ("selectJointOnly", lambda s: [], {}, "top", True),
+    ("selectJointOnly", lambda s: [s["joints"][1]], {}, None, True),
+    ("selectIKHandleOnly", lambda s: [], {}, "top", True),
+    ("selectClusterOnly", lambda s: [], {}, "top", True),
+    ("selectLocatorOnly", lambda s: [], {}, "top", True),
+    ("selectNurbsCurveOnly", lambda s: [], {}, "top", True),
+    ]
+
+
+def runCase(func, case: tuple) -> tuple:
+    import maya.cmds as cmds
+    name, args, kwargs, selected, ordered = case
+    scene = conformanceScene()
+    if selected:
+        cmds.select(scene[selected])
+    result = plain(func(*args(scene), **kwargs))
+    if not ordered and result:
+        result = sorted(result)
+    return result, sceneState()
+
+
+def checkBackends(module: str="general") -> dict:
+    """ Runs each helper of module with both backends on the same scene,
+    the results and the scenes after must be the same.
+    Returns {case: True or False}, differences are printed.
+    >>> checkBackends("hjk")
+    >>> {'groupOwnPivot 0': True, ...}
+     """
+    import importlib
+    mod = importlib.import_module(module)
+    helpers = GENERAL_HELPERS if module == "general" else HJK_HELPERS
+    result = {}
+    for idx, case in enumerate(CASES):
+        name = case[0]
+        if name not in helpers:
+            continue
+        expected = runCase(mod.PYMEL_HELPERS[name], case)
+        found = runCase(globals()[name], case)
+        same = expected == found
+        result[f"{name} {idx}"] = same
+        if not same:
+            print(f"{module}.{name} {idx}: {expected[0]} != {found[0]}")
+            for key in expected[1]:
+                if expected[1][key] != found[1].get(key):
+                    print(f"    {key}: {expected[1][key]} " \
+                        f"!= {found[1].get(key)}")
+    print(f"{sum(result.values())} of {len(result)} cases are the same.")
+    return result
+
+
+def benchmarkScene(numberOfObjects: int) -> dict:
+    """ numberOfObjects locators, joints, curves and groups under one top. """
+    import maya.cmds as cmds
+    import pymel.core as pm
+    cmds.file(new=True, force=True)
+    top = str(pm.group(em=True, n="bench_top"))
+    scene = {"top": top, "locators": [], "joints": [], "curves": [], \
+        "groups": []}
+    for i in range(numberOfObjects):
+        loc = str(pm.spaceLocator(n=f"bench_loc{i}"))
+        cmds.setAttr(f"{loc}.translate", i, 0, -i)
+        cmds.setAttr(f"{loc}.rotate", 0, i, 0)
+        pm.select(cl=True)
+        jnt = str(pm.joint(p=(0, i, 0), n=f"bench_jnt{i}"))
+        curve = str(pm.circle(n=f"bench_curve{i}", ch=False)[0])
+        grp = str(pm.group(em=True, n=f"bench_grp{i}"))
+        pm.parent(loc, jnt, curve, grp, top)
+        scene["locators"].append(loc)
+        scene["joints"].append(jnt)
+        scene["curves"].append(curve)
+        scene["groups"].append(grp)
+    return scene
+
+
+# helper: (args of the scene, kwargs, select the top first)
+BENCHMARKS = {
+    "getPosition": (lambda s: s["locators"], {}, False),
+    "groupingWithOwnPivot": (lambda s: s["locators"], {}, False),
+    "groupOwnPivot": (lambda s: s["locators"], {}, False),
+    "parentHierarchically": (lambda s: s["groups"], {}, False),
+    "setJointsStyle": (lambda s: [s["joints"]], {}, False),
+    "colorize": (lambda s: s["curves"], {"red": True}, False),
+    "selectObjectOnly": (lambda s: [], {}, True),
+    "selectGroupOnly": (lambda s: [], {}, True),
+    "selectConstraintOnly": (lambda s: [], {}, True),
+    "selectJointOnly": (lambda s: [], {}, True),
+    "selectIKHandleOnly": (lambda s: [], {}, True),
+    "selectClusterOnly": (lambda s: [], {}, True),
+    "selectLocatorOnly": (lambda s: [], {}, True),
+    "selectNurbsCurveOnly": (lambda s: [], {}, True),
+    }
+
+
+def benchmarkBackends(numberOfObjects: int=500, module: str="general") -> dict:
+    """ Seconds of each helper of module with both backends,
+    each on a new scene of numberOfObjects of everything.
+    getPosition is called once per locator, the rest once.
+    >>> benchmarkBackends()
+    >>> {'groupOwnPivot': {'pymel': 2.1, 'fast': 0.3, 'speedup': 7.0}, ...}
+     """
+    import importlib
+    import maya.cmds as cmds
+    mod = importlib.import_module(module)
+    helpers = GENERAL_HELPERS if module == "general" else HJK_HELPERS
+    result = {}
+    for name in helpers:
+        args, kwargs, selectTop = BENCHMARKS[name]
+        seconds = {}
+        for backend, func in [("pymel", mod.PYMEL_HELPERS[name]), \
+                              ("fast", globals()[name])]:
+            scene = benchmarkScene(numberOfObjects)
+            if selectTop:
+                cmds.select(scene["top"])
+            timer = time.perf_counter()
+            if name == "getPosition":
+                for i in args(scene):
+                    func(i)
+            else:
+                func(*args(scene), **kwargs)
+            seconds[backend] = time.perf_counter() - timer
+        seconds["speedup"] = seconds["pymel"] / max(seconds["fast"], 1e-9)
+        result[name] = seconds
+        print(f"{name:<24}{seconds['pymel']:>9.3f}s{seconds['fast']:>9.3f}s" \
+            f"{seconds['speedup']:>8.1f}x")
+    return result
@@ -0,0 +1,326 @@
+import os
+import time
+import numpy as np
+import pymel.core as pm
+from buildContext import BuildContext
+from influencePrune import pruneSkins
+from jointFreeze import readRotations, freezeJoints
+from weightTransfer import getSkinCluster
+
+
+def names(items) -> list:
+    """ Unique strings of a command result, None is empty. """
+    return list(dict.fromkeys(str(i) for i in items or []))
+
+
+class NormalizePipeline:
+    def __init__(self, allJnt: list, delJnt: list, bindJnt: list, \
+                 unitTime: str="film", unitLength: str="cm", \
+                 frameRange: tuple=(0, 120)):
+        """ Cleans up an accuRig fbx, step by step.
+        Each step first asks the scene once what needs work,
+        and only acts on what it found. A clean scene costs
+        a few queries, and running it twice changes nothing.
+        - keys: cut the animCurves of the joints.
+        - skins: move the weights of delJnt to their parents.
+        - blendShapes: delete them and their target meshes.
+        - joints: delete the delJnt no skinCluster uses.
+        - root: allJnt[0] is deleted, allJnt[1] goes to the world.
+        - rotations: freeze the rotations of bindJnt,
+        after the root, so the hip is frozen in the world.
+        - units: film, cm and the frame range.
+        >>> pipeline = accuRigPipeline()
+        >>> pipeline.run(pm.ls(sl=True))
+        >>> {'keys': {'found': 214, 'detect': 0.002, 'act': 0.01}, ...}
+         """
+        self.allJnt = allJnt
+        self.delJnt = delJnt
+        self.bindJnt = bindJnt
+        self.unitTime = unitTime
+        self.unitLength = unitLength
+        self.frameRange = frameRange
+        self.steps = [
+            ("keys", self.keyedJoints, self.cutKeys),
+            ("skins", self.skinsToPrune, self.pruneSkins),
+            ("blendShapes", self.blendShapes, self.deleteBlendShapes),
+            ("joints", self.unusedJoints, self.deleteJoints),
+            ("root", self.rootJoint, self.deleteRoot),
+            ("rotations", self.rotatedJoints, self.freezeRotations),
+            ("units", self.wrongUnits, self.setUnits),
+            ]
+
+
+    def keyedJoints(self, meshes: list) -> list:
+        import maya.cmds as cmds
+        joints = cmds.ls(self.allJnt, type="joint")
+        if not joints:
+            return []
+        curves = cmds.listConnections(joints, s=True, d=False, \
+            type="animCurve")
+        if not curves:
+            return []
+        keyed = cmds.listConnections(curves, s=False, d=True, type="joint")
+        joints = set(names(joints))
+        return [i for i in names(keyed) if i in joints]
+
+
+    def cutKeys(self, meshes: list, joints: list) -> None:
+        import maya.cmds as cmds
+        cmds.cutKey(joints, clear=True)
+
+
+    def skinsToPrune(self, meshes: list) -> list:
+        """ The meshes whose skinCluster uses any delJnt. """
+        import maya.cmds as cmds
+        joints = cmds.ls(self.delJnt, type="joint")
+        if not joints:
+            return []
+        skins = names(cmds.listConnections(joints, s=False, d=True, \
+            type="skinCluster"))
+        if not skins:
+            return []
+        return [str(i) for i in meshes if getSkinCluster(i) in skins]
+
+
+    def pruneSkins(self, meshes: list, skinned: list) -> None:
+        pruneSkins(skinned, self.delJnt)
+
+
+    def blendShapes(self, meshes: list) -> list:
+        import maya.cmds as cmds
+        if not meshes:
+            return []
+        history = cmds.listHistory(meshes)
+        return names(cmds.ls(history, type="blendShape")) if history else []
+
+
+    def deleteBlendShapes(self, meshes: list, blendShapes: list) -> None:
+        """ The targets are the meshes in their history
+        that aren't one of the meshes.
+         """
+        import maya.cmds as cmds
+        shapes = cmds.listHistory(blendShapes, type="mesh")
+        parents = cmds.listRelatives(shapes, p=True) if shapes else []
+        keep = names(meshes)
+        targets = [i for i in names(parents) if i not in keep]
+        cmds.delete(blendShapes + targets)
+
+
+    def unusedJoints(self, meshes: list) -> list:
+        """ delJnt that exist and are no influence of any skinCluster. """
+        import maya.cmds as cmds
+        joints = names(cmds.ls(self.delJnt, type="joint"))
+        if not joints:
+            return []
+        used = []
+        for skin in names(cmds.ls(type="skinCluster")):
+            used += names(cmds.skinCluster(skin, q=True, inf=True))
+        used = {i.split("|")[-1] for i in used}
+        return [i for i in joints if i.split("|")[-1] not in used]
+
+
+    def deleteJoints(self, meshes: list, joints: list) -> None:
+        import maya.cmds as cmds
+        cmds.delete(joints)
+
+
+    def rotatedJoints(self, meshes: list) -> list:
+        import maya.cmds as cmds
+        joints = names(cmds.ls(self.bindJnt, type="joint"))
+        if not joints:
+            return []
+        rotate = readRotations(joints)["rotate"]
+        moved = np.abs(rotate).max(axis=1) > 1e-9
+        return [i for i, m in zip(joints, moved) if m]
+
+
+    def freezeRotations(self, meshes: list, joints: list) -> None:
+        freezeJoints(joints)
+
+
+    def wrongUnits(self, meshes: list) -> list:
+        import maya.cmds as cmds
+        result = []
+        if cmds.currentUnit(q=True, time=True) != self.unitTime:
+            result.append("time")
+        if cmds.currentUnit(q=True, linear=True) != self.unitLength:
+            result.append("linear")
+        start = cmds.playbackOptions(q=True, min=True)
+        end = cmds.playbackOptions(q=True, max=True)
+        if (start, end) != tuple(self.frameRange):
+            result.append("range")
+        return result
+
+
+    def setUnits(self, meshes: list, units: list) -> None:
+        import maya.cmds as cmds
+        if "time" in units:
+            cmds.currentUnit(time=self.unitTime)
+        if "linear" in units:
+            cmds.currentUnit(linear=self.unitLength)
+        if "range" in units:
+            start, end = self.frameRange
+            cmds.playbackOptions(min=start, max=end)
+
+
+    def rootJoint(self, meshes: list) -> list:
+        import maya.cmds as cmds
+        return names(cmds.ls(self.allJnt[0], type="joint"))
+
+
+    def deleteRoot(self, meshes: list, root: list) -> None:
+        """ The hip goes to the world first, if it is under the root. """
+        import maya.cmds as cmds
+        hip = self.allJnt[1]
+        if cmds.objExists(hip) and cmds.listRelatives(hip, p=True):
+            cmds.parent(hip, w=True)
+        cmds.delete(root)
+
+
+    def sceneMeshes(self) -> list:
+        """ Every mesh in the scene, but the blendShape targets.
+        A target is a mesh in the history of a blendShape
+        that isn't deformed by one.
+         """
+        import maya.cmds as cmds
+        shapes = cmds.ls(type="mesh", ni=True)
+        meshes = names(cmds.listRelatives(shapes, p=True) if shapes else [])
+        blendShapes = cmds.ls(type="blendShape")
+        if not blendShapes:
+            return meshes
+        shapes = cmds.ls(cmds.listHistory(blendShapes), type="mesh", ni=True)
+        parents = names(cmds.listRelatives(shapes, p=True) if shapes else [])
+        targets = [i for i in parents \
+            if not cmds.ls(cmds.listHistory(i), type="blendShape")]
+        return [i for i in meshes if i not in targets]
+
+
+    def run(self, meshes: list=None, dryRun: bool=False) -> dict:
+        """ Every step in order, in one undo chunk.
+        meshes are the bodies, every mesh in the scene
+        but the blendShape targets by default.
+        dryRun only detects.
+        Returns {step: {"found", "detect", "act"}}, seconds per step.
+         """
+        if meshes is None:
+            meshes = self.sceneMeshes()
+        meshes = names(meshes)
+        report = {}
+        with BuildContext("normalizeScene"):
+            for name, detect, act in self.steps:
+                timer = time.perf_counter()
+                found = detect(meshes)
+                detected = time.perf_counter() - timer
+                timer = time.perf_counter()
+                if found and not dryRun:
+                    act(meshes, found)
+                report[name] = {
+                    "found": len(found),
+                    "detect": detected,
+                    "act": time.perf_counter() - timer,
+                    }
+                print(f"{name:<12}{len(found):>6} found" \
+                    f"{detected:>9.3f}s{report[name]['act']:>9.3f}s")
+        return report
+
+
+    def runFiles(self, paths: list, outputFolder: str="", \
+                 suffix: str="_clean") -> dict:
+        """ Opens each file, runs every step on all of its meshes
+        and saves it as a .ma in outputFolder, or next to the file.
+        A file that fails is reported and the rest go on.
+        Works headless, in mayapy:
+        >>> import maya.standalone
+        >>> maya.standalone.initialize(name='python')
+        >>> import fbxNormalize
+        >>> fbxNormalize.accuRigPipeline().runFiles(glob.glob("D:/cc/*.fbx"))
+        >>> {'D:/cc/a.fbx': {'output': 'D:/cc/a_clean.ma', 'seconds': 1.2, \\
+        >>>     'steps': {...}}, ...}
+         """
+        import maya.cmds as cmds
+        # fbx files only open with the plug-in, mayapy doesn't load it.
+        cmds.loadPlugin("fbxmaya", quiet=True)
+        result = {}
+        for path in paths:
+            timer = time.perf_counter()
+            folder = outputFolder or os.path.dirname(path)
+            base = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(folder, f"{base}{suffix}.ma")
+            try:
+                cmds.file(path, o=True, f=True)
+                steps = self.run()
+                cmds.file(rename=output)
+                cmds.file(save=True, type="mayaAscii", f=True)
+                result[path] = {"output": output, "steps": steps}
+            except Exception as e:
+                result[path] = {"error": str(e)}
+                pm.warning(f"{path}: {e}")
+            result[path]["seconds"] = time.perf_counter() - timer
+        return result
+
+
+def accuRigPipeline() -> NormalizePipeline:
+    """ The pipeline with the joint lists of RawData. """
+    from accuRig import RawData
+    raw = RawData()
+    return NormalizePipeline(raw.allJnt, raw.delJnt, raw.bindJnt)
+
+
+def accuRigScene(numberOfVertices: int=5000) -> list:
+    """ A stand-in of an accuRig fbx import for benchmarks.
+    The joints are skinned, keyed and rotated, the body has a blendShape,
+    and the units are ntscf.
+     """
+    import maya.cmds as cmds
+    from influencePrune import characterScene
+    from accuRig import RawData
+    raw = RawData()
+    meshes = characterScene(raw.allJnt, numberOfVertices)
+    # Twist and share bones are leaves, like in a CC skeleton.
+    for jnt in raw.delJnt:
+        children = pm.listRelatives(jnt, c=True, type="joint")
+        parent = pm.listRelatives(jnt, p=True)
+        if children and parent:
+            pm.parent(children, parent[0])
+    rng = np.random.default_rng(0)
+    for jnt in raw.allJnt:
+        cmds.setKeyframe(jnt, at=["translate", "rotate"])
+        cmds.setAttr(f"{jnt}.rotate", *rng.uniform(-30, 30, 3))
+    target = pm.polyPlane(n="CC_Base_Body_smile", ch=False)[0]
+    pm.blendShape(target, meshes[0], n="CC_Base_Body_blendShape")
+    cmds.currentUnit(time="ntscf")
+    cmds.playbackOptions(min=1, max=300)
+    return meshes
+
+
+def benchmarkNormalize(numberOfVertices: int=5000) -> dict:
+    """ RawData.cleanUp steps one by one as before, then the pipeline,
+    then the pipeline again on the clean scene.
+    >>> benchmarkNormalize()
+    >>> {'before': 0.9, 'pipeline': 0.4, 'again': 0.004}
+     """
+    from accuRig import RawData
+    raw = RawData()
+    result = {}
+    meshes = accuRigScene(numberOfVertices)
+    timer = time.perf_counter()
+    raw.cutJntKeyframe()
+    unBindedJoints = raw.unbindSkin(*meshes)
+    # Only the body, a mesh without blendShape would delete the selection.
+    raw.deleteBlendShape(meshes[0])
+    raw.deleteUselessJnt(*unBindedJoints)
+    raw.resetRotation(*raw.bindJnt)
+    raw.unitChange()
+    pm.parent(raw.allJnt[1], w=True)
+    pm.delete(raw.allJnt[0])
+    result["before"] = time.perf_counter() - timer
+    meshes = accuRigScene(numberOfVertices)
+    pipeline = accuRigPipeline()
+    timer = time.perf_counter()
+    pipeline.run(meshes)
+    result["pipeline"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    pipeline.run(meshes)
+    result["again"] = time.perf_counter() - timer
+    print(result)
+    return result
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+# Rotation rows, like Maya matrices. Row i is where local axis i points,
+# a local vector v points to v @ rot.
+
+
+def normalized(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=float)
+    length = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(length < 1e-12, 1.0, length)
+
+
+def aimMatrix(aim, up=(0, 1, 0), aimAxis=(1, 0, 0), \
+              upAxis=(0, 1, 0)) -> np.ndarray:
+    """ The rotation of an aimConstraint with a vector world up.
+    aimAxis points along aim, upAxis is as close to up as it gets.
+    aim and up are (3,) or (n, 3), the result is (3, 3) or (n, 3, 3).
+    Where aim is parallel to up, world z is used as up.
+    >>> aimMatrix((0, 0, 5))
+    >>> aimMatrix(normals, aimAxis=(0, 0, -1))
+     """
+    aim = np.asarray(aim, dtype=float)
+    single = aim.ndim == 1
+    a = normalized(np.atleast_2d(aim))
+    u = np.broadcast_to(np.asarray(up, dtype=float), a.shape).copy()
+    side = np.cross(a, u)
+    parallel = np.linalg.norm(side, axis=1) < 1e-9
+    side[parallel] = np.cross(a[parallel], (0.0, 0.0, 1.0))
+    side = normalized(side)
+    world = np.stack([a, np.cross(side, a), side], axis=1)
+    aimAxis = normalized(aimAxis)
+    upAxis = normalized(np.subtract(upAxis, \
+        np.dot(upAxis, aimAxis) * aimAxis))
+    local = np.array([aimAxis, upAxis, np.cross(aimAxis, upAxis)])
+    # local @ rot = world, local is orthonormal.
+    result = local.T @ world
+    return result[0] if single else result
+
+
+def threePointFrame(p0, p1, p2) -> np.ndarray:
+    """ x points from p0 to p1, y is the normal of the plane,
+    p2 is on the -z side. Like snap3PointsTo3Points of a polyPlane.
+    Points are (3,) or (n, 3).
+     """
+    p0, p1, p2 = [np.asarray(i, dtype=float) for i in (p0, p1, p2)]
+    x = np.subtract(p1, p0)
+    normal = np.cross(x, np.subtract(p2, p0))
+    return aimMatrix(x, normal)
+
+
+def composeMatrix(rot, pos) -> np.ndarray:
+    """ 4x4 matrices of rotation rows and positions, (n, 4, 4) for n. """
+    rot = np.asarray(rot, dtype=float)
+    pos = np.asarray(pos, dtype=float)
+    result = np.zeros(rot.shape[:-2] + (4, 4))
+    result[..., :3, :3] = rot
+    result[..., 3, :3] = pos
+    result[..., 3, 3] = 1.0
+    return result
+
+
+def eulerFromMatrix(rot: np.ndarray) -> np.ndarray:
+    """ xyz euler angles in degrees of rotation rows,
+    the inverse of eulerMatrices in xyz. rot can be (3, 3) or (n, 3, 3).
+     """
+    rot = np.asarray(rot, dtype=float)
+    ry = np.arcsin(np.clip(-rot[..., 0, 2], -1.0, 1.0))
+    rx = np.arctan2(rot[..., 1, 2], rot[..., 2, 2])
+    rz = np.arctan2(rot[..., 0, 1], rot[..., 0, 0])
+    # Gimbal lock, rz is folded into rx.
+    locked = np.abs(rot[..., 0, 2]) > 0.999999
+    rx = np.where(locked, np.arctan2(-rot[..., 2, 1], rot[..., 1, 1]), rx)
+    rz = np.where(locked, 0.0, rz)
+    return np.degrees(np.stack([rx, ry, rz], axis=-1))
+
+
+# The rotateOrder enum of a transform.
+ROTATE_ORDERS = ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+
+
+def eulerMatrices(angles, orders=0) -> np.ndarray:
+    """ Rotation rows of euler angles in degrees, in any rotate order.
+    angles is (3,) or (n, 3), orders is an int or (n,) of ROTATE_ORDERS.
+    The first axis of the order turns first, xyz is x @ y @ z.
+    >>> eulerMatrices((0, 90, 0))
+    >>> eulerMatrices(rotates, [0, 5, 5, 2])
+     """
+    angles = np.asarray(angles, dtype=float)
+    single = angles.ndim == 1
+    radians = np.radians(np.atleast_2d(angles))
+    count = len(radians)
+    cos, sin = np.cos(radians), np.sin(radians)
+    axes = np.zeros((3, count, 3, 3))
+    for axis in range(3):
+        a, b = [i for i in range(3) if i != axis]
+        axes[axis, :, axis, axis] = 1.0
+        axes[axis, :, a, a] = cos[:, axis]
+        axes[axis, :, b, b] = cos[:, axis]
+        # Row vectors, so the sine above the diagonal is positive on x, z.
+        sign = -1.0 if axis == 1 else 1.0
+        axes[axis, :, a, b] = sign * sin[:, axis]
+        axes[axis, :, b, a] = -sign * sin[:, axis]
+    orders = np.broadcast_to(np.asarray(orders, dtype=np.int64), (count,))
+    result = np.empty((count, 3, 3))
+    for index, order in enumerate(ROTATE_ORDERS):
+        rows = np.flatnonzero(orders == index)
+        if not len(rows):
+            continue
+        first, second, third = ["xyz".index(i) for i in order]
+        result[rows] = axes[first, rows] @ axes[second, rows] \
+            @ axes[third, rows]
+    return result[0] if single else result
+
+
+def frozenOrients(rotate, rotateOrder, jointOrient) -> np.ndarray:
+    """ The jointOrient that keeps each joint where it is
+    when its rotate goes to zero, (n, 3) in degrees.
+    A joint turns by rotate in its rotateOrder, then by jointOrient in xyz,
+    so the new jointOrient is the xyz angles of both together.
+    >>> frozenOrients([(0, 45, 0)], [0], [(0, 0, 90)])
+    >>> array([[ 0., 45., 90.]])
+     """
+    rotation = eulerMatrices(np.atleast_2d(rotate), rotateOrder) \
+        @ eulerMatrices(np.atleast_2d(jointOrient))
+    return eulerFromMatrix(rotation)
+
+
+def verifyFrozenOrients(count: int=10000, seed: int=0) -> dict:
+    """ Checks eulerMatrices against one axis at a time,
+    and frozenOrients against the composed matrices,
+    with random angles in every rotate order. Needs only numpy.
+    >>> verifyFrozenOrients()
+    >>> {'orders': 0.0, 'frozen': 5.7e-15, 'componentWise': 2.0}
+     """
+    rng = np.random.default_rng(seed)
+    rotate = rng.uniform(-180, 180, (count, 3))
+    jointOrient = rng.uniform(-180, 180, (count, 3))
+    orders = rng.integers(0, len(ROTATE_ORDERS), count)
+    matrices = eulerMatrices(rotate, orders)
+    errors = []
+    for i in range(count):
+        single = np.identity(3)
+        for axis in ROTATE_ORDERS[orders[i]]:
+            angles = np.zeros(3)
+            angles["xyz".index(axis)] = rotate[i, "xyz".index(axis)]
+            single = single @ eulerMatrices(angles)
+        errors.append(np.abs(single - matrices[i]).max())
+    composed = matrices @ eulerMatrices(jointOrient)
+    frozen = eulerMatrices(frozenOrients(rotate, orders, jointOrient))
+    # Adding the angles, like resetRotation did, for comparison.
+    added = eulerMatrices(rotate + jointOrient)
+    result = {
+        "orders": float(max(errors)),
+        "frozen": float(np.abs(frozen - composed).max()),
+        "componentWise": float(np.abs(added - composed).max()),
+        }
+    print(result)
+    return result
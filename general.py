@@ -1,22 +1,29 @@
-from collections import Iterable, Counter
+from collections import Counter
+from collections.abc import Iterable
+import os
+import re
 import math
+import time
 import numpy as np
 import sympy
 import pymel.core as pm
 import maya.OpenMaya as om
+from curvePlacement import createJointsOnCurve, straightCurvePoints
+from frameMath import aimMatrix, composeMatrix
+import fastHelpers
+from pivotGroups import groupByMode
+from positionQuery import getPositions, getBoundingBoxes
 
 
 def getPosition(selection: str) -> tuple:
     """ Get the coordinates of an object or point.
+    A missing object raises MayaNodeError.
     >>> getPosition("pSphere1")
     >>> getPosition("pSphere1.vtx[317]")
     >>> (0.0, 0.0, 0.0)
      """
-    try:
-        position = pm.pointPosition(selection)
-    except:
-        position = pm.xform(selection, q=1, ws=1, rp=1)
-    result = tuple(position)
+    position = getPositions([selection])[0]
+    result = tuple(position.tolist())
     return result
 
 
@@ -45,8 +52,19 @@ def getFlattenList(*args):
     return result
 
 
+def getBoundingBox(vertexOrObject) -> list:
+    """ One box around everything, like xform -q -bb -ws. """
+    if isinstance(vertexOrObject, str) or \
+            not isinstance(vertexOrObject, Iterable):
+        vertexOrObject = [vertexOrObject]
+    boxes = getBoundingBoxes(vertexOrObject)
+    result = np.nanmin(boxes[:, :3], axis=0).tolist() \
+        + np.nanmax(boxes[:, 3:], axis=0).tolist()
+    return result
+
+
 def getBoundingBoxPosition(vertexOrObject) -> list:
-    boundingBox = pm.xform(vertexOrObject, q=True, bb=True, ws=True)
+    boundingBox = getBoundingBox(vertexOrObject)
     xMin, yMin, zMin, xMax, yMax, zMax = boundingBox
     x = (xMin + xMax) / 2
     y = (yMin + yMax) / 2
@@ -55,7 +73,7 @@ def getBoundingBoxPosition(vertexOrObject) -> list:
 
 
 def getBoundingBoxSize(vertexOrObject) -> list:
-    boundingBox = pm.xform(vertexOrObject, q=True, bb=True, ws=True)
+    boundingBox = getBoundingBox(vertexOrObject)
     xMin, yMin, zMin, xMax, yMax, zMax = boundingBox
     x = (xMax - xMin) / 2
     y = (yMax - yMin) / 2
@@ -109,7 +127,7 @@ def createCurvePassingKeyedUp(startFrame, endFrame, objects=[]):
 def createCurvePassingThrough(objects=[]) -> str:
     """ Return curveName """
     sel = objects if objects else pm.ls(sl=True, fl=True)
-    positions = [getPosition(i) for i in sel]
+    positions = getPositions(sel).tolist()
     curve = pm.curve(ep=positions, d=3)
     return curve
 
@@ -122,7 +140,7 @@ def createClosedCurve(objects=[]) -> str:
     >>> return "circleName"
      """
     sel = objects if objects else pm.ls(sl=True, fl=True)
-    positions = [getPosition(i) for i in sel]
+    positions = getPositions(sel).tolist()
     circle = pm.circle(nr=(0, 1, 0), ch=False, s=len(sel))
     circle = circle[0]
     for i, pos in enumerate(positions):
@@ -136,23 +154,61 @@ def createCurveAimingPoint(objects=[]) -> str:
     >>> return "curveName"
      """
     sel = objects if objects else pm.ls(sl=True, fl=True)
-    positions = [getPosition(i) for i in [sel[0], sel[-1]]]
-    simpleCurve = pm.curve(p=positions, d=1)
-    locators = []
-    for i in positions:
-        locator = pm.spaceLocator()
-        pm.move(locator, i)
-        locators.append(locator)
-    startLocator, endLocator = locators
-    pm.aimConstraint(endLocator, startLocator)
-    pm.delete(startLocator, cn=True)
-    makeSameAsParentPivot(simpleCurve, startLocator)
-    pm.rebuildCurve(simpleCurve, d=3, ch=0, s=3, rpo=1, end=1, kr=0, kt=0)
-    pm.delete(locators)
+    start, end = getPositions([sel[0], sel[-1]])
+    length = np.linalg.norm(end - start)
+    simpleCurve = pm.curve(p=straightCurvePoints(length), d=3)
+    matrix = composeMatrix(aimMatrix(end - start), start)
+    pm.xform(simpleCurve, m=matrix.ravel().tolist(), ws=True)
     return simpleCurve
 
 
+def getVertexNormals(vertices: list) -> tuple:
+    """ World positions and normals of vertices, (n, 3) arrays.
+    Each mesh is read once.
+    >>> getVertexNormals(["pSphere1.vtx[0]", "pSphere1.vtx[2:5]"])
+     """
+    import maya.api.OpenMaya as om2
+    pattern = re.compile(r"^(.+)\.vtx\[(\d+)(?::(\d+))?\]$")
+    order = []
+    for vtx in vertices:
+        mesh, start, end = pattern.match(str(vtx)).groups()
+        end = end if end else start
+        order += [(mesh, i) for i in range(int(start), int(end) + 1)]
+    meshes = {}
+    for mesh in dict.fromkeys(i[0] for i in order):
+        sel = om2.MSelectionList()
+        sel.add(mesh)
+        dag = sel.getDagPath(0)
+        dag.extendToShape()
+        fn = om2.MFnMesh(dag)
+        points = fn.getPoints(om2.MSpace.kWorld)
+        normals = fn.getVertexNormals(False, om2.MSpace.kWorld)
+        meshes[mesh] = (np.array(points)[:, :3], np.array(normals))
+    positions = np.array([meshes[m][0][i] for m, i in order])
+    normals = np.array([meshes[m][1][i] for m, i in order])
+    return positions, normals
+
+
 def createCurvesNormalDirection(vertex=[]) -> list:
+    """ A unit curve on each vertex, aiming along its normal. """
+    sel = vertex if vertex else pm.ls(sl=True, fl=True)
+    if not sel:
+        return []
+    positions, normals = getVertexNormals(sel)
+    matrices = composeMatrix(aimMatrix(normals), positions)
+    points = straightCurvePoints(1.0)
+    result = []
+    for matrix in matrices:
+        unitCurve = pm.curve(p=points, d=3)
+        pm.xform(unitCurve, m=matrix.ravel().tolist(), ws=True)
+        result.append(unitCurve)
+    return result
+
+
+def createCurvesNormalDirection_locators(vertex=[]) -> list:
+    """ The previous version with temporary locators and aimConstraints,
+    kept for benchmarkNormalCurves.
+     """
     sel = vertex if vertex else pm.ls(sl=True, fl=True)
     result = []
     for vtx in sel:
@@ -164,13 +220,42 @@ def createCurvesNormalDirection(vertex=[]) -> list:
             locator = pm.spaceLocator()
             locators.append(locator)
             pm.move(locator, pos)
-        unitCurve = createCurveAimingPoint(locators)
+        startLocator, endLocator = locators
+        unitCurve = pm.curve(p=[(0, 0, 0), normalVector], d=1)
+        pm.aimConstraint(endLocator, startLocator)
+        pm.delete(startLocator, cn=True)
+        makeSameAsParentPivot(unitCurve, startLocator)
+        pm.rebuildCurve(unitCurve, d=3, ch=0, s=3, rpo=1, end=1, kr=0, kt=0)
         pm.move(unitCurve, vertexPosition)
         pm.delete(locators)
         result.append(unitCurve)
     return result
 
 
+def benchmarkNormalCurves(numberOfVertices: int=5000) -> dict:
+    """ Normal curves on 5k vertices of a plane,
+    with temporary locators and with the frame math.
+    >>> benchmarkNormalCurves()
+    >>> {'locators': 95.2, 'frameMath': 4.1}
+     """
+    import maya.cmds as cmds
+    side = int(math.ceil(math.sqrt(numberOfVertices))) - 1
+    result = {}
+    methods = {
+        "locators": createCurvesNormalDirection_locators,
+        "frameMath": createCurvesNormalDirection
+        }
+    for key, func in methods.items():
+        cmds.file(new=True, force=True)
+        plane = pm.polyPlane(sx=side, sy=side, w=100, h=100, ch=False)[0]
+        vertices = [f"{plane}.vtx[{i}]" for i in range(numberOfVertices)]
+        timer = time.perf_counter()
+        func(vertices)
+        result[key] = time.perf_counter() - timer
+    print(result)
+    return result
+
+
 def selectObjectOnly() -> list:
     shapeNodes = pm.ls(sl=True, dag=True, type=['mesh', 'nurbsSurface'])
     objectNodes = {i.getParent() for i in shapeNodes}
@@ -309,14 +394,21 @@ def groupOwnPivot(*args, **kwargs) -> list:
     >>> ["pCube1_grp", "pCube1_null", "pCube1"]
     - groupOwnPivot("pCube1", null=True, n="newName") \\
     >>> ["newName_grp", "newName_null", "pCube1"]
+    - groupOwnPivot("pCube1", mode="batch") \\
+    >>> ["pCube1_grp", "pCube1"]
+    - groupOwnPivot("pCube1", mode="offsetParent") \\
+    >>> ["pCube1"]
      """
     selections = args if args else pm.ls(sl=True)
-    flags = {"null": False, "n": ""}
+    flags = {"null": False, "n": "", "mode": "group"}
     for key, value in kwargs.items():
         if key in flags:
             flags[key] = value
         else:
             continue
+    if flags["mode"] != "group":
+        return groupByMode(flags["mode"], selections, flags["null"], \
+            flags["n"])
     result = []
     for i in selections:
         objName = flags["n"]
@@ -352,7 +444,7 @@ def createPolevectorJoint(*args) -> list:
     if len(jnt) != 3:
         pm.warning("Three joints needed.")
         return
-    jntPosition = [getPosition(i) for i in jnt]
+    jntPosition = getPositions(jnt).tolist()
     middleJnt, endJnt = jnt[1:3]
     result = []
     pm.select(cl=True)
@@ -382,7 +474,7 @@ def setJointsStyle(joints=[], drawStyle=2) -> list:
     return result
 
 
-def parentHierarchically(*args) -> None:
+def parentHierarchically(*args) -> list:
     """ Hierarchically parent.
     >>> parentHierarchically(*lst)
     >>> parentHierarchically(parents, child)
@@ -394,6 +486,7 @@ def parentHierarchically(*args) -> None:
             pm.parent(child, parents)
         except:
             continue
+    return sel
 
 
 def softSelection():
@@ -593,7 +686,21 @@ def createJointOnMotionPath(numberOfJoints: int, *arg) -> None:
 
 
 def createJointOnCurveSameSpacing(numberOfJoints: int) -> list:
-    """ Create joints with Same Spacing on the curve. """
+    """ Create joints with Same Spacing on the curve.
+    The positions and the orientation are computed from the curve,
+    the chain is created at once, see curvePlacement.
+     """
+    sel = pm.selected()
+    if not sel:
+        return
+    result = createJointsOnCurve(sel[0], numberOfJoints)
+    return result
+
+
+def createJointOnCurveSameSpacing_motionPath(numberOfJoints: int) -> list:
+    """ The previous version with temporary motionPath nodes,
+    kept for benchmarkCurvePlacement.
+     """
     joints = createJointOnMotionPath(numberOfJoints)
     newJoints = []
     for i in joints:
@@ -1072,12 +1179,11 @@ class Controllers:
         return result
 
 
+# from connectionPlan import connectPairs
 # channel = ["translate", "rotate", "scale", "visibility"]
 # sel = pm.ls(sl=True)
-# for rig in sel:
-#     jnt = rig.replace("rig_", "jnt_")
-#     for i in channel:
-#         pm.connectAttr(f"{rig}.{i}", f"{jnt}.{i}", f=True)
+# pairs = [(rig, rig.replace("rig_", "jnt_")) for rig in sel]
+# connectPairs(pairs, channel)
 
 # Controllers().createControllers(pipe="")
 # groupOwnPivot(null=True)
@@ -1169,4 +1275,13 @@ class Controllers:
     # pm.parentConstraint(cc, jnt, mo=True, w=1.0)
 
 
-# createJointOnMotionPath(5)
\ No newline at end of file
+# createJointOnMotionPath(5)
+
+
+# RIGMODULES_BACKEND=fast, set before the first import, swaps the helpers
+# in fastHelpers.GENERAL_HELPERS for their maya.cmds and OpenMaya versions.
+BACKEND = os.environ.get("RIGMODULES_BACKEND", "pymel")
+PYMEL_HELPERS = {i: globals()[i] for i in fastHelpers.GENERAL_HELPERS}
+if BACKEND == "fast":
+    globals().update({i: getattr(fastHelpers, i) \
+        for i in fastHelpers.GENERAL_HELPERS})
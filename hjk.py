@@ -1,10 +1,14 @@
-from collections import Iterable
+from collections.abc import Iterable
+import os
 import re
 import math
 import numpy as np
 import sympy
 import pymel.core as pm
 import maya.OpenMaya as om
+from selectionCapture import captureRanges
+import fastHelpers
+from pivotGroups import groupByMode
 
 
 def getPosition(selection: str) -> tuple:
@@ -89,22 +93,11 @@ def getNumberIndex(name: str) -> dict:
 
 
 def getVertexNumber() -> dict:
-    """ Get vertex numbers only, strip others. """
-    sel = pm.ls(sl=True)
-    obj = pm.ls(sel, o=True)
-    shapes = set(obj)
-    result = {}
-    for shp in shapes:
-        pattern = r'\.vtx\[\d+(?::\d+)?\]'
-        vertexNumbers = []
-        for i in sel:
-            try:
-                temp = re.search(pattern, i.name())
-                vertexNumbers.append(temp.group())
-            except:
-                continue
-        result[shp.getParent().name()] = vertexNumbers
-    return result
+    """ Get vertex numbers only, strip others.
+    Each mesh gets only its own vertices, as ranges.
+    >>> {'pSphere1': ['.vtx[3:5]', '.vtx[7]']}
+     """
+    return captureRanges("vtx")
 
 
 def getSubJoint(startJnt: str, endJoint: str) -> list:
@@ -614,14 +607,21 @@ def groupOwnPivot(*args, **kwargs) -> list:
     >>> ["pCube1_grp", "pCube1_null", "pCube1"]
     >>> groupOwnPivot("pCube1", null=True, n="newName")
     >>> ["newName_grp", "newName_null", "pCube1"]
+    >>> groupOwnPivot("pCube1", mode="batch")
+    >>> ["pCube1_grp", "pCube1"]
+    >>> groupOwnPivot("pCube1", mode="offsetParent")
+    >>> ["pCube1"]
      """
     sel = args if args else pm.selected()
-    flags = {"null": False, "n": ""}
+    flags = {"null": False, "n": "", "mode": "group"}
     for key, value in kwargs.items():
         if key in flags:
             flags[key] = value
         else:
             continue
+    if flags["mode"] != "group":
+        return groupByMode(flags["mode"], sel, flags["null"], \
+            flags["n"])
     result = []
     for i in sel:
         objName = flags["n"]
@@ -1460,3 +1460,10 @@ class Controllers:
         return result
 
 
+# RIGMODULES_BACKEND=fast, set before the first import, swaps the helpers
+# in fastHelpers.HJK_HELPERS for their maya.cmds and OpenMaya versions.
+BACKEND = os.environ.get("RIGMODULES_BACKEND", "pymel")
+PYMEL_HELPERS = {i: globals()[i] for i in fastHelpers.HJK_HELPERS}
+if BACKEND == "fast":
+    globals().update({i: getattr(fastHelpers, i) \
+        for i in fastHelpers.HJK_HELPERS})
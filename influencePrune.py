@@ -0,0 +1,144 @@
+import time
+import numpy as np
+import pymel.core as pm
+from weightMath import redistributeWeights
+from weightTransfer import getSkinCluster, meshDag, readWeights, \
+    writeWeights
+
+
+def ancestors(jnt: str, chains: dict) -> list:
+    """ The parents of jnt up to the top, looked up once per joint. """
+    if jnt not in chains:
+        parent = pm.listRelatives(jnt, p=True)
+        if parent:
+            name = parent[0].name()
+            chains[jnt] = [name] + ancestors(name, chains)
+        else:
+            chains[jnt] = []
+    return chains[jnt]
+
+
+def pruneInfluences(mesh: str, remove: list, mode: str="ancestor", \
+                    chains: dict=None, undoable: bool=True) -> dict:
+    """ Removes influences from the skinCluster of mesh in one pass.
+    The weight matrix is read once, the weights of each removed influence
+    go to its nearest kept ancestor with mode="ancestor",
+    or are dropped and normalized with mode="normalize".
+    The changed weights are written once,
+    and all removed influences go with one skinCluster.
+    Both are undoable, undoable=False writes the weights
+    without the undoable command, see writeWeights.
+    Returns a report of what happened to each influence.
+    >>> pruneInfluences("CC_Base_Body", ["CC_Base_L_Eye", "CC_Base_Teeth01"])
+    >>> {'skinCluster': 'skinCluster1', 'removed': [...], \\
+    >>>     'moved': {'CC_Base_L_Eye': 'CC_Base_Head', ...}, \\
+    >>>     'normalized': [], 'missing': [], 'emptyVertices': 0}
+     """
+    chains = {} if chains is None else chains
+    report = {"skinCluster": getSkinCluster(mesh), "removed": [], \
+        "moved": {}, "normalized": [], "missing": [], "emptyVertices": 0}
+    skin = report["skinCluster"]
+    if not skin:
+        return report
+    dag = meshDag(mesh)
+    names, weights = readWeights(skin, dag)
+    remove = [str(i) for i in remove]
+    report["missing"] = [i for i in remove if i not in names]
+    dead = [i for i in names if i in remove]
+    kept = [i for i in names if i not in remove]
+    targets = {}
+    for jnt in dead:
+        parents = ancestors(jnt, chains) if mode == "ancestor" else []
+        target = next((i for i in parents if i in kept), None)
+        if target:
+            report["moved"][jnt] = target
+        else:
+            report["normalized"].append(jnt)
+        targets[names.index(jnt)] = names.index(target) if target else None
+    if not dead:
+        return report
+    pruned = redistributeWeights(weights, targets)
+    report["emptyVertices"] = int(np.sum(pruned.sum(axis=1) == 0))
+    # Only the rows and columns that changed are written.
+    changed = pruned != weights
+    rows = np.flatnonzero(changed.any(axis=1))
+    columns = np.flatnonzero(changed.any(axis=0))
+    writeWeights(skin, dag, pruned[np.ix_(rows, columns)], rows, columns, \
+        undoable)
+    pm.skinCluster(skin, e=True, ri=dead)
+    report["removed"] = dead
+    return report
+
+
+def pruneSkins(meshes: list, remove: list, mode: str="ancestor", \
+               undoable: bool=True) -> dict:
+    """ pruneInfluences for each mesh, {mesh: report}. """
+    chains = {}
+    result = {}
+    for mesh in meshes:
+        result[str(mesh)] = pruneInfluences(mesh, remove, mode, chains, \
+            undoable)
+    return result
+
+
+def characterScene(joints: list, numberOfVertices: int=20000) -> list:
+    """ A stand-in of a CC character for benchmarks.
+    The joints are a chain in the order of the list,
+    a body and four small meshes are skinned to all of them,
+    four random influences per vertex.
+     """
+    import maya.cmds as cmds
+    cmds.file(new=True, force=True)
+    pm.select(cl=True)
+    jnts = [pm.joint(p=(0, i, 0), n=name) for i, name in enumerate(joints)]
+    rng = np.random.default_rng(0)
+    meshes = []
+    sizes = [numberOfVertices] + [1000] * 4
+    names = ["CC_Base_Body", "CC_Base_Eye", "CC_Base_Teeth", \
+        "CC_Base_Tongue", "CC_Base_EyeOcclusion"]
+    for name, size in zip(names, sizes):
+        side = int(np.sqrt(size)) - 1
+        geo = pm.polyPlane(n=name, sx=side, sy=side, ch=False)[0]
+        skin = pm.skinCluster(jnts, geo, tsb=True, nw=1)
+        count = (side + 1) ** 2
+        weights = np.zeros((count, len(jnts)))
+        for _ in range(4):
+            cols = rng.integers(0, len(jnts), count)
+            weights[np.arange(count), cols] += rng.random(count)
+        weights /= weights.sum(axis=1, keepdims=True)
+        writeWeights(skin.name(), meshDag(geo), weights, undoable=False)
+        meshes.append(geo)
+    return meshes
+
+
+def removePerJoint(meshes: list, remove: list) -> None:
+    """ What accuRig did before, one skinCluster -ri per joint and mesh. """
+    for geo in meshes:
+        skin = getSkinCluster(geo)
+        for jnt in remove:
+            try:
+                pm.skinCluster(skin, e=True, ri=jnt)
+            except:
+                continue
+
+
+def benchmarkPrune(numberOfVertices: int=20000) -> dict:
+    """ The 30 delJnt of accuRig removed from a CC character,
+    with one skinCluster -ri per joint and mesh, and with pruneSkins,
+    undoable and not.
+    >>> benchmarkPrune()
+    >>> {'perJoint': 2.4, 'onePass': 0.9, 'setWeights': 0.1}
+     """
+    from accuRig import RawData
+    raw = RawData()
+    result = {}
+    for method in ["perJoint", "onePass", "setWeights"]:
+        meshes = characterScene(raw.allJnt, numberOfVertices)
+        timer = time.perf_counter()
+        if method == "perJoint":
+            removePerJoint(meshes, raw.delJnt)
+        else:
+            pruneSkins(meshes, raw.delJnt, undoable=method == "onePass")
+        result[method] = time.perf_counter() - timer
+    print(result)
+    return result
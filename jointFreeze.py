@@ -0,0 +1,134 @@
+import time
+import numpy as np
+import pymel.core as pm
+from buildContext import BuildContext
+from frameMath import frozenOrients, ROTATE_ORDERS
+
+
+def skeletonOf(*roots) -> list:
+    """ Every joint under the roots, the roots too, in dag order.
+    With no roots, the selected joints are the roots.
+     """
+    import maya.cmds as cmds
+    roots = [str(i) for i in roots] or cmds.ls(sl=True, type="joint")
+    if not roots:
+        return []
+    joints = cmds.ls(roots, dag=True, type="joint", long=True) or []
+    result = []
+    for i in joints:
+        if i not in result:
+            result.append(i)
+    return result
+
+
+def readRotations(joints: list) -> dict:
+    """ rotate, jointOrient and rotateOrder of every joint,
+    read from the plugs without running a command.
+    Angles are (n, 3) in degrees, whatever the scene unit is.
+     """
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    for jnt in joints:
+        sel.add(str(jnt))
+    count = len(joints)
+    rotate = np.zeros((count, 3))
+    jointOrient = np.zeros((count, 3))
+    rotateOrder = np.zeros(count, dtype=np.int64)
+    for i in range(count):
+        fn = om2.MFnDependencyNode(sel.getDependNode(i))
+        for axis, xyz in enumerate("XYZ"):
+            plug = fn.findPlug(f"rotate{xyz}", False)
+            rotate[i, axis] = plug.asMAngle().asDegrees()
+            plug = fn.findPlug(f"jointOrient{xyz}", False)
+            jointOrient[i, axis] = plug.asMAngle().asDegrees()
+        rotateOrder[i] = fn.findPlug("rotateOrder", False).asInt()
+    return {
+        "joints": [str(i) for i in joints],
+        "rotate": rotate,
+        "jointOrient": jointOrient,
+        "rotateOrder": rotateOrder,
+        }
+
+
+def freezeJoints(joints: list, tolerance: float=1e-9) -> list:
+    """ Moves the rotate of each joint into its jointOrient,
+    the joints stay where they are and rotate is zero.
+    Everything is read at once, the new jointOrients are composed
+    as matrices in one go, and only joints that rotate are written,
+    in one undo chunk. rotateAxis is kept as it is.
+    Returns the joints that changed.
+    >>> freezeJoints(skeletonOf("CC_Base_Hip"))
+    >>> ['|CC_Base_Hip|CC_Base_Pelvis', ...]
+     """
+    import maya.cmds as cmds
+    if not joints:
+        return []
+    data = readRotations(joints)
+    moved = np.abs(data["rotate"]).max(axis=1) > tolerance
+    rows = np.flatnonzero(moved)
+    if not len(rows):
+        return []
+    orients = frozenOrients(data["rotate"][rows], \
+        data["rotateOrder"][rows], data["jointOrient"][rows])
+    changed = [data["joints"][i] for i in rows]
+    with BuildContext("freezeJoints"):
+        for jnt, (x, y, z) in zip(changed, orients.tolist()):
+            cmds.setAttr(f"{jnt}.jointOrient", x, y, z)
+            cmds.setAttr(f"{jnt}.rotate", 0, 0, 0)
+    return changed
+
+
+def freezeSkeleton(*roots) -> list:
+    """ freezeJoints on every joint under the roots or the selection. """
+    return freezeJoints(skeletonOf(*roots))
+
+
+def benchmarkFreeze(numberOfJoints: int=300) -> dict:
+    """ A chain of joints with random rotates, jointOrients
+    and rotate orders, frozen with the loop of RawData.resetRotation
+    and with freezeJoints, each in a new scene.
+    The error is how far the world rotations moved.
+    >>> benchmarkFreeze()
+    >>> {'perAxis': 0.28, 'perAxisError': 1.99, 'batched': 0.08, \\
+    >>>     'batchedError': 6.6e-15}
+     """
+    import maya.cmds as cmds
+    rng = np.random.default_rng(0)
+    rotate = rng.uniform(-90, 90, (numberOfJoints, 3))
+    jointOrient = rng.uniform(-90, 90, (numberOfJoints, 3))
+    orders = rng.integers(0, len(ROTATE_ORDERS), numberOfJoints)
+    result = {}
+    for method in ["perAxis", "batched"]:
+        cmds.file(new=True, force=True)
+        pm.select(cl=True)
+        joints = []
+        for i in range(numberOfJoints):
+            jnt = pm.joint(p=(0, i, 0), n=f"bench_freeze{i}").name()
+            cmds.setAttr(f"{jnt}.rotateOrder", int(orders[i]))
+            cmds.setAttr(f"{jnt}.jointOrient", *jointOrient[i])
+            cmds.setAttr(f"{jnt}.rotate", *rotate[i])
+            joints.append(jnt)
+        before = worldRotations(joints)
+        timer = time.perf_counter()
+        if method == "perAxis":
+            for jnt in joints:
+                jnt = pm.PyNode(jnt)
+                rot = jnt.getRotation()
+                for i, r in zip(["X", "Y", "Z"], rot):
+                    exists = pm.getAttr(f"{jnt}.jointOrient{i}")
+                    pm.setAttr(f"{jnt}.jointOrient{i}", r + exists)
+                    pm.setAttr(f"{jnt}.rotate{i}", 0)
+        else:
+            freezeSkeleton(joints[0])
+        result[method] = time.perf_counter() - timer
+        after = worldRotations(joints)
+        result[f"{method}Error"] = float(np.abs(after - before).max())
+    print(result)
+    return result
+
+
+def worldRotations(joints: list) -> np.ndarray:
+    """ World rotation rows of the joints, (n, 3, 3). """
+    values = [pm.xform(i, q=True, m=True, ws=True) for i in joints]
+    matrices = np.array(values, dtype=float).reshape(-1, 4, 4)
+    return matrices[:, :3, :3]
@@ -0,0 +1,177 @@
+import time
+import numpy as np
+import pymel.core as pm
+from exprCompiler import Graph, createGraph, measureFps
+from frameMath import aimMatrix
+
+
+# "constraint" uses Maya's constraint nodes,
+# "matrix" uses multMatrix and offsetParentMatrix or decomposeMatrix.
+BACKENDS = ["constraint", "matrix"]
+
+
+def getMatrix(obj) -> np.ndarray:
+    """ The world matrix as a 4x4 array.
+    Maya matrices are row vectors, a point is p @ matrix.
+     """
+    values = pm.xform(obj, q=True, m=True, ws=True)
+    result = np.array(values, dtype=float).reshape(4, 4)
+    return result
+
+
+def setMatrix(obj, matrix: np.ndarray) -> None:
+    pm.xform(obj, m=np.asarray(matrix).ravel().tolist(), ws=True)
+
+
+def eulerMatrix(rotate) -> np.ndarray:
+    """ The rotation matrix of xyz euler angles in degrees. """
+    rx, ry, rz = np.radians(rotate)
+    cx, sx = np.cos(rx), np.sin(rx)
+    cy, sy = np.cos(ry), np.sin(ry)
+    cz, sz = np.cos(rz), np.sin(rz)
+    x = np.array([[1, 0, 0], [0, cx, sx], [0, -sx, cx]])
+    y = np.array([[cy, 0, -sy], [0, 1, 0], [sy, 0, cy]])
+    z = np.array([[cz, sz, 0], [-sz, cz, 0], [0, 0, 1]])
+    return x @ y @ z
+
+
+def splitScale(matrix: np.ndarray) -> tuple:
+    """ Returns the rotation rows and the scale of each row. """
+    basis = matrix[:3, :3]
+    scale = np.linalg.norm(basis, axis=1)
+    scale[scale == 0] = 1.0
+    return basis / scale[:, None], scale
+
+
+def orientTo(obj, target, offset=(0, 0, 0)) -> None:
+    """ The same result as an orientConstraint that is deleted right away.
+    The position and the scale of obj are kept.
+    >>> orientTo("cc_LeftHandThumb1", "rig_L_Thumb1", offset=(0, 0, 90))
+     """
+    matrix = getMatrix(obj)
+    scale = splitScale(matrix)[1]
+    rot = splitScale(getMatrix(target))[0]
+    matrix[:3, :3] = scale[:, None] * (eulerMatrix(offset) @ rot)
+    setMatrix(obj, matrix)
+
+
+def aimTo(obj, target, aim=(1, 0, 0), up=(0, 1, 0), \
+          worldUp=(0, 1, 0)) -> None:
+    """ The same result as an aimConstraint that is deleted right away.
+    >>> aimTo("loc_LeftBall", "rig_L_Foot_IK", aim=(0, 0, -1))
+     """
+    matrix = getMatrix(obj)
+    scale = splitScale(matrix)[1]
+    direction = getMatrix(target)[3, :3] - matrix[3, :3]
+    if np.linalg.norm(direction) < 1e-9:
+        return
+    rot = aimMatrix(direction, worldUp, aim, up)
+    matrix[:3, :3] = scale[:, None] * rot
+    setMatrix(obj, matrix)
+
+
+def constrain(driver, driven, kind: str="parent", backend: str="constraint", \
+              mo: bool=True) -> list:
+    """ kind is "parent", "point", "orient" or "scale".
+    >>> constrain("cc_LeftArm_FK", "rig_L_Upperarm_FK")
+    >>> constrain(cc, jnt, "point", backend="matrix")
+     """
+    if backend == "matrix":
+        return matrixConstraint(driver, driven, kind, mo)
+    constraints = {
+        "parent": pm.parentConstraint,
+        "point": pm.pointConstraint,
+        "orient": pm.orientConstraint,
+        "scale": pm.scaleConstraint,
+        }
+    result = constraints[kind](driver, driven, mo=mo, w=1.0)
+    return result
+
+
+def matrixConstraint(driver, driven, kind: str="parent", \
+                     mo: bool=True) -> list:
+    """ A multMatrix computes the driven world matrix in its parent space,
+    offset * driver.worldMatrix * driven.parentInverseMatrix.
+
+    - parent: A pickMatrix drops the scale and shear of the result,
+    which goes into the offsetParentMatrix.
+    The local translate, rotate and jointOrient are zeroed,
+    the local scale is kept, as with parentConstraint.
+    - point, orient, scale: One decomposeMatrix drives that channel.
+
+    Both are created with createGraph, in one undo chunk.
+    That is two nodes where a constraint is one,
+    and it builds slower, see benchmarkConstraints.
+    Use it where matrix nodes are wanted, it doesn't save nodes.
+    Returns the names of the created nodes.
+     """
+    offset = np.identity(4)
+    if mo:
+        offset = getMatrix(driven) @ np.linalg.inv(getMatrix(driver))
+    isJoint = pm.objectType(driven) == "joint"
+    graph = Graph(f"{driven}_{kind}Matrix")
+    mult = graph.add("multMatrix", {
+        "matrixIn[0]": offset.ravel().tolist(),
+        "matrixIn[1]": f"{driver}.worldMatrix[0]",
+        "matrixIn[2]": f"{driven}.parentInverseMatrix[0]"
+        }, "matrixSum")
+    if kind == "parent":
+        # Like parentConstraint, scale and shear stay on the driven.
+        pick = graph.add("pickMatrix", {
+            "inputMatrix": mult,
+            "useScale": 0.0,
+            "useShear": 0.0
+            }, "outputMatrix")
+        graph.outputs[f"{driven}.offsetParentMatrix"] = pick
+        zeros = ["translate", "rotate", "jointOrient"]
+        for attr in zeros if isJoint else zeros[:2]:
+            for axis in "XYZ":
+                graph.outputs[f"{driven}.{attr}{axis}"] = 0.0
+        return createGraph(graph)
+    decompose = graph.add("decomposeMatrix", {
+        "inputMatrix": mult,
+        "inputRotateOrder": f"{driven}.rotateOrder"
+        }, "outputTranslate")
+    decompose = decompose.split(".")[0]
+    attr = {"point": "translate", "orient": "rotate", "scale": "scale"}[kind]
+    output = "output" + attr[0].upper() + attr[1:]
+    graph.outputs[f"{driven}.{attr}"] = f"{decompose}.{output}"
+    if kind == "orient" and isJoint:
+        for axis in "XYZ":
+            graph.outputs[f"{driven}.jointOrient{axis}"] = 0.0
+    return createGraph(graph)
+
+
+def benchmarkConstraints(numberOfJoints: int=200, frames: int=100) -> dict:
+    """ A chain of joints, each driven by a controller,
+    with parentConstraint and with the matrix backend.
+    Compares the build time, the created nodes and the playback fps.
+    The matrix backend makes twice the nodes and builds slower.
+    >>> benchmarkConstraints()
+    >>> {'constraint': {'build': 1.2, 'nodes': 200, 'fps': 31.0}, \
+    >>>     'matrix': {'build': 2.6, 'nodes': 400, ...}}
+     """
+    import maya.cmds as cmds
+    result = {}
+    for backend in BACKENDS:
+        cmds.file(new=True, force=True)
+        pm.select(cl=True)
+        joints = [pm.joint(p=(0, i, 0), n=f"bench_jnt{i}") \
+            for i in range(numberOfJoints)]
+        ctrls = [pm.circle(n=f"bench_cc{i}", ch=False)[0] \
+            for i in range(numberOfJoints)]
+        for cc, jnt in zip(ctrls, joints):
+            pm.matchTransform(cc, jnt, pos=True)
+        nodes = []
+        timer = time.perf_counter()
+        for cc, jnt in zip(ctrls, joints):
+            nodes += constrain(cc, jnt, "parent", backend)
+        build = time.perf_counter() - timer
+        for cc in ctrls:
+            cmds.setKeyframe(f"{cc}.rotateZ", t=0, v=0)
+            cmds.setKeyframe(f"{cc}.rotateZ", t=frames, v=90)
+        cmds.playbackOptions(min=0, max=frames)
+        fps = measureFps(0, frames)
+        result[backend] = {"build": build, "nodes": len(nodes), "fps": fps}
+    print(result)
+    return result
@@ -0,0 +1,207 @@
+import time
+import numpy as np
+import pymel.core as pm
+from buildContext import BuildContext
+from frameMath import normalized, eulerFromMatrix
+
+
+MODES = ["group", "batch", "offsetParent"]
+# The channels zeroOffsetParent resets, and their values.
+REST = {"translate": (0, 0, 0), "rotate": (0, 0, 0), "scale": (1, 1, 1), \
+    "jointOrient": (0, 0, 0)}
+
+
+def selectedOr(args: tuple) -> list:
+    import maya.cmds as cmds
+    return [str(i) for i in args] if args else cmds.ls(sl=True) or []
+
+
+def pivotFrames(items: list) -> dict:
+    """ What batchGroups needs of the objects, read with the API.
+    pivot is the world matrix without scale, parent is the world matrix
+    of the parent, both (n, 4, 4) row vectors.
+    parents are the full paths of the parents, None under the world.
+     """
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    for i in items:
+        sel.add(str(i))
+    paths = [sel.getDagPath(i) for i in range(sel.length())]
+    pivot = np.array([list(i.inclusiveMatrix()) for i in paths], \
+        dtype=float).reshape(-1, 4, 4)
+    pivot[:, :3, :3] = normalized(pivot[:, :3, :3])
+    parent = np.array([list(i.exclusiveMatrix()) for i in paths], \
+        dtype=float).reshape(-1, 4, 4)
+    return {
+        "names": [i.partialPathName() for i in paths],
+        "parents": [i.fullPathName().rsplit("|", 1)[0] or None \
+            for i in paths],
+        "pivot": pivot,
+        "parent": parent,
+        }
+
+
+def batchGroups(*args, null: bool=False, n: str="") -> list:
+    """ groupOwnPivot for many objects at once.
+    Every group matrix is computed in NumPy, then the groups are
+    created under the parents of the objects with createNode,
+    and translate, rotate and scale are one setAttr each.
+    Each object then goes in its group with a parent command,
+    which keeps its world matrix like before.
+    It is all one undo chunk.
+    >>> batchGroups("cc_Head", "cc_Neck", null=True)
+    >>> ['cc_Head_grp', 'cc_Head_null', 'cc_Head', 'cc_Neck_grp', ...]
+     """
+    import maya.cmds as cmds
+    selections = selectedOr(args)
+    if not selections:
+        return []
+    data = pivotFrames(selections)
+    local = data["pivot"] @ np.linalg.inv(data["parent"])
+    rotate = eulerFromMatrix(normalized(local[:, :3, :3]))
+    translate = local[:, 3, :3]
+    # The groups have no scale in the world, like with matchTransform.
+    scale = np.linalg.norm(local[:, :3, :3], axis=2)
+    result = []
+    with BuildContext("batchGroups"):
+        created = []
+        for name, parent in zip(data["names"], data["parents"]):
+            objName = n or name.split("|")[-1]
+            nodes = [childPath(parent, cmds.createNode("transform", \
+                n=f"{objName}_grp", p=parent, skipSelect=True))]
+            if null is True:
+                nodes.append(childPath(nodes[0], cmds.createNode( \
+                    "transform", n=f"{objName}_null", p=nodes[0], \
+                    skipSelect=True)))
+            created.append(nodes)
+        for nodes, t, r, sc in zip(created, translate.tolist(), \
+                rotate.tolist(), scale.tolist()):
+            cmds.setAttr(f"{nodes[0]}.translate", *t)
+            cmds.setAttr(f"{nodes[0]}.rotate", *r)
+            cmds.setAttr(f"{nodes[0]}.scale", *sc)
+        for nodes, obj in zip(created, data["names"]):
+            obj = str(cmds.parent(obj, nodes[-1])[0])
+            result += [i.split("|")[-1] for i in nodes] + [obj]
+    return result
+
+
+def childPath(parent: str, name: str) -> str:
+    """ The full path of a node createNode just put under parent. """
+    return f"{parent or ''}|{name}"
+
+
+def matrixOf(fn, attr: str) -> np.ndarray:
+    """ A matrix plug of a node as a 4x4 row vector array. """
+    import maya.api.OpenMaya as om2
+    plug = fn.findPlug(attr, False)
+    matrix = om2.MFnMatrixData(plug.asMObject()).matrix()
+    return np.array(list(matrix), dtype=float).reshape(4, 4)
+
+
+def zeroOffsetParent(*args) -> list:
+    """ Zeroes controllers without any group.
+    The local matrix of each goes into its offsetParentMatrix,
+    then translate, rotate and jointOrient are 0 and scale is 1.
+    The controllers stay where they are.
+    Controllers with locked or connected channels are skipped.
+    rotateAxis, shear and the pivots are expected
+    to be at their defaults, as they are on controllers.
+    Returns the zeroed controllers.
+    >>> zeroOffsetParent("cc_Head", "cc_Neck")
+    >>> ['cc_Head', 'cc_Neck']
+     """
+    import maya.api.OpenMaya as om2
+    import maya.cmds as cmds
+    selections = selectedOr(args)
+    if not selections:
+        return []
+    sel = om2.MSelectionList()
+    for i in selections:
+        sel.add(i)
+    result = []
+    with BuildContext("zeroOffsetParent"):
+        for index, obj in enumerate(selections):
+            fn = om2.MFnDependencyNode(sel.getDependNode(index))
+            channels = [i for i in REST \
+                if i != "jointOrient" or fn.typeName == "joint"]
+            plugs = [fn.findPlug(i, False) for i in channels]
+            plugs += [i.child(j) for i in plugs for j in range(3)]
+            plugs.append(fn.findPlug("offsetParentMatrix", False))
+            if any(i.isLocked or i.isDestination for i in plugs):
+                pm.warning(f"{obj} has locked or connected channels.")
+                continue
+            matrix = matrixOf(fn, "matrix") \
+                @ matrixOf(fn, "offsetParentMatrix")
+            cmds.setAttr(f"{obj}.offsetParentMatrix", \
+                *matrix.ravel().tolist(), type="matrix")
+            for attr in channels:
+                cmds.setAttr(f"{obj}.{attr}", *REST[attr])
+            result.append(obj)
+    return result
+
+
+def groupByMode(mode: str, selections: list, null: bool=False, \
+                n: str="") -> list:
+    """ groupOwnPivot with mode="batch" or mode="offsetParent".
+    offsetParent makes no group, so null and n are refused with it.
+     """
+    if mode == "batch":
+        return batchGroups(*selections, null=null, n=n)
+    if mode == "offsetParent":
+        if null or n:
+            raise ValueError("null and n make groups, " \
+                "mode='offsetParent' doesn't.")
+        return zeroOffsetParent(*selections)
+    raise ValueError(f"mode is one of {MODES}: {mode}")
+
+
+def benchmarkGroups(numberOfControllers: int=500) -> dict:
+    """ groupOwnPivot on numberOfControllers circles
+    under a moved, rotated and scaled group, in each mode,
+    each in a new scene, with null=True where there are groups.
+    nodes is how many transforms were added,
+    error is how far the controllers moved.
+    >>> benchmarkGroups()
+    >>> {'group': {'seconds': 3.1, 'nodes': 1000, 'error': 2e-15}, \\
+    >>>     'batch': {...}, 'offsetParent': {'nodes': 0, ...}}
+     """
+    import maya.cmds as cmds
+    import general
+    rng = np.random.default_rng(0)
+    translate = rng.uniform(-50, 50, (numberOfControllers, 3))
+    rotate = rng.uniform(-180, 180, (numberOfControllers, 3))
+    result = {}
+    for mode in MODES:
+        cmds.file(new=True, force=True)
+        top = str(pm.group(em=True, n="bench_ctrl_grp"))
+        cmds.setAttr(f"{top}.translate", 5, 10, -3)
+        cmds.setAttr(f"{top}.rotate", 30, -45, 10)
+        cmds.setAttr(f"{top}.scale", 2, 2, 2)
+        ctrls = []
+        for i in range(numberOfControllers):
+            cc = str(pm.circle(n=f"bench_cc{i}", ch=False)[0])
+            cmds.parent(cc, top)
+            cmds.setAttr(f"{cc}.translate", *translate[i])
+            cmds.setAttr(f"{cc}.rotate", *rotate[i])
+            ctrls.append(cc)
+        before = worldMatrices(ctrls)
+        nodes = len(cmds.ls(type="transform"))
+        timer = time.perf_counter()
+        if mode == "group":
+            general.PYMEL_HELPERS["groupOwnPivot"](*ctrls, null=True)
+        else:
+            general.groupOwnPivot(*ctrls, null=mode == "batch", mode=mode)
+        seconds = time.perf_counter() - timer
+        result[mode] = {
+            "seconds": seconds,
+            "nodes": len(cmds.ls(type="transform")) - nodes,
+            "error": float(np.abs(worldMatrices(ctrls) - before).max()),
+            }
+        print(f"{mode:<14}{seconds:>9.3f}s{result[mode]['nodes']:>7} nodes" \
+            f"{result[mode]['error']:>10.1e}")
+    return result
+
+
+def worldMatrices(items: list) -> np.ndarray:
+    values = [pm.xform(i, q=True, m=True, ws=True) for i in items]
+    return np.array(values, dtype=float).reshape(-1, 4, 4)
@@ -0,0 +1,166 @@
+import re
+import time
+import numpy as np
+import pymel.core as pm
+
+
+COMPONENT = re.compile(r"^([^.]+)\.(\w+)\[(.*)\]$")
+# vtx and cv with these indices are read in bulk.
+INDICES = re.compile(r"^(\d+)(?::(\d*))?$")
+
+
+def classify(items: list) -> list:
+    """ Sorts a mixed list once, without trying commands to see what fails.
+    Returns [(kind, name, indices), ...] in the same order,
+    kind is "transform", "vtx", "cv", "other" or "missing".
+    name is the shape of a component, indices are its first and last,
+    -1 is the end of an open range like cv[0:].
+    Any other component, curve1.u[0.5] or lattice1.pt[0][1][2], 
+    is "other" and left to pointPosition.
+    >>> classify(["pSphere1", "pSphere1.vtx[3:5]", "curve1.cv[0]"])
+    >>> [('transform', 'pSphere1', []), ('vtx', 'pSphereShape1', [3, 5]),
+    >>>     ('cv', 'curveShape1', [0, 0])]
+     """
+    import maya.api.OpenMaya as om2
+    result = []
+    for item in items:
+        item = str(item)
+        match = COMPONENT.match(item)
+        node = match.group(1) if match else item
+        sel = om2.MSelectionList()
+        try:
+            sel.add(node)
+            dag = sel.getDagPath(0)
+        except:
+            result.append(("missing", item, []))
+            continue
+        if not match:
+            result.append(("transform", dag.partialPathName(), []))
+            continue
+        kind, indices = match.group(2), INDICES.match(match.group(3))
+        if kind not in ["vtx", "cv"] or not indices:
+            result.append(("other", item, []))
+            continue
+        start, end = indices.groups()
+        dag.extendToShape()
+        if end == "":
+            end = -1
+        elif end is None:
+            end = start
+        result.append((kind, dag.partialPathName(), [int(start), int(end)]))
+    return result
+
+
+def shapePoints(kind: str, shape: str) -> np.ndarray:
+    """ World positions of every vertex or cv of a shape. """
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    sel.add(shape)
+    dag = sel.getDagPath(0)
+    if kind == "vtx":
+        points = om2.MFnMesh(dag).getPoints(om2.MSpace.kWorld)
+    else:
+        points = om2.MFnNurbsCurve(dag).cvPositions(om2.MSpace.kWorld)
+    return np.array(points, dtype=float)[:, :3]
+
+
+def checkMissing(items: list, strict: bool) -> None:
+    """ Raises like xform does for missing names, if strict. """
+    missing = [name for kind, name, _ in items if kind == "missing"]
+    if strict and missing:
+        raise pm.MayaNodeError(f"No object matches name: {missing}")
+
+
+def componentPoints(items: list) -> list:
+    """ The points of each classified component.
+    Each shape is read once, however many components use it.
+     """
+    shapes = {}
+    result = []
+    for kind, name, indices in items:
+        if kind not in ["vtx", "cv"]:
+            result.append(None)
+            continue
+        if (kind, name) not in shapes:
+            shapes[(kind, name)] = shapePoints(kind, name)
+        points = shapes[(kind, name)]
+        start, end = indices
+        end = len(points) - 1 if end < 0 else end
+        result.append(points[start : end + 1])
+    return result
+
+
+def getPositions(items: list, strict: bool=True) -> np.ndarray:
+    """ World positions, (n, 3), in the order of items.
+    Transforms give their rotate pivot, like xform -rp -ws,
+    a component range gives its first point, like pointPosition.
+    A missing item raises MayaNodeError,
+    with strict=False its row is nan.
+    >>> getPositions(["pSphere1", "pSphere1.vtx[317]"])
+    >>> array([[0., 0., 0.], [0.1, 0.9, 0.2]])
+     """
+    import maya.api.OpenMaya as om2
+    kinds = classify(items)
+    checkMissing(kinds, strict)
+    points = componentPoints(kinds)
+    result = np.full((len(kinds), 3), np.nan)
+    transforms = []
+    sel = om2.MSelectionList()
+    for idx, ((kind, name, _), pts) in enumerate(zip(kinds, points)):
+        if pts is not None:
+            result[idx] = pts[0]
+        elif kind == "transform":
+            sel.add(name)
+            transforms.append(idx)
+        elif kind == "other":
+            result[idx] = pm.pointPosition(name)
+    for i, idx in enumerate(transforms):
+        fn = om2.MFnTransform(sel.getDagPath(i))
+        result[idx] = list(fn.rotatePivot(om2.MSpace.kWorld))[:3]
+    return result
+
+
+def getBoundingBoxes(items: list, strict: bool=True) -> np.ndarray:
+    """ World bounding boxes, (n, 6) of xMin, yMin, zMin, xMax, yMax, zMax.
+    Components are measured from the points read once per shape,
+    transforms still need one xform each.
+    A missing item raises MayaNodeError,
+    with strict=False its row is nan.
+     """
+    kinds = classify(items)
+    checkMissing(kinds, strict)
+    points = componentPoints(kinds)
+    result = np.full((len(kinds), 6), np.nan)
+    for idx, ((kind, name, _), pts) in enumerate(zip(kinds, points)):
+        if pts is not None:
+            result[idx] = np.concatenate([pts.min(axis=0), pts.max(axis=0)])
+        elif kind != "missing":
+            result[idx] = pm.xform(name, q=True, bb=True, ws=True)
+    return result
+
+
+def benchmarkPositions(numberOfItems: int=2000) -> dict:
+    """ Positions of transforms and vertices,
+    one by one with pointPosition falling back to xform, and in bulk.
+    >>> benchmarkPositions()
+    >>> {'perItem': 1.8, 'bulk': 0.2}
+     """
+    import maya.cmds as cmds
+    cmds.file(new=True, force=True)
+    half = numberOfItems // 2
+    sphere = pm.polySphere(n="bench_sphere", sx=50, sy=50, ch=False)[0]
+    items = [pm.spaceLocator(n=f"bench_loc{i}") for i in range(half)]
+    items += [f"{sphere}.vtx[{i}]" for i in range(numberOfItems - half)]
+    result = {}
+    timer = time.perf_counter()
+    for i in items:
+        try:
+            pm.pointPosition(i)
+        except:
+            pm.xform(i, q=1, ws=1, rp=1)
+    result["perItem"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    getPositions(items)
+    result["bulk"] = time.perf_counter() - timer
+    print(result)
+    return result
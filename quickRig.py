@@ -3,7 +3,12 @@ from PySide2.QtCore import Qt
 # from PySide2.QtGui import QIntValidator
 from shiboken2 import wrapInstance
 from general import *
+from buildContext import batchBuild
+from connectionPlan import channelsOf, connectPairs
+from exprCompiler import Graph, createGraph, measureFps
+from positionQuery import getPositions
 # import maya.cmds as cmds
+import numpy as np
 import pymel.core as pm
 import maya.OpenMayaUI as omui
 
@@ -214,6 +219,7 @@ class Car(QWidget):
         self.btnClose.clicked.connect(self.close)
 
 
+    @batchBuild()
     def build(self):
         """ Create a global controller and body controller. """
         self.updateJointsPosition()
@@ -224,6 +230,7 @@ class Car(QWidget):
         self.createMainCtrl()
 
 
+    @batchBuild()
     def build_symmetry(self):
         """ Make the left and right joints the same. """
         button = self.sender()
@@ -235,6 +242,7 @@ class Car(QWidget):
         self.createJoints()
 
 
+    @batchBuild()
     def build_wheels(self):
         """ Create a wheel controller only.
         There is no expression for turning the wheel.
@@ -295,6 +303,7 @@ class Car(QWidget):
     #         self.hierarchy["jnt_root"] = temp
 
 
+    @batchBuild()
     def build_expression(self):
         """ Add an expression to the wheel controller.
         Rotate the locator by calculating the moving distance 
@@ -326,6 +335,7 @@ class Car(QWidget):
         pm.parent(ctrlTopGrp, exprGrps[1])
 
 
+    @batchBuild()
     def build_doors(self):
         sel = pm.ls(sl=True)
         if not sel:
@@ -345,12 +355,12 @@ class Car(QWidget):
 
 
     def updateJointsPosition(self):
-        for jnt in self.jntNameAndPos.keys():
-            try:
-                pos = getPosition(jnt)
-                self.jntNameAndPos[jnt] = pos
-            except:
+        joints = list(self.jntNameAndPos.keys())
+        positions = getPositions(joints, strict=False)
+        for jnt, pos in zip(joints, positions):
+            if np.isnan(pos).any():
                 continue
+            self.jntNameAndPos[jnt] = tuple(pos.tolist())
 
 
     def updateSameSide(self, side: str="LeftToRight"):
@@ -375,6 +385,7 @@ class Car(QWidget):
             self.jntNameAndPos[bJoint] = (-1*x, y, z)
 
 
+    @batchBuild()
     def cleanUp(self):
         """ Clean up the joint groups. """
         listDelete = [
@@ -390,6 +401,7 @@ class Car(QWidget):
                 continue
 
 
+    @batchBuild()
     def cleanUp_wheel(self):
         """ Clean up the wheel controllers. """
         ctrl = self.fldSelectWheel.text()
@@ -405,6 +417,7 @@ class Car(QWidget):
                 pass
 
 
+    @batchBuild()
     def cleanUp_door(self):
         listDelete = self.doorCtrls + self.doorJoints
         if not listDelete:
@@ -584,7 +597,11 @@ class Car(QWidget):
 
 
     def createExpression(self, ctrl: str, locator: str, names: list) -> None:
-        """ Rotate the locator by the moving distance of offset_grp. """
+        """ Rotate the locator by the moving distance of offset_grp.
+        The roll adds up the distance of every frame in the direction
+        the car faces on that frame, so it needs the previous frame
+        and stays an expression. wheelRoll.verifyAutoRoll checks it.
+         """
         ctrlMain = f"{ctrl}_main"
         if not pm.attributeQuery("AutoRoll", node=ctrlMain, ex=True):
             attrAuto = 'AutoRoll'
@@ -628,6 +645,7 @@ class Car(QWidget):
         pm.expression(s=expr, o='', ae=1, uc='all')
 
 
+    @batchBuild()
     def deleteExpression(self):
         """ Deletes the expression applied to the wheel controller. """
         ctrl = self.fldSelectWheel.text()
@@ -648,34 +666,24 @@ class Car(QWidget):
             pm.deleteAttr(f"{ctrlMain}.AutoRoll")
 
 
+    @batchBuild()
     def jointConnect(self):
         """ Connect the bind joints and the rig joints. """
         jntNames = selectJointOnly("bindBones")
         # jntNames = self.jntNameAndPos.keys()
-        for jnt in jntNames:
-            fbx = jnt.replace("jnt_", "fbx_")
-            try:
-                pm.connectAttr(f"{fbx}.translate", f"{jnt}.translate", f=True)
-                pm.connectAttr(f"{fbx}.rotate", f"{jnt}.rotate", f=True)
-                pm.connectAttr(f"{fbx}.scale", f"{jnt}.scale", f=True)
-                pm.connectAttr(f"{fbx}.visibility", f"{jnt}.visibility", f=True)
-            except:
-                continue
+        pairs = [(jnt.replace("jnt_", "fbx_"), jnt) for jnt in jntNames]
+        attrs = channelsOf(t=True, r=True, s=True, v=True)
+        connectPairs(pairs, attrs)
 
 
+    @batchBuild()
     def jointDisconnect(self):
         """ Disconnect the bind joints and rig joints. """
         jntNames = selectJointOnly("bindBones")
         # jntNames = self.jntNameAndPos.keys()
-        for jnt in jntNames:
-            fbx = jnt.replace("jnt_", "fbx_")
-            try:
-                pm.disconnectAttr(f"{fbx}.translate", f"{jnt}.translate")
-                pm.disconnectAttr(f"{fbx}.rotate", f"{jnt}.rotate")
-                pm.disconnectAttr(f"{fbx}.scale", f"{jnt}.scale")
-                pm.disconnectAttr(f"{fbx}.visibility", f"{jnt}.visibility")
-            except:
-                continue
+        pairs = [(jnt.replace("jnt_", "fbx_"), jnt) for jnt in jntNames]
+        attrs = channelsOf(t=True, r=True, s=True, v=True)
+        connectPairs(pairs, attrs, disconnect=True)
 
 
     def createDoorCtrl(self, selection, doorName) -> list:
@@ -727,6 +735,7 @@ class Car(QWidget):
     #     return jntList + fbxList
 
 
+    @batchBuild()
     def connectAll(self):
         """ Most connections for rough cars. 
         Expression is for the left front wheel only.
@@ -756,8 +765,8 @@ class Car(QWidget):
             ]
         rotX = "rotateX"
         ccSub = "cc_sub"
-        for i in range(1, 4):
-            pm.connectAttr(f"{locs[0]}.{rotX}", f"{locs[i]}.{rotX}", f=True)
+        pairs = [(locs[0], locs[i]) for i in range(1, 4)]
+        connectPairs(pairs, [rotX])
         for l, w in zip(locs, fbxWheels):
             pm.parentConstraint(l, w, mo=True, w=1.0)
         for i in wheelGrps:
@@ -773,6 +782,7 @@ class Car(QWidget):
         pm.setAttr(f"rigBones.visibility", 0)
 
 
+    @batchBuild()
     def setColor(self):
         colorList = {
             "yellow": [
@@ -1040,6 +1050,7 @@ class MixamoCharacter(QWidget):
         pass
 
 
+    @batchBuild()
     def createBones(self):
         self.cleanUp(self.mainCurve, self.jointPosition.keys())
         self.createJointAndNameIt(self.jointPosition)
@@ -1047,12 +1058,14 @@ class MixamoCharacter(QWidget):
         self.createMainCurve()
 
 
+    @batchBuild()
     def alignBonesCenter(self):
         self.updateAllJointPositions()
         self.updatePositionGridCenter(self.spine)
         self.createBones()
 
 
+    @batchBuild()
     def alignBonesSameSide(self):
         AtoB = "LeftToRight"
         # AtoB = "RightToLeft"
@@ -1062,6 +1075,7 @@ class MixamoCharacter(QWidget):
         self.createBones()
 
 
+    @batchBuild()
     def createRig_All(self):
         self.updateAllJointPositions()
         jntPos = self.jointPosition
@@ -1073,6 +1087,7 @@ class MixamoCharacter(QWidget):
         self.buildHierarchy(rigHiraky)
 
 
+    @batchBuild()
     def createRig_IKFK(self):
         self.createIKFK(self.spine[0], self.spine[1:4])
         self.createIKFK(self.leftArms[0], self.leftArms[1:])
@@ -1138,15 +1153,14 @@ class MixamoCharacter(QWidget):
 
 
     def updateAllJointPositions(self):
-        allJoints = self.jointPosition.keys()
-        for joint in allJoints:
-            position = pm.xform(joint, q=True, t=True, ws=True)
-            self.jointPosition[joint] = tuple(position)
+        allJoints = list(self.jointPosition.keys())
+        for joint, position in zip(allJoints, getPositions(allJoints)):
+            self.jointPosition[joint] = tuple(position.tolist())
 
 
     def updatePositionGridCenter(self, joints: list):
-        for joint in joints:
-            x, y, z = pm.xform(joint, q=True, t=True, ws=True)
+        for joint, position in zip(joints, getPositions(joints)):
+            x, y, z = position.tolist()
             self.jointPosition[joint] = (0, y, z)
 
 
@@ -1214,37 +1228,26 @@ class MixamoCharacter(QWidget):
 
 
 def connectAttributes(source: str, destination: str, \
-                    t=False, r=False, s=False, v=False) -> None:
-    attr = []
-    if t:   attr.append("translate")
-    if r:   attr.append("rotate")
-    if s:   attr.append("scale")
-    if v:   attr.append("visibility")
-    for i in attr:
-        try:
-            pm.connectAttr(f"{source}.{i}", f"{destination}.{i}", f=True)
-        except:
-            continue
+                    t=False, r=False, s=False, v=False) -> dict:
+    attr = channelsOf(t, r, s, v)
+    result = connectPairs([(source, destination)], attr)
+    return result
 
 
 def disConnectAttributes(source: str, destination: str, \
-                    t=False, r=False, s=False, v=False) -> None:
-    attr = []
-    if t:   attr.append("translate")
-    if r:   attr.append("rotate")
-    if s:   attr.append("scale")
-    if v:   attr.append("visibility")
-    for i in attr:
-        try:
-            pm.disconnectAttr(f"{source}.{i}", f"{destination}.{i}")
-        except:
-            continue
+                    t=False, r=False, s=False, v=False) -> dict:
+    attr = channelsOf(t, r, s, v)
+    result = connectPairs([(source, destination)], attr, disconnect=True)
+    return result
 
 
 def connectBlendColorsNode(blender: str, objects: list=[], \
-                            t=False, r=False, s=False, v=False) -> None:
+                            t=False, r=False, s=False, v=False, \
+                            backend: str="blendColors") -> list:
     """ Create a blendColors node and 
     connect FK to colors1 and IK to colors2.
+    With backend "matrix" or "offsetParentMatrix", 
+    connectBlendMatrixNode is used instead.
     
     Args: 
         blender: This is Switch.
@@ -1261,6 +1264,7 @@ def connectBlendColorsNode(blender: str, objects: list=[], \
         -- r: rotate, 
         -- s: scale, 
         -- v: visibility
+        -- backend: "blendColors", "matrix" or "offsetParentMatrix"
 
     Examples:
         >>> connectBlendColorsNode("cc_IKFK.Spine_IK0FK1", t=1)
@@ -1268,10 +1272,16 @@ def connectBlendColorsNode(blender: str, objects: list=[], \
         >>> connectBlendColorsNode("cc_IKFK.RArm_IK0FK1", s=1)
         >>> connectBlendColorsNode("cc_IKFK.LLeg_IK0FK1", v=1)
         >>> connectBlendColorsNode("cc_IKFK.RLeg_IK0FK1", t=1, v=1)
+        >>> connectBlendColorsNode("cc_IKFK.LArm_IK0FK1", t=1, r=1, \
+        >>>     backend="matrix")
      """
+    if backend != "blendColors":
+        opm = backend == "offsetParentMatrix"
+        return connectBlendMatrixNode(blender, objects, t, r, s, v, opm)
     args = objects if objects else pm.ls(sl=True)
     if len(args) % 3:
-        return
+        pm.warning("Select the destinations, FK and IK, as many of each.")
+        return []
     else:
         quotient = len(args) // 3
         destination = args[0 : quotient*1]
@@ -1282,6 +1292,7 @@ def connectBlendColorsNode(blender: str, objects: list=[], \
     if r:   attr.append("rotate")
     if s:   attr.append("scale")
     if v:   attr.append("visibility")
+    result = []
     for i in attr:
         for s1, s2, fin in zip(source1, source2, destination):
             blColor = pm.shadingNode("blendColors", au=True)
@@ -1289,6 +1300,121 @@ def connectBlendColorsNode(blender: str, objects: list=[], \
             pm.connectAttr(f"{s2}.{i}", f"{blColor}.color2", f=True)
             pm.connectAttr(f"{blColor}.output", f"{fin}.{i}", f=True)
             pm.connectAttr(blender, f"{blColor}.blender")
+            result.append(blColor)
+    return result
+
+
+def connectBlendMatrixNode(blender: str, objects: list=[], \
+                           t=False, r=False, s=False, v=False, \
+                           offsetParentMatrix=False) -> list:
+    """ Blend the whole matrix of FK and IK with one blendMatrix per joint.
+    IK is the inputMatrix, FK is the target, the blender is its weight,
+    so 0 is IK and 1 is FK, the same as connectBlendColorsNode.
+    All nodes are created with createGraph, in one undo chunk.
+
+    - Default: One decomposeMatrix drives the checked channels.
+    That is two nodes per joint, as many as blendColors makes for t and r,
+    it only saves a node when s is blended too.
+    - offsetParentMatrix: The output drives the offsetParentMatrix
+    and the local translate and rotate are zeroed.
+    One node per joint, half of what blendColors makes for t and r.
+    All channels are blended, t, r and s are not used.
+
+    The matrix of a joint includes the jointOrient,
+    so the jointOrient of the destination is zeroed when rotate is driven.
+    Visibility isn't in the matrix, it still uses blendColors.
+
+    Examples:
+        >>> connectBlendMatrixNode("cc_IKFK.LArm_IK0FK1", t=1, r=1)
+        >>> connectBlendMatrixNode("cc_IKFK.LArm_IK0FK1", \
+        >>>     offsetParentMatrix=True)
+     """
+    args = objects if objects else pm.ls(sl=True)
+    if len(args) % 3:
+        pm.warning("Select the destinations, FK and IK, as many of each.")
+        return []
+    else:
+        quotient = len(args) // 3
+        destination = args[0 : quotient*1]
+        source1 = args[quotient : quotient*2]
+        source2 = args[quotient*2 : quotient*3]
+    attr = channelsOf(t, r, s)
+    joints = [i.name() for i in pm.ls(destination, type="joint")]
+    graph = Graph(blender.replace(".", "_"))
+    for s1, s2, fin in zip(source1, source2, destination):
+        blend = graph.add("blendMatrix", {
+            "inputMatrix": f"{s2}.matrix", 
+            "target[0].targetMatrix": f"{s1}.matrix", 
+            "target[0].weight": blender
+            }, "outputMatrix")
+        zeroOrient = offsetParentMatrix or "rotate" in attr
+        if zeroOrient and str(fin) in joints:
+            for axis in "XYZ":
+                graph.outputs[f"{fin}.jointOrient{axis}"] = 0.0
+        if offsetParentMatrix:
+            graph.outputs[f"{fin}.offsetParentMatrix"] = blend
+            for i in ["translate", "rotate"]:
+                for axis in "XYZ":
+                    graph.outputs[f"{fin}.{i}{axis}"] = 0.0
+            for axis in "XYZ":
+                graph.outputs[f"{fin}.scale{axis}"] = 1.0
+            continue
+        decompose = graph.add("decomposeMatrix", {
+            "inputMatrix": blend, 
+            "inputRotateOrder": f"{fin}.rotateOrder"
+            }, "outputTranslate")
+        decompose = decompose.split(".")[0]
+        for i in attr:
+            output = "output" + i[0].upper() + i[1:]
+            graph.outputs[f"{fin}.{i}"] = f"{decompose}.{output}"
+    result = createGraph(graph)
+    if v:
+        result += connectBlendColorsNode(blender, args, v=True)
+    return result
+
+
+def benchmarkIKFKBlend(frames: int=100) -> dict:
+    """ Builds the Mixamo IK/FK rig in a new scene per backend,
+    blends translate and rotate of the spine, arms and legs,
+    and compares the created nodes and the playback fps
+    while the switches are animated from IK to FK.
+    Only offsetParentMatrix makes fewer nodes.
+    >>> benchmarkIKFKBlend()
+    >>> {'blendColors': {'nodes': 38, 'fps': 210.3}, \
+    >>>     'matrix': {'nodes': 38, ...}, 'offsetParentMatrix': {'nodes': 19}}
+     """
+    import maya.cmds as cmds
+    mc = MixamoCharacter()
+    limbs = {
+        "Spine_IK0FK1": mc.spine[1:4], 
+        "LArm_IK0FK1": mc.leftArms[1:], 
+        "RArm_IK0FK1": mc.rightArms[1:], 
+        "LLeg_IK0FK1": mc.leftLegs, 
+        "RLeg_IK0FK1": mc.rightLegs, 
+        }
+    result = {}
+    for backend in ["blendColors", "matrix", "offsetParentMatrix"]:
+        cmds.file(new=True, force=True)
+        mc = MixamoCharacter()
+        mc.createBones()
+        mc.createRig_All()
+        mc.createRig_IKFK()
+        switch = pm.group(em=True, n="cc_IKFK")
+        nodes = []
+        for attr, joints in limbs.items():
+            pm.addAttr(switch, ln=attr, at="double", min=0, max=1, dv=0, k=1)
+            objects = [f"rig_{i}" for i in joints]
+            objects += [f"rig_{i}_FK" for i in joints]
+            objects += [f"rig_{i}_IK" for i in joints]
+            nodes += connectBlendColorsNode(f"{switch}.{attr}", objects, \
+                t=True, r=True, backend=backend)
+            cmds.setKeyframe(f"{switch}.{attr}", t=0, v=0)
+            cmds.setKeyframe(f"{switch}.{attr}", t=frames, v=1)
+        cmds.playbackOptions(min=0, max=frames)
+        fps = measureFps(0, frames)
+        result[backend] = {"nodes": len(nodes), "fps": fps}
+    print(result)
+    return result
 
 
 def createIKHandle(*args, rp=False, sc=False, spl=False, spr=False):
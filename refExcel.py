@@ -1,64 +1,220 @@
+import os
+import re
+import time
 import itertools
-import urllib
-import pyodbc
 import openpyxl
-import pandas as pd
-from sqlalchemy import create_engine
-
-
-def csvToAccess():
-    """ Send csv file to "MS Access DB" using pandas"""
-    CSV_PATH = '../folder/file.csv'
-    conn_str = (
-        r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
-        r"DBQ=../folder/file.accdb;"
-    )
-    conn_str = urllib.parse.quote_plus(conn_str)
-    conn_url = f'access+pyodbc:///?odbc_connect={conn_str}'
-    acc_engine = create_engine(conn_url)
-    df = pd.read_csv(CSV_PATH, encoding='ANSI')
-    # df.to_csv(CSV_PATH, index=False, encoding='utf-8')
-    df.to_sql('TABLE', acc_engine, if_exists='append', index=False)
-
-
-def sqlToAccess():
-    """ Insert SQL to MS Access using pyodbc """
-    conn_str = (
-        r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
-        r"DBQ=../folder/file.accdb;"
-    )
-    conn = pyodbc.connect(conn_str)
-    cursor = conn.cursor()
-    sql = (
-        r'INSERT INTO "table" (["team"], ["name"], ["date"]) VALUES '
-        r'("myTeam", "myName", "2022-09-08")'
-    )
-    cursor.execute(sql)
-    cursor.commit()
-    # sql = r'SELECT * FROM table'
-    # cursor.execute(sql)
-    # for row in cursor.fetchall():
-    #     print(row)
-    cursor.close()
-    conn.close()
-
-
-def readDB():
-    """ Read Data from MS Access DB using pyodbc, pandas """
-    conn_str = (
-        r"Driver={Microsoft Access Driver (*.mdb, *.accdb)};"
-        r"DBQ=../folder/file.accdb;"
-    )
-    conn = pyodbc.connect(conn_str)
-    sql = r"SELECT * FROM table"
-    df = pd.read_sql(sql, conn)
-    data = df['DATE'].str.contains('2022-08')
-    # data = [str(i) for i in df['DATE'] if str(i).startswith('2022-05')]
-    conn.close()
+import numpy as np
+from dbIngest import ConnectionPool, Ingestor, accessConnector, monthRange
+
+
+def csvToAccess(csvPath: str='../folder/file.csv', \
+                dbPath: str='../folder/file.accdb', table: str='TABLE', \
+                chunkSize: int=5000, encoding: str=None) -> int:
+    """ Send csv file to "MS Access DB".
+    The csv file is streamed in chunks and inserted with executemany.
+    Like pandas to_sql, empty cells are NULL, numbers are typed,
+    and a missing table is created.
+    encoding is the ANSI code page ('mbcs') on Windows, 
+    and 'utf-8' elsewhere, unless it is given.
+     """
+    if encoding is None:
+        encoding = 'mbcs' if os.name == 'nt' else 'utf-8'
+    ingestor = Ingestor(getPool(dbPath))
+    count = ingestor.ingestCsv(csvPath, table, chunkSize, encoding=encoding)
+    return count
+
+
+def sqlToAccess(rows: list=[("myTeam", "myName", "2022-09-08")], \
+                dbPath: str='../folder/file.accdb', table: str='table'):
+    """ Insert rows to MS Access using the pooled connection. """
+    ingestor = Ingestor(getPool(dbPath))
+    count = ingestor.insertRows(table, ["team", "name", "date"], rows)
+    return count
+
+
+def readDB(month: str='2022-08', dbPath: str='../folder/file.accdb', \
+           table: str='table') -> list:
+    """ Read the rows of one month from MS Access DB.
+    The dates are filtered by the database, not in pandas.
+     """
+    ingestor = Ingestor(getPool(dbPath))
+    data = ingestor.selectDateRange(table, 'DATE', *monthRange(month))
+    return data
+
+
+POOLS = {}
+
+
+def getPool(dbPath: str) -> ConnectionPool:
+    """ One pool per database file, reused by every call. """
+    if dbPath not in POOLS:
+        POOLS[dbPath] = ConnectionPool(accessConnector(dbPath))
+    return POOLS[dbPath]
 
 
 def numberToAlphabet(number: int) -> str:
     """ Change numbers to alphabets for MS Excel.
+    The column is a bijective base-26 number, 
+    so it takes one step per letter.
+    >>> numberToAlphabet(0)
+    >>> A
+    >>> numberToAlphabet(35)
+    >>> AJ
+    >>> numberToAlphabet(1000)
+    >>> ALM
+     """
+    number += 1
+    letters = []
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters.append(chr(ord('A') + remainder))
+    column = ''.join(reversed(letters))
+    return column
+
+
+def alphabetToNumber(column: str) -> int:
+    """ Change Alphabet to number for MS Excel. 
+    >>> alphabetToNumber("A")
+    >>> 0
+    >>> alphabetToNumber("AC")
+    >>> 28
+    >>> alphabetToNumber("ATM")
+    >>> 1208
+    >>> alphabetToNumber("atm")
+    >>> None
+     """
+    if not column or not all('A' <= i <= 'Z' for i in column):
+        return None
+    count = 0
+    for i in column:
+        count = count * 26 + (ord(i) - ord('A') + 1)
+    return count - 1
+
+
+def numbersToAlphabets(numbers: list) -> list:
+    """ Change a whole list of numbers to alphabets at once.
+    The letters are computed for all numbers per digit with numpy.
+    >>> numbersToAlphabets([0, 35, 1000])
+    >>> ['A', 'AJ', 'ALM']
+     """
+    remain = np.asarray(numbers, dtype=np.int64) + 1
+    digits = []
+    while remain.any():
+        alive = remain > 0
+        remainder = np.where(alive, (remain - 1) % 26, -1)
+        digits.append(remainder)
+        remain = np.where(alive, (remain - 1) // 26, 0)
+    # 'A'..'Z' for the letters, '' where the label is shorter.
+    table = np.array([''] + [chr(i) for i in range(ord('A'), ord('Z') + 1)])
+    result = np.full(remain.shape, '', dtype='<U16')
+    for remainder in digits:
+        result = np.char.add(table[remainder + 1], result)
+    return result.tolist()
+
+
+def alphabetsToNumbers(columns: list) -> list:
+    """ Change a whole list of alphabets to numbers at once.
+    Invalid labels become -1.
+    >>> alphabetsToNumbers(["A", "AC", "ATM", "atm"])
+    >>> [0, 28, 1208, -1]
+     """
+    columns = np.asarray(columns, dtype=str)
+    width = max(columns.dtype.itemsize // 4, 1)
+    codes = columns.astype(f'<U{width}').view(np.uint32)
+    codes = codes.reshape(len(columns), width).astype(np.int64)
+    isEmpty = codes == 0
+    isLetter = (codes >= ord('A')) & (codes <= ord('Z'))
+    valid = (isLetter | isEmpty).all(axis=1) & ~isEmpty[:, 0]
+    count = np.zeros(len(columns), dtype=np.int64)
+    for k in range(width):
+        digit = codes[:, k] - ord('A') + 1
+        count = np.where(isEmpty[:, k], count, count * 26 + digit)
+    result = np.where(valid, count - 1, -1)
+    return result.tolist()
+
+
+def writeToExcel(excelPath: str='../folder/file.xlsx', \
+                 cells: dict={'A1': 2.0}, sheetName: str='Sheet1') -> None:
+    """ Write somethings to MS Excel using openpyxl. 
+    All cells are written with one load and one save.
+    >>> writeToExcel(path, {"A1": 2.0, "B3": "cc_main"})
+     """
+    loadExcel = openpyxl.load_workbook(excelPath)
+    SHEET = loadExcel[sheetName]
+    for cell, value in cells.items():
+        SHEET[cell] = value
+    loadExcel.save(excelPath)
+
+
+def writeRange(excelPath: str, rows: list, topLeft: str='A1', \
+               sheetName: str='Sheet1') -> None:
+    """ Write a 2D list to the range starting at topLeft.
+    >>> writeRange(path, [[1, 2], [3, 4]], "B2")
+    >>> B2=1, C2=2, B3=3, C3=4
+     """
+    match = re.match(r'([A-Z]+)([0-9]+)$', str(topLeft).upper())
+    if not match:
+        raise ValueError(f"Bad cell: {topLeft}")
+    column, row = match.groups()
+    firstColumn = alphabetToNumber(column) + 1
+    firstRow = int(row)
+    loadExcel = openpyxl.load_workbook(excelPath)
+    SHEET = loadExcel[sheetName]
+    for i, values in enumerate(rows):
+        for j, value in enumerate(values):
+            SHEET.cell(row=firstRow + i, column=firstColumn + j, value=value)
+    loadExcel.save(excelPath)
+
+
+def writeReport(excelPath: str, rows, header: list=[], \
+                sheetName: str='Sheet1') -> str:
+    """ Write a large rig inventory to a new excel file.
+    The workbook is opened in write-only mode, 
+    so the rows are streamed to the file and never kept in memory.
+    rows can be a generator.
+    >>> rows = ((i.name(), i.type()) for i in pm.ls(type="joint"))
+    >>> writeReport("C:/rigInventory.xlsx", rows, ["name", "type"])
+     """
+    workbook = openpyxl.Workbook(write_only=True)
+    SHEET = workbook.create_sheet(sheetName)
+    if header:
+        SHEET.append(list(header))
+    for row in rows:
+        SHEET.append(list(row))
+    workbook.save(excelPath)
+    return excelPath
+
+
+def benchmarkColumnCodec(numbers: list=[25, 700, 18000], repeat: int=3):
+    """ Compare the itertools.product functions and the base-26 codec.
+    >>> benchmarkColumnCodec()
+    >>> 18000: product 0.012345s, codec 0.000002s, list 0.000050s
+     """
+    result = {}
+    for number in numbers:
+        column = numberToAlphabet(number)
+        assert numberToAlphabet_product(number) == column
+        assert alphabetToNumber_product(column) == number
+        timer = {}
+        for name, func in [
+            ("product", lambda: alphabetToNumber_product(
+                numberToAlphabet_product(number))), 
+            ("codec", lambda: alphabetToNumber(numberToAlphabet(number))), 
+            ("list", lambda: alphabetsToNumbers(numbersToAlphabets([number]))), 
+            ]:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func()
+            timer[name] = (time.perf_counter() - start) / repeat
+        result[number] = timer
+        text = ", ".join(f"{k} {v:.6f}s" for k, v in timer.items())
+        print(f"{number}: {text}")
+    return result
+
+
+def numberToAlphabet_product(number: int) -> str:
+    """ Change numbers to alphabets for MS Excel.
+    It walks every shorter label, so it is only kept for the benchmark.
     >>> numberToAlphabet(0)
     >>> A
     >>> numberToAlphabet(35)
@@ -84,8 +240,9 @@ def numberToAlphabet(number: int) -> str:
     return column
 
 
-def alphabetToNumber(column: str) -> int:
+def alphabetToNumber_product(column: str) -> int:
     """ Change Alphabet to number for MS Excel. 
+    It walks every shorter label, so it is only kept for the benchmark.
     >>> alphabetToNumber("A")
     >>> 0
     >>> alphabetToNumber("AC")
@@ -111,13 +268,3 @@ def alphabetToNumber(column: str) -> int:
                 break
             count += 1
     return count
-
-
-def writeToExcel():
-    """ Write somethings to MS Excel using openpyxl. """
-    EXCEL_PATH = '../folder/file.xlsx'
-    loadExcel = openpyxl.load_workbook(EXCEL_PATH)
-    SHEET = loadExcel['Sheet1']
-    SHEET['A1'] = 2.0
-    loadExcel.save(EXCEL_PATH)
-
@@ -0,0 +1,283 @@
+import json
+import time
+import fnmatch
+from collections import deque
+import pymel.core as pm
+
+
+CATEGORIES = ["constraints", "expressions", "utilities", "ikHandles", "others"]
+UTILITY_TYPES = [
+    "multiplyDivide", "plusMinusAverage", "condition", "reverse", "clamp",
+    "blendColors", "blendTwoAttr", "multDoubleLinear", "addDoubleLinear",
+    "vectorProduct", "distanceBetween", "unitConversion", "setRange",
+    "remapValue", "multMatrix", "decomposeMatrix", "composeMatrix",
+    "blendMatrix", "pickMatrix", "inverseMatrix", "pointMatrixMult",
+    "curveInfo", "pointOnCurveInfo", "motionPath", "floatMath"
+    ]
+# Nodes every module touches, they don't belong to any.
+SHARED_TYPES = ["time", "transform", "joint", "nurbsCurve", "mesh", "locator"]
+# Containers and deformers connect to nodes of many modules,
+# the search doesn't walk through them.
+CONTAINER_TYPES = [
+    "renderUtilityList", "objectSet", "shadingEngine", "skinCluster",
+    "blendShape", "tweak", "groupId", "groupParts", "dagPose",
+    "displayLayer", "hyperLayout", "nodeGraphEditorInfo"
+    ]
+
+
+def categoryOf(nodeType: str) -> str:
+    if nodeType.endswith("Constraint"):
+        return "constraints"
+    elif nodeType == "expression":
+        return "expressions"
+    elif nodeType in ["ikHandle", "ikEffector"]:
+        return "ikHandles"
+    elif nodeType in UTILITY_TYPES:
+        return "utilities"
+    else:
+        return "others"
+
+
+def dataConnections(node: str) -> list:
+    """ The nodes connected to node, other than through message plugs. """
+    import maya.cmds as cmds
+    plugs = cmds.listConnections(node, s=True, d=True, c=True, p=True) or []
+    result = []
+    for own, other in zip(plugs[::2], plugs[1::2]):
+        if "message" in [own.split(".")[-1], other.split(".")[-1]]:
+            continue
+        name = other.split(".", 1)[0]
+        if name not in result:
+            result.append(name)
+    return result
+
+
+class RigProfiler:
+    def __init__(self, pattern: str="cc_*_grp", namePatterns: dict={}):
+        """ Groups the nodes of a rig by the module that made them,
+        counts them and samples their evaluation time.
+
+        - The top groups are the outermost transforms matching pattern,
+        cc_LeftHandFingers_grp is the module "LeftHandFingers".
+        - Everything under a top group belongs to it.
+        - Nodes named like the module, "*LeftHandFingers*",
+        or matching namePatterns {"module": ["glob", ...]}, belong to it.
+        - Constraints, IK handles and utility nodes connected to those
+        belong to it too, through data connections. Joints and transforms
+        outside a top group are shared, and sets, shadingEngines and
+        deformers connect everything, so the search doesn't walk
+        through them.
+        >>> rp = RigProfiler()
+        >>> rp.collect()
+        >>> rp.sample(0, 100)
+        >>> rp.printReport("msPerFrame")
+        >>> rp.save("C:/rig_v002_profile.json")
+         """
+        self.pattern = pattern
+        self.namePatterns = namePatterns
+        self.modules = {}
+        self.owner = {}
+        self.times = {}
+        self.baseline = 0.0
+        self.frames = []
+
+
+    def findModules(self) -> dict:
+        """ {"LeftHandFingers": "cc_LeftHandFingers_grp", ...} """
+        groups = pm.ls(self.pattern, type="transform")
+        names = [i.name() for i in groups]
+        result = {}
+        for grp in groups:
+            parents = []
+            parent = grp.getParent()
+            while parent:
+                parents.append(parent.name())
+                parent = parent.getParent()
+            if any(i in names for i in parents):
+                continue
+            key = grp.name()
+            head, tail = self.pattern.split("*", 1)
+            if key.startswith(head) and key.endswith(tail):
+                key = key[len(head) : len(key) - len(tail)]
+            result[key] = grp.name()
+        self.modules = result
+        return result
+
+
+    def collect(self) -> dict:
+        """ Returns {node: module} of every node that was assigned.
+        Only data connections are followed, not message ones.
+         """
+        import maya.cmds as cmds
+        self.findModules()
+        owner = {}
+        for module, grp in self.modules.items():
+            owner[grp] = module
+            for i in pm.listRelatives(grp, ad=True):
+                owner.setdefault(i.name(), module)
+        allNodes = pm.ls()
+        for module in self.modules:
+            patterns = self.namePatterns.get(module, []) + [f"*{module}*"]
+            for node in allNodes:
+                name = node.name()
+                if name in owner:
+                    continue
+                if any(fnmatch.fnmatchcase(name, i) for i in patterns):
+                    owner[name] = module
+        queue = deque(owner)
+        while queue:
+            name = queue.popleft()
+            for otherName in dataConnections(name):
+                if otherName in owner:
+                    continue
+                nodeType = cmds.nodeType(otherName)
+                if nodeType in SHARED_TYPES or nodeType in CONTAINER_TYPES:
+                    continue
+                owner[otherName] = owner[name]
+                queue.append(otherName)
+        self.owner = owner
+        return owner
+
+
+    def nodesOf(self, module: str) -> list:
+        return [k for k, v in self.owner.items() if v == module]
+
+
+    def count(self) -> dict:
+        """ {module: {"nodes": 12, "constraints": 3, ...}} """
+        result = {}
+        for module in self.modules:
+            row = {"nodes": 0}
+            row.update({i: 0 for i in CATEGORIES})
+            for name in self.nodesOf(module):
+                row["nodes"] += 1
+                row[categoryOf(pm.nodeType(name))] += 1
+            result[module] = row
+        return result
+
+
+    def evaluatedNodes(self, module: str) -> list:
+        """ The nodes that compute, to switch off while sampling. """
+        result = []
+        for name in self.nodesOf(module):
+            nodeType = pm.nodeType(name)
+            if categoryOf(nodeType) == "others":
+                continue
+            result.append(name)
+        return result
+
+
+    def frameTime(self, startFrame: int, endFrame: int) -> float:
+        """ Milliseconds per frame, stepping through the range. """
+        import maya.cmds as cmds
+        timer = time.perf_counter()
+        for frame in range(startFrame, endFrame + 1):
+            cmds.currentTime(frame, update=True)
+            cmds.refresh(force=True)
+        duration = time.perf_counter() - timer
+        return duration * 1000 / (endFrame - startFrame + 1)
+
+
+    def sample(self, startFrame: int, endFrame: int, \
+               evaluationMode: str="off") -> dict:
+        """ The cost of a module is how much faster a frame gets
+        when its nodes are set to HasNoEffect.
+        The DG mode is used by default,
+        parallel evaluation would hide the cost of a module.
+        Every nodeState is restored.
+         """
+        import maya.cmds as cmds
+        if not self.owner:
+            self.collect()
+        previousMode = cmds.evaluationManager(q=True, mode=True)[0]
+        cmds.evaluationManager(mode=evaluationMode)
+        try:
+            self.baseline = self.frameTime(startFrame, endFrame)
+            for module in self.modules:
+                nodes = self.evaluatedNodes(module)
+                states = {}
+                for i in nodes:
+                    try:
+                        states[i] = pm.getAttr(f"{i}.nodeState")
+                        pm.setAttr(f"{i}.nodeState", 1)
+                    except:
+                        continue
+                try:
+                    disabled = self.frameTime(startFrame, endFrame)
+                finally:
+                    for i, state in states.items():
+                        pm.setAttr(f"{i}.nodeState", state)
+                self.times[module] = max(0.0, self.baseline - disabled)
+        finally:
+            cmds.evaluationManager(mode=previousMode)
+        self.frames = [startFrame, endFrame]
+        return self.times
+
+
+    def report(self, sortBy: str="msPerFrame") -> list:
+        """ One row per module, sorted by a column, largest first. """
+        rows = []
+        for module, row in self.count().items():
+            row = {"module": module, "group": self.modules[module], **row}
+            row["msPerFrame"] = round(self.times.get(module, 0.0), 4)
+            rows.append(row)
+        rows.sort(key=lambda x: x[sortBy], reverse=sortBy != "module")
+        return rows
+
+
+    def printReport(self, sortBy: str="msPerFrame") -> list:
+        rows = self.report(sortBy)
+        columns = ["module", "nodes"] + CATEGORIES + ["msPerFrame"]
+        print("".join(f"{i:>14}" for i in columns))
+        for row in rows:
+            print("".join(f"{row[i]:>14}" for i in columns))
+        print(f"baseline ms per frame: {self.baseline:.4f}")
+        return rows
+
+
+    def toDict(self) -> dict:
+        result = {
+            "scene": pm.Env().sceneName(),
+            "frames": self.frames,
+            "baseline": self.baseline,
+            "modules": {i["module"]: i for i in self.report("module")},
+            }
+        return result
+
+
+    def save(self, jsonPath: str) -> dict:
+        data = self.toDict()
+        with open(jsonPath, "w") as txt:
+            json.dump(data, txt, indent=4)
+        return data
+
+
+def compareReports(before, after, sortBy: str="msPerFrame") -> list:
+    """ before and after are saved json paths or toDict() results.
+    Returns the change of each column per module,
+    sorted by the change of sortBy, largest increase first.
+    >>> compareReports("C:/rig_v001.json", "C:/rig_v002.json")
+    >>> [{'module': 'LeftHandFingers', 'msPerFrame': 0.41, ...}, ...]
+     """
+    data = []
+    for i in [before, after]:
+        if isinstance(i, str):
+            with open(i, "r") as txt:
+                i = json.load(txt)
+        data.append(i)
+    before, after = data
+    columns = ["nodes"] + CATEGORIES + ["msPerFrame"]
+    empty = {i: 0 for i in columns}
+    rows = []
+    for module in set(before["modules"]) | set(after["modules"]):
+        old = before["modules"].get(module, empty)
+        new = after["modules"].get(module, empty)
+        row = {"module": module}
+        for i in columns:
+            row[i] = round(new[i] - old[i], 4)
+        rows.append(row)
+    rows.sort(key=lambda x: x[sortBy], reverse=True)
+    print("".join(f"{i:>14}" for i in ["module"] + columns))
+    for row in rows:
+        print("".join(f"{row[i]:>14}" for i in ["module"] + columns))
+    return rows
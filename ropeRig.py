@@ -0,0 +1,215 @@
+import time
+import numpy as np
+import pymel.core as pm
+from buildContext import batchBuild
+from exprCompiler import Graph, createGraph
+from matrixConstraint import getMatrix, splitScale
+from curvePlacement import curveData, equalSpacingParams, curvePoints, \
+    arcLengthTable, chainFrames, curveFrames, createJointChain
+from general import Controllers
+
+
+def clusterGroups(numberOfCVs: int, number: int) -> list:
+    """ The cv indices of each cluster.
+    With two more cvs than clusters, both ends take two cvs,
+    the same as shipShinanRopeSetting.
+    >>> clusterGroups(7, 5)
+    >>> [[0, 1], [2], [3], [4], [5, 6]]
+     """
+    if numberOfCVs == number + 2:
+        middle = [[i] for i in range(2, numberOfCVs - 2)]
+        return [[0, 1]] + middle + [[numberOfCVs - 2, numberOfCVs - 1]]
+    split = np.array_split(np.arange(numberOfCVs), number)
+    return [i.tolist() for i in split]
+
+
+def ropeGeometry(ropes: list, numberOfJoints: int=20, \
+                 numberOfControllers: int=5) -> list:
+    """ Everything the rigs need, computed before the scene changes.
+    ropes = [(mesh, curve, mainCtrl), ...]
+    Each curve is read once, the controllers of all ropes
+    are placed on their guide lines at once.
+     """
+    result = []
+    for mesh, cuv, mainCtrl in ropes:
+        cuv = str(cuv)
+        data = curveData(cuv)
+        params = equalSpacingParams(data, numberOfJoints)
+        joints = curvePoints(data, params)
+        groups = clusterGroups(len(data["cvs"]), numberOfControllers)
+        centers = np.array([data["cvs"][i].mean(axis=0) for i in groups])
+        jnt = cuv.replace("cuv_", "jnt_")
+        cc = cuv.replace("cuv_", "cc_")
+        geo = {
+            "mesh": str(mesh),
+            "curve": cuv,
+            "shape": data["shape"],
+            "mainCtrl": str(mainCtrl),
+            "joints": joints,
+            "frames": chainFrames(joints),
+            "jointNames": [f"{jnt}{i+1}" for i in range(numberOfJoints)],
+            "restLength": arcLengthTable(data)[1][-1],
+            "clusters": groups,
+            "clusterCenters": centers,
+            "ctrlNames": [f"{cc}{i+1}" for i in range(numberOfControllers)],
+            "ctrlGroup": f"{cc}_grp",
+            "ikHandle": cuv.replace("cuv_", "ikH_"),
+            "guide": f"{cuv}Guide",
+            }
+        result.append(geo)
+    if not result:
+        return result
+    # The guide line goes from the first joint to the last,
+    # the controllers follow it at the same fractions as the motionPaths.
+    starts = np.array([i["joints"][0] for i in result])
+    ends = np.array([i["joints"][-1] for i in result])
+    fractions = np.linspace(0.0, 1.0, numberOfControllers)
+    positions = starts[:, None] + fractions[None, :, None] \
+        * (ends - starts)[:, None]
+    frames = curveFrames(ends - starts)
+    for geo, pos, frame in zip(result, positions, frames):
+        geo["ctrlPositions"] = pos
+        geo["ctrlFrame"] = frame
+    return result
+
+
+def matrixOf(rot: np.ndarray, pos) -> list:
+    matrix = np.identity(4)
+    matrix[:3, :3] = rot
+    matrix[3, :3] = pos
+    return matrix.ravel().tolist()
+
+
+def globalScaleNetwork(graph: Graph, scaleSource: str) -> dict:
+    """ One network for every rope.
+    The scale of scaleSource relative to now, for the groups,
+    and its inverse, for the joints.
+     """
+    rest = splitScale(getMatrix(scaleSource))[1].tolist()
+    decompose = graph.add("decomposeMatrix", {
+        "inputMatrix": f"{scaleSource}.worldMatrix[0]"
+        }, "outputScale")
+    values = {f"input2{k}": v for k, v in zip("XYZ", rest)}
+    scale = graph.add("multiplyDivide", {
+        "operation": 2, "input1": decompose, **values
+        }, "output")
+    values = {f"input1{k}": v for k, v in zip("XYZ", rest)}
+    inverse = graph.add("multiplyDivide", {
+        "operation": 2, "input2": decompose, **values
+        }, "outputX")
+    return {"scale": scale, "inverse": inverse}
+
+
+def createRope(geo: dict, graph: Graph, shared: dict, jointParent: str, \
+               scaleSource: str, shapePoints: np.ndarray) -> None:
+    """ The nodes of one rope. Utility nodes go into graph. """
+    jnts = createJointChain(geo["joints"], geo["frames"], geo["jointNames"])
+    startJnt, endJnt = geo["jointNames"][0], geo["jointNames"][-1]
+    pm.ikHandle(sj=startJnt, ee=endJnt, sol="ikSplineSolver", \
+        n=geo["ikHandle"], c=geo["curve"], ccv=0)
+    sjGrp = pm.group(em=True, n=f"{startJnt}_grp", p=jointParent)
+    pm.xform(sjGrp, t=geo["joints"][0].tolist(), ws=True)
+    pm.parent(startJnt, sjGrp)
+    graph.outputs[f"{sjGrp}.scale"] = shared["scale"]
+    pm.skinCluster(startJnt, geo["mesh"], tsb=False, bm=0, sm=0, nw=1, \
+        wd=0, mi=3)
+    # Controllers, already scaled and colored.
+    ccTop = pm.group(em=True, n=geo["ctrlGroup"])
+    frame = geo["ctrlFrame"]
+    ctrls = []
+    for name, pos in zip(geo["ctrlNames"], geo["ctrlPositions"]):
+        grp = pm.group(em=True, n=f"{name}_grp", p=ccTop)
+        pm.xform(grp, m=matrixOf(frame, pos), ws=True)
+        null = pm.group(em=True, n=f"{name}_null", p=grp)
+        cc = pm.curve(p=shapePoints, d=1, n=name)
+        pm.parent(cc, null, r=True)
+        shp = cc.getShape()
+        pm.setAttr(f"{shp}.overrideEnabled", 1)
+        pm.setAttr(f"{shp}.overrideColor", 21)
+        graph.outputs[f"{grp}.scale"] = shared["scale"]
+        ctrls.append((grp, cc))
+    # Clusters, each grouped at its cvs and put under its controller.
+    cuv = geo["curve"]
+    for cvs, center, (grp, cc) in \
+            zip(geo["clusters"], geo["clusterCenters"], ctrls):
+        cvs = f"{cuv}.cv[{cvs[0]}:{cvs[-1]}]"
+        clt = pm.cluster(cvs)[1]
+        cltGrp = pm.group(em=True, n=f"{clt}_grp")
+        pm.xform(cltGrp, t=center.tolist(), ws=True)
+        pm.parent(clt, cltGrp)
+        pm.setAttr(f"{cltGrp}.visibility", 0)
+        pm.parent(cltGrp, cc)
+    # The guide line between mainCtrl and scaleSource,
+    # the controller groups follow it.
+    start, end = geo["joints"][0].tolist(), geo["joints"][-1].tolist()
+    guide = pm.curve(d=1, p=[start, end], n=geo["guide"])
+    guideShape = guide.getShape()
+    fractions = np.linspace(0.0, 1.0, len(ctrls)).tolist()
+    for (grp, cc), u in zip(ctrls, fractions):
+        path = graph.add("motionPath", {
+            "geometryPath": f"{guideShape}.worldSpace[0]",
+            "uValue": u,
+            "fractionMode": 1,
+            "follow": 1,
+            "frontAxis": 0,
+            "upAxis": 1,
+            "worldUpType": 3,
+            "rotateOrder": f"{grp}.rotateOrder"
+            }, "allCoordinates")
+        graph.outputs[f"{grp}.translate"] = path
+        graph.outputs[f"{grp}.rotate"] = path.split(".")[0] + ".rotate"
+    for idx, parent in [(0, geo["mainCtrl"]), (1, scaleSource)]:
+        clt = pm.cluster(f"{guide}.cv[{idx}]")[1]
+        cltGrp = pm.group(em=True, n=f"{clt}_grp")
+        pm.xform(cltGrp, t=[start, end][idx], ws=True)
+        pm.parent(clt, cltGrp)
+        if idx == 0:
+            pm.setAttr(f"{cltGrp}.visibility", 0)
+        pm.parent(cltGrp, parent)
+    # The joints stretch with the curve, against the global scale.
+    info = graph.add("curveInfo", {
+        "inputCurve": f"{geo['shape']}.worldSpace[0]"
+        }, "arcLength")
+    stretch = graph.add("multiplyDivide", {
+        "operation": 2, "input1X": info, "input2X": geo["restLength"]
+        }, "outputX")
+    scale = graph.add("multiplyDivide", {
+        "operation": 1, "input1X": stretch, "input2X": shared["inverse"]
+        }, "outputX")
+    for jnt in jnts:
+        graph.outputs[f"{jnt}.scaleX"] = scale
+
+
+@batchBuild("rigRopes")
+def rigRopes(ropes: list, numberOfJoints: int=20, \
+             numberOfControllers: int=5, scaleSource: str="loc_moving", \
+             jointParent: str="bindBones") -> dict:
+    """ shipShinanRopeSetting for many ropes at once.
+    - The geometry of every rope is computed first.
+    - The scale of scaleSource drives all ropes through one network,
+    instead of scaleConstraints and a multiplyDivide per rope.
+    scaleSource and jointParent are expected to have no parent scale.
+    - All utility nodes and motionPaths are created with one createGraph.
+    Returns the seconds per rope and in total.
+    >>> ropes = [(f"mizzen_rope_{i}", f"cuv_mizzenSub{i}_copied", \\
+    >>>     "cc_mizzenMain") for i in range(1, 5)]
+    >>> rigRopes(ropes)
+    >>> {'geometry': 0.01, 'ropes': {'cuv_mizzenSub1_copied': 0.2, ...}, ...}
+     """
+    timer = time.perf_counter()
+    geometry = ropeGeometry(ropes, numberOfJoints, numberOfControllers)
+    points = Controllers().controllerShapes["sphere"]
+    shapePoints = (np.array(points, dtype=float) * 5).tolist()
+    result = {"geometry": time.perf_counter() - timer, "ropes": {}}
+    graph = Graph("ropeRig")
+    shared = globalScaleNetwork(graph, scaleSource)
+    for geo in geometry:
+        ropeTimer = time.perf_counter()
+        createRope(geo, graph, shared, jointParent, scaleSource, shapePoints)
+        result["ropes"][geo["curve"]] = time.perf_counter() - ropeTimer
+    networkTimer = time.perf_counter()
+    result["nodes"] = len(createGraph(graph))
+    result["network"] = time.perf_counter() - networkTimer
+    result["total"] = time.perf_counter() - timer
+    pm.displayInfo(f"{len(geometry)} ropes, {result['total']:.3f} seconds.")
+    return result
@@ -0,0 +1,138 @@
+import re
+import time
+import numpy as np
+import pymel.core as pm
+
+
+# Component name and the MFn type of its MObject.
+COMPONENT_TYPES = {
+    "vtx": "kMeshVertComponent",
+    "e": "kMeshEdgeComponent",
+    "f": "kMeshPolygonComponent",
+    }
+RANGE = re.compile(r"\[(\d+)(?::(\d+))?\]")
+
+
+def selectionList(items: list=None):
+    """ The active selection list, or one made of items. """
+    import maya.api.OpenMaya as om2
+    if items is None:
+        return om2.MGlobal.getActiveSelectionList()
+    sel = om2.MSelectionList()
+    for i in items:
+        sel.add(str(i))
+    return sel
+
+
+def captureComponents(kind: str="vtx", items: list=None) -> dict:
+    """ The selected component indices of each mesh,
+    read from the selection list without looking at names.
+    Returns {meshTransform: int32 array}, sorted and unique.
+    Objects and other components are skipped.
+    >>> captureComponents()
+    >>> {'pSphere1': array([3, 4, 5, 7]), 'pCube1': array([0])}
+     """
+    import maya.api.OpenMaya as om2
+    fnType = getattr(om2.MFn, COMPONENT_TYPES[kind])
+    sel = selectionList(items)
+    found = {}
+    for i in range(sel.length()):
+        try:
+            dag, comp = sel.getComponent(i)
+        except:
+            continue
+        if comp.isNull() or not comp.hasFn(fnType):
+            continue
+        elements = om2.MFnSingleIndexedComponent(comp).getElements()
+        mesh = om2.MFnDagNode(dag.transform()).partialPathName()
+        found.setdefault(mesh, []).append(np.array(elements, dtype=np.int32))
+    return {k: np.unique(np.concatenate(v)) for k, v in found.items()}
+
+
+def compressRanges(indices) -> np.ndarray:
+    """ Runs of consecutive indices, (n, 2) of first and last.
+    >>> compressRanges([3, 4, 5, 7])
+    >>> array([[3, 5], [7, 7]])
+     """
+    indices = np.unique(np.asarray(indices, dtype=np.int64))
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    starts = indices[np.concatenate([[0], breaks + 1])]
+    ends = indices[np.concatenate([breaks, [len(indices) - 1]])]
+    return np.stack([starts, ends], axis=1)
+
+
+def componentRanges(indices, kind: str="vtx") -> list:
+    """ The names that are saved in json, a single index has no colon.
+    >>> componentRanges([3, 4, 5, 7])
+    >>> ['.vtx[3:5]', '.vtx[7]']
+     """
+    result = []
+    for start, end in compressRanges(indices).tolist():
+        span = f"{start}:{end}" if end > start else f"{start}"
+        result.append(f".{kind}[{span}]")
+    return result
+
+
+def rangeIndices(ranges: list) -> np.ndarray:
+    """ componentRanges back to an int32 array.
+    >>> rangeIndices(['.vtx[3:5]', '.vtx[7]'])
+    >>> array([3, 4, 5, 7])
+     """
+    spans = []
+    for i in ranges:
+        start, end = RANGE.search(i).groups()
+        end = start if end is None else end
+        spans.append(np.arange(int(start), int(end) + 1, dtype=np.int32))
+    if not spans:
+        return np.zeros(0, dtype=np.int32)
+    return np.unique(np.concatenate(spans))
+
+
+def captureRanges(kind: str="vtx", items: list=None) -> dict:
+    """ {meshTransform: ['.vtx[3:5]', '.vtx[7]']} of the selection,
+    the format of vertexForSkinWeight.json.
+     """
+    data = captureComponents(kind, items)
+    return {k: componentRanges(v, kind) for k, v in data.items()}
+
+
+def benchmarkCapture(numberOfVertices: int=200000, \
+                     numberOfMeshes: int=4) -> dict:
+    """ Every other vertex of a few meshes is selected,
+    so the selection is as fragmented as it gets.
+    The regular expression loop of getListsOfVertexNumber
+    against captureRanges.
+    >>> benchmarkCapture()
+    >>> {'regex': 41.2, 'api': 0.08, 'ranges': 50000}
+     """
+    import maya.cmds as cmds
+    cmds.file(new=True, force=True)
+    side = int(np.sqrt(numberOfVertices / numberOfMeshes)) - 1
+    items = []
+    for m in range(numberOfMeshes):
+        plane = pm.polyPlane(n=f"bench_mesh{m}", sx=side, sy=side, \
+            ch=False)[0]
+        count = (side + 1) ** 2
+        items += [f"{plane}.vtx[{i}]" for i in range(0, count, 2)]
+    pm.select(items)
+    result = {}
+    timer = time.perf_counter()
+    sel = pm.ls(sl=True)
+    shapes = set(pm.ls(sel, o=True))
+    pattern = r'\.vtx\[\d+(?::\d+)?\]'
+    for shp in shapes:
+        vertexNumbers = []
+        for i in sel:
+            try:
+                vertexNumbers.append(re.search(pattern, i.name()).group())
+            except:
+                continue
+    result["regex"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    data = captureRanges()
+    result["api"] = time.perf_counter() - timer
+    result["ranges"] = sum(len(i) for i in data.values())
+    print(result)
+    return result
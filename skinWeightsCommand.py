@@ -0,0 +1,57 @@
+""" The writeSkinWeights command, loaded as a plugin by weightTransfer.
+
+MFnSkinCluster.setWeights is not on the undo queue by itself.
+The command makes the same call, keeps the weights it replaced
+and puts them back on undo, so one bulk write is undoable.
+The arguments can't go through MEL,
+so writeWeights puts them in weightTransfer.PENDING first.
+"""
+import maya.api.OpenMaya as om2
+
+
+COMMAND = "writeSkinWeights"
+
+
+def maya_useNewAPI():
+    pass
+
+
+class WriteSkinWeights(om2.MPxCommand):
+    def __init__(self):
+        super().__init__()
+        self.args = None
+        self.oldWeights = None
+
+
+    @staticmethod
+    def creator():
+        return WriteSkinWeights()
+
+
+    def isUndoable(self) -> bool:
+        return True
+
+
+    def doIt(self, argList):
+        import weightTransfer
+        self.args = weightTransfer.PENDING.pop()
+        self.redoIt()
+
+
+    def redoIt(self):
+        fn, dag, components, indices, values = self.args
+        self.oldWeights = fn.setWeights(dag, components, indices, values, \
+            False, True)
+
+
+    def undoIt(self):
+        fn, dag, components, indices, values = self.args
+        fn.setWeights(dag, components, indices, self.oldWeights, False)
+
+
+def initializePlugin(obj):
+    om2.MFnPlugin(obj).registerCommand(COMMAND, WriteSkinWeights.creator)
+
+
+def uninitializePlugin(obj):
+    om2.MFnPlugin(obj).deregisterCommand(COMMAND)
@@ -0,0 +1,177 @@
+import numpy as np
+
+
+class KDTree:
+    def __init__(self, lo, hi=None, leafSize: int=64):
+        """ A kd-tree of points, or of boxes when hi is given.
+        Items are split at the median of the widest axis,
+        each node keeps the box around everything under it,
+        so a query skips whole branches and takes whole leaves.
+        >>> tree = KDTree(points)
+        >>> tree.query((-1, -1, -1), (1, 1, 1))
+        >>> array([12, 13, 40, ...])
+         """
+        lo = np.asarray(lo, dtype=float).reshape(-1, 3)
+        hi = lo if hi is None else np.asarray(hi, dtype=float).reshape(-1, 3)
+        self.leafSize = leafSize
+        # Items are kept in tree order, a node is a slice of them.
+        self.order = np.arange(len(lo))
+        self.lo = lo.copy()
+        self.hi = hi.copy()
+        self.nodes = []
+        if len(lo):
+            self.split((self.lo + self.hi) * 0.5)
+        self.nodes = np.array(self.nodes, dtype=np.int64).reshape(-1, 4)
+        self.boxes = self.nodeBoxes()
+        self.table = None
+
+
+    def split(self, centers: np.ndarray) -> None:
+        """ Nodes are [start, end, left, right] in depth first order,
+        a leaf has no children, -1.
+         """
+        stack = [(0, len(centers), -1, 0)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(self.nodes)
+            self.nodes.append([start, end, -1, -1])
+            if parent >= 0:
+                self.nodes[parent][2 + side] = node
+            if end - start <= self.leafSize:
+                continue
+            values = centers[start:end]
+            axis = np.argmax(values.max(axis=0) - values.min(axis=0))
+            half = (end - start) // 2
+            part = np.argpartition(values[:, axis], half)
+            for array in [centers, self.lo, self.hi, self.order]:
+                array[start:end] = array[start:end][part]
+            stack.append((start + half, end, node, 1))
+            stack.append((start, start + half, node, 0))
+
+
+    def nodeBoxes(self) -> np.ndarray:
+        """ Leaves are measured at once, parents from their children. """
+        boxes = np.zeros((len(self.nodes), 6))
+        if not len(self.nodes):
+            return boxes
+        leaves = np.flatnonzero(self.nodes[:, 2] < 0)
+        starts = self.nodes[leaves, 0]
+        boxes[leaves, :3] = np.minimum.reduceat(self.lo, starts, axis=0)
+        boxes[leaves, 3:] = np.maximum.reduceat(self.hi, starts, axis=0)
+        # Children come after their parent.
+        for node in np.flatnonzero(self.nodes[:, 2] >= 0)[::-1]:
+            left, right = self.nodes[node, 2:]
+            boxes[node, :3] = np.minimum(boxes[left, :3], boxes[right, :3])
+            boxes[node, 3:] = np.maximum(boxes[left, 3:], boxes[right, 3:])
+        return boxes
+
+
+    def leaves(self) -> list:
+        """ Item indices of each leaf, nearby items are together. """
+        return [self.order[start:end] \
+            for start, end, left, _ in self.nodes.tolist() if left < 0]
+
+
+    def query(self, lo, hi) -> np.ndarray:
+        """ Sorted indices of the items that overlap the box lo, hi. """
+        x0, y0, z0 = [float(i) for i in lo]
+        x1, y1, z1 = [float(i) for i in hi]
+        # Plain floats, numpy is slow on arrays of three.
+        if self.table is None:
+            self.table = [tuple(n) + tuple(b) for n, b in \
+                zip(self.nodes.tolist(), self.boxes.tolist())]
+        found = []
+        stack = [0] if self.table else []
+        while stack:
+            start, end, left, right, a, b, c, d, e, f = self.table[stack.pop()]
+            if a > x1 or b > y1 or c > z1 or d < x0 or e < y0 or f < z0:
+                continue
+            if a >= x0 and b >= y0 and c >= z0 \
+                    and d <= x1 and e <= y1 and f <= z1:
+                found.append(self.order[start:end])
+            elif left < 0:
+                inside = np.all(self.lo[start:end] <= (x1, y1, z1), axis=1) \
+                    & np.all(self.hi[start:end] >= (x0, y0, z0), axis=1)
+                found.append(self.order[start:end][inside])
+            else:
+                stack += [left, right]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+
+class MeshTreeCache:
+    def __init__(self):
+        """ The world points and kd-tree of each mesh.
+        Points are read in bulk once, and the tree is rebuilt
+        only if the mesh was dirtied or its world matrix changed.
+        A node dirty callback marks the mesh,
+        so a deformed or edited mesh is read again.
+        Each record keeps an MObjectHandle of the shape,
+        so a mesh of the same name in another scene isn't mistaken
+        for it after File > Open or New.
+         """
+        self.cache = {}
+
+
+    def get(self, mesh: str) -> dict:
+        """ {"shape", "points", "tree", "matrix"} of the mesh. """
+        import maya.api.OpenMaya as om2
+        sel = om2.MSelectionList()
+        sel.add(str(mesh))
+        dag = sel.getDagPath(0)
+        dag.extendToShape()
+        shape = dag.partialPathName()
+        matrix = np.array(dag.inclusiveMatrix(), dtype=float)
+        sel.add(shape)
+        handle = om2.MObjectHandle(sel.getDependNode(1))
+        record = self.cache.get(shape)
+        if record and not record["dirty"] and self.isSame(record, handle) \
+                and np.array_equal(record["matrix"], matrix):
+            return record
+        if record:
+            removeCallback(record["callback"])
+        points = om2.MFnMesh(dag).getPoints(om2.MSpace.kWorld)
+        points = np.array(points, dtype=float)[:, :3]
+        callback = om2.MNodeMessage.addNodeDirtyCallback( \
+            sel.getDependNode(1), self.setDirty, shape)
+        record = {
+            "shape": shape,
+            "handle": handle,
+            "points": points,
+            "tree": KDTree(points),
+            "matrix": matrix,
+            "dirty": False,
+            "callback": callback,
+            }
+        self.cache[shape] = record
+        return record
+
+
+    def isSame(self, record: dict, handle) -> bool:
+        """ The record is of this node and the node still exists. """
+        return record["handle"].isValid() and record["handle"] == handle
+
+
+    def setDirty(self, node, shape: str) -> None:
+        if shape in self.cache:
+            self.cache[shape]["dirty"] = True
+
+
+    def clear(self) -> None:
+        """ Removes the callbacks too, call it before a new scene. """
+        for record in self.cache.values():
+            removeCallback(record["callback"])
+        self.cache = {}
+
+
+def removeCallback(callback: int) -> None:
+    """ The callback of a node that is gone may be removed already. """
+    import maya.api.OpenMaya as om2
+    try:
+        om2.MMessage.removeCallback(callback)
+    except:
+        pass
+
+
+meshTrees = MeshTreeCache()
@@ -1,17 +1,14 @@
 import pymel.core as pm
 from general import *
 from test10 import *
+from matrixConstraint import constrain
+from curvePlacement import createJointsOnCurve
+from ropeRig import rigRopes
 
 
-def shipShinanRopeSetting(ropeMesh, cuv, mainCtrl):
-    pm.select(cl=True)
-    pm.select(cuv)
-    joints = createJointOnCurveSameSpacing(20)
-    jnts = []
-    for idx, jnt in enumerate(joints):
-        new = "%s%d" % (cuv.replace("cuv_", "jnt_"), idx+1)
-        pm.rename(jnt, new)
-        jnts.append(new)
+def shipShinanRopeSetting(ropeMesh, cuv, mainCtrl, backend="constraint"):
+    names = ["%s%d" % (cuv.replace("cuv_", "jnt_"), i+1) for i in range(20)]
+    jnts = [i.name() for i in createJointsOnCurve(cuv, 20, names)]
     startJnt = jnts[0]
     endJnt = jnts[-1]
     solver = "ikSplineSolver"
@@ -19,7 +16,7 @@ def shipShinanRopeSetting(ropeMesh, cuv, mainCtrl):
     pm.ikHandle(sj=startJnt, ee=endJnt, sol=solver, n=ikName, c=cuv, ccv=0)
     sjGrp = groupOwnPivot(startJnt)[0]
     pm.parent(sjGrp, "bindBones")
-    pm.scaleConstraint("loc_moving", sjGrp, mo=True, w=1.0)
+    constrain("loc_moving", sjGrp, "scale", backend)
     pm.skinCluster(startJnt, ropeMesh, tsb=False, bm=0, sm=0, nw=1, wd=0, mi=3)
 
 
@@ -53,7 +50,7 @@ def shipShinanRopeSetting(ropeMesh, cuv, mainCtrl):
     pm.select(cl=True)
     pm.select(linearCurve)
     createJointOnMotionPath(5, *ccGrpList)
-    [pm.scaleConstraint("loc_moving", i, mo=True, w=1.0) for i in ccGrpList]
+    [constrain("loc_moving", i, "scale", backend) for i in ccGrpList]
     for j, k in zip(cltGrp, ccList):
         pm.parent(j, k)
         pm.setAttr(f"{j}.visibility", 0)
@@ -86,5 +83,6 @@ curves = [f"cuv_mizzenSub{i}_copied" for i in range(1, 5)]
 mainCtrl = "cc_mizzenMain"
 
 
-for obj, cuv in zip(mesh, curves):
-    shipShinanRopeSetting(obj, cuv, mainCtrl)
\ No newline at end of file
+# for obj, cuv in zip(mesh, curves):
+#     shipShinanRopeSetting(obj, cuv, mainCtrl)
+rigRopes([(obj, cuv, mainCtrl) for obj, cuv in zip(mesh, curves)])
\ No newline at end of file
@@ -0,0 +1,175 @@
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+VersionEntry = namedtuple("VersionEntry", "asset task version ext name")
+
+
+class VersionIndex:
+    def __init__(self, skipVersions: tuple=(9999, )):
+        """ Cache of versioned file names per directory.
+        A directory is listed once and parsed into
+        (asset, task, version, ext) tuples.
+        The next query only compares the directory mtime,
+        so the folder is listed again only when a file is added,
+        removed or renamed.
+
+        Version 9999 is the published alias file,
+        so it is skipped from the latest version by default.
+         """
+        self.pattern = re.compile(r"(.*?)_?v(\d{4})\.([^.]+)$")
+        self.skipVersions = set(skipVersions)
+        self.cache = {}
+        self.lock = threading.Lock()
+
+
+    def parse(self, fileName: str) -> VersionEntry:
+        """ Split a file name into asset, task, version and extension.
+        >>> parse("vhcl_brisaB_mdl_v0003.ma")
+        >>> VersionEntry("vhcl_brisaB", "mdl", 3, "ma", "vhcl_brisaB_...")
+        >>> parse("readme.txt")
+        >>> None
+         """
+        match = self.pattern.match(fileName)
+        if not match:
+            return None
+        stem, version, ext = match.groups()
+        asset, _, task = stem.rpartition("_")
+        return VersionEntry(asset, task, int(version), ext, fileName)
+
+
+    def scan(self, folder: str) -> dict:
+        """ Returns the cached record of the folder.
+        It is rebuilt only if the mtime of the folder has changed.
+         """
+        folder = self.normalize(folder)
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return self.emptyRecord(None)
+        with self.lock:
+            record = self.cache.get(folder)
+        if record and record["mtime"] == mtime:
+            return record
+        record = self.emptyRecord(mtime)
+        with os.scandir(folder) as it:
+            for i in it:
+                entry = self.parse(i.name)
+                if entry and i.is_file():
+                    self.addEntry(record, entry)
+        with self.lock:
+            self.cache[folder] = record
+        return record
+
+
+    def scanFolders(self, folders: list, workers: int=8) -> dict:
+        """ Scan many asset folders at once with a thread pool.
+        Listing a network share is IO bound,
+        so the threads overlap the waiting time.
+        >>> scanFolders(["T:/asset/a/mdl", "T:/asset/b/mdl"])
+        >>> {"T:/asset/a/mdl": [VersionEntry, ...], ...}
+         """
+        folders = [self.normalize(i) for i in folders]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            records = pool.map(self.scan, folders)
+        result = {}
+        for folder, record in zip(folders, records):
+            result[folder] = list(record["entries"].values())
+        return result
+
+
+    def register(self, fullPath: str) -> None:
+        """ Add a file that has just been written to the cached record.
+        The stored mtime is kept, so the folder is still listed again
+        on the next query and files other processes added are seen.
+        The entry is there even if the share doesn't update the mtime
+        within the same second.
+         """
+        folder, fileName = os.path.split(os.path.normpath(fullPath))
+        entry = self.parse(fileName)
+        if not entry:
+            return
+        with self.lock:
+            record = self.cache.get(folder)
+            if record:
+                self.addEntry(record, entry)
+
+
+    def latest(self, folder: str, ext: str="ma", stem: str=None, \
+               skip: bool=True) -> VersionEntry:
+        """ Returns the entry with the largest version, or None.
+        If stem is given, only "{stem}_v####.{ext}" files are considered.
+        If skip is False, the skipVersions (v9999) are also considered.
+        >>> latest("T:/asset/a/mdl")
+        >>> latest("T:/asset/a/mdl", ext="json", stem="vhcl_a_mdl")
+         """
+        record = self.scan(folder)
+        return record["latest"].get((stem, ext, skip))
+
+
+    def latestVersion(self, folder: str, ext: str="ma", stem: str=None, \
+                      skip: bool=True) -> int:
+        """ Returns the largest version number, 0 if there is none. """
+        entry = self.latest(folder, ext, stem, skip)
+        return entry.version if entry else 0
+
+
+    def nextVersion(self, folder: str, ext: str="ma", stem: str=None) -> int:
+        return self.latestVersion(folder, ext, stem) + 1
+
+
+    def find(self, folder: str, stem: str, version: int, ext: str="ma"):
+        """ Returns the entry of "{stem}_v{version}.{ext}", or None. """
+        record = self.scan(folder)
+        return record["entries"].get((stem, version, ext))
+
+
+    def invalidate(self, folder: str=None) -> None:
+        with self.lock:
+            if folder is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(self.normalize(folder), None)
+
+
+    def emptyRecord(self, mtime) -> dict:
+        return {"mtime": mtime, "entries": {}, "latest": {}}
+
+
+    def addEntry(self, record: dict, entry: VersionEntry) -> None:
+        """ Store the entry and keep the latest versions up to date.
+        The latest is kept for the extension and for the stem,
+        so the queries are a single dict lookup.
+         """
+        stem = self.joinStem(entry)
+        record["entries"][(stem, entry.version, entry.ext)] = entry
+        skipped = entry.version in self.skipVersions
+        for key in [(None, entry.ext), (stem, entry.ext)]:
+            keys = [key + (False, )]
+            if not skipped:
+                keys.append(key + (True, ))
+            self.updateLatest(record, keys, entry)
+
+
+    def updateLatest(self, record: dict, keys: list, entry) -> None:
+        for key in keys:
+            current = record["latest"].get(key)
+            if not current or current.version < entry.version:
+                record["latest"][key] = entry
+
+
+    def joinStem(self, entry: VersionEntry) -> str:
+        return "_".join(i for i in [entry.asset, entry.task] if i)
+
+
+    def normalize(self, path: str) -> str:
+        path = os.path.normpath(str(path))
+        if os.path.isfile(path):
+            path = os.path.dirname(path)
+        return path
+
+
+versionIndex = VersionIndex()
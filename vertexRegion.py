@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import numpy as np
+import pymel.core as pm
+from spatialIndex import meshTrees
+from positionQuery import getPositions, getBoundingBoxes
+from selectionCapture import componentRanges
+
+
+def segmentDistance(points: np.ndarray, start, end) -> np.ndarray:
+    """ Distance of each point to the segment from start to end. """
+    start = np.asarray(start, dtype=float)
+    line = np.asarray(end, dtype=float) - start
+    length = np.dot(line, line)
+    if length < 1e-12:
+        return np.linalg.norm(points - start, axis=1)
+    t = np.clip((points - start) @ line / length, 0.0, 1.0)
+    return np.linalg.norm(points - (start + t[:, None] * line), axis=1)
+
+
+def boxVertices(mesh: str, lo, hi) -> np.ndarray:
+    """ Vertices inside the world box lo, hi. """
+    return meshTrees.get(mesh)["tree"].query(lo, hi).astype(np.int32)
+
+
+def radiusVertices(mesh: str, center, radius: float) -> np.ndarray:
+    """ Vertices within radius of the world point center. """
+    record = meshTrees.get(mesh)
+    center = np.asarray(center, dtype=float)
+    idx = record["tree"].query(center - radius, center + radius)
+    distance = np.linalg.norm(record["points"][idx] - center, axis=1)
+    return idx[distance <= radius].astype(np.int32)
+
+
+def capsuleVertices(mesh: str, start, end, radius: float) -> np.ndarray:
+    """ Vertices within radius of the segment from start to end. """
+    record = meshTrees.get(mesh)
+    ends = np.array([start, end], dtype=float)
+    idx = record["tree"].query(ends.min(axis=0) - radius, \
+        ends.max(axis=0) + radius)
+    distance = segmentDistance(record["points"][idx], start, end)
+    return idx[distance <= radius].astype(np.int32)
+
+
+def boneVertices(mesh: str, bones: list, index: int, \
+                 maxDistance: float=0.0) -> np.ndarray:
+    """ Vertices whose nearest bone is bones[index].
+    bones = [(start, end), ...], a bone can be a point, start == end.
+    With maxDistance, only vertices that close to the bone are taken.
+     """
+    record = meshTrees.get(mesh)
+    start, end = bones[index]
+    if maxDistance > 0:
+        idx = capsuleVertices(mesh, start, end, maxDistance)
+    else:
+        idx = np.arange(len(record["points"]), dtype=np.int32)
+    points = record["points"][idx]
+    own = segmentDistance(points, start, end)
+    nearest = np.ones(len(idx), dtype=bool)
+    for i, (s, e) in enumerate(bones):
+        if i != index:
+            nearest &= own <= segmentDistance(points, s, e)
+    return idx[nearest]
+
+
+def jointBones(joints: list) -> list:
+    """ The bone of a joint goes to its first child joint,
+    an end joint is a point.
+     """
+    joints = [str(i) for i in joints]
+    children = []
+    for jnt in joints:
+        child = pm.listRelatives(jnt, c=True, type="joint")
+        children.append(str(child[0]) if child else jnt)
+    positions = getPositions(joints + children)
+    return list(zip(positions[:len(joints)], positions[len(joints):]))
+
+
+def skeletonJoints(jnt: str) -> list:
+    """ Every joint under the top joint of jnt. """
+    root = pm.PyNode(jnt)
+    while root.getParent() and root.getParent().type() == "joint":
+        root = root.getParent()
+    return [i.name() for i in pm.ls(root, dag=True, type="joint")]
+
+
+def regionVertices(mesh: str, region: str, objects: list, \
+                   radius: float=0.0) -> np.ndarray:
+    """ Vertices of the mesh in a region made of objects.
+    - "radius": within radius of any object.
+    - "box": inside the bounding box of all objects.
+    - "capsule": within radius of the line through the objects in order.
+    - "bone": nearest to the bones of the objects,
+    among all joints of their skeletons, within radius if it is > 0.
+    >>> regionVertices("body", "radius", ["loc_knee"], 5)
+    >>> array([120, 121, 344, ...], dtype=int32)
+     """
+    objects = [str(i) for i in objects]
+    found = []
+    if region == "radius":
+        for pos in getPositions(objects):
+            found.append(radiusVertices(mesh, pos, radius))
+    elif region == "box":
+        boxes = getBoundingBoxes(objects)
+        lo, hi = np.nanmin(boxes[:, :3], 0), np.nanmax(boxes[:, 3:], 0)
+        found.append(boxVertices(mesh, lo, hi))
+    elif region == "capsule":
+        positions = getPositions(objects)
+        for start, end in zip(positions[:-1], positions[1:]):
+            found.append(capsuleVertices(mesh, start, end, radius))
+    elif region == "bone":
+        names = []
+        for i in objects:
+            names += [j for j in skeletonJoints(i) if j not in names]
+        bones = jointBones(names)
+        for i in objects:
+            if i not in names:
+                pm.warning(f"{i} is not a joint, it has no bone.")
+                continue
+            found.append(boneVertices(mesh, bones, names.index(i), radius))
+    else:
+        raise ValueError(f"Unknown region: {region}")
+    if not found:
+        return np.zeros(0, dtype=np.int32)
+    return np.unique(np.concatenate(found)).astype(np.int32)
+
+
+def storeRegion(jsonPath: str, vertexName: str, regions: dict, \
+                select: bool=True) -> dict:
+    """ Save {mesh: indices} under vertexName in the vertex set json,
+    the same as creating it from a selection, and select it.
+     """
+    data = {}
+    if os.path.isfile(jsonPath):
+        with open(jsonPath, 'r') as txt:
+            data = json.load(txt)
+    vertexNumber = {}
+    for mesh, indices in regions.items():
+        if len(indices):
+            vertexNumber[str(mesh)] = componentRanges(indices, "vtx")
+    data[vertexName] = vertexNumber
+    with open(jsonPath, 'w') as txt:
+        json.dump(data, txt, indent=4)
+    if select:
+        vertices = [f"{obj}{vtx}" for obj, vtxList in vertexNumber.items() \
+            for vtx in vtxList]
+        pm.select(vertices)
+    return vertexNumber
+
+
+def benchmarkRegions(numberOfVertices: int=500000, \
+                     numberOfQueries: int=100) -> dict:
+    """ Radius queries on a dense plane,
+    the first one builds the tree, the rest use the cache.
+    A brute force distance of every vertex is the reference.
+    >>> benchmarkRegions()
+    >>> {'build': 0.9, 'queries': 0.05, 'bruteForce': 1.6, 'same': True}
+     """
+    import maya.cmds as cmds
+    cmds.file(new=True, force=True)
+    meshTrees.clear()
+    side = int(np.sqrt(numberOfVertices)) - 1
+    plane = pm.polyPlane(n="bench_dense", sx=side, sy=side, w=100, h=100, \
+        ch=False)[0]
+    rng = np.random.default_rng(0)
+    centers = np.column_stack([
+        rng.uniform(-50, 50, numberOfQueries),
+        np.zeros(numberOfQueries),
+        rng.uniform(-50, 50, numberOfQueries),
+        ])
+    result = {}
+    timer = time.perf_counter()
+    meshTrees.get(plane)
+    result["build"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    found = [radiusVertices(plane, i, 2.0) for i in centers]
+    result["queries"] = time.perf_counter() - timer
+    points = meshTrees.get(plane)["points"]
+    timer = time.perf_counter()
+    brute = [np.flatnonzero(np.linalg.norm(points - i, axis=1) <= 2.0) \
+        for i in centers]
+    result["bruteForce"] = time.perf_counter() - timer
+    result["same"] = all(np.array_equal(i, j) for i, j in zip(found, brute))
+    print(result)
+    return result
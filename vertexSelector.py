@@ -1,5 +1,4 @@
 import os
-import re
 import json
 import maya.OpenMayaUI as omui
 import pymel.core as pm
@@ -7,6 +6,8 @@ from PySide2.QtWidgets import *
 from PySide2.QtCore import Qt
 from PySide2.QtGui import QIntValidator
 from shiboken2 import wrapInstance
+from selectionCapture import captureRanges
+from vertexRegion import regionVertices, storeRegion
 
 
 def mayaMainWindow():
@@ -126,6 +127,18 @@ class VertexSelector(QWidget):
         self.btnSelObj.setFixedSize(60, 23)
         self.horizontalLayout_selObj.addWidget(self.btnSelObj)
         self.verticalLayout.addLayout(self.horizontalLayout_selObj)
+        # Region of the object above, around the selected objects.
+        self.horizontalLayout_region = QHBoxLayout()
+        self.lineEdit_radius = QLineEdit()
+        self.lineEdit_radius.setPlaceholderText("radius")
+        self.lineEdit_radius.setFixedWidth(45)
+        self.horizontalLayout_region.addWidget(self.lineEdit_radius)
+        self.regionButtons = {}
+        for region in ["radius", "box", "capsule", "bone"]:
+            btn = QPushButton(region.capitalize())
+            self.regionButtons[region] = btn
+            self.horizontalLayout_region.addWidget(btn)
+        self.verticalLayout.addLayout(self.horizontalLayout_region)
         # Auto Creation
         self.horizontalLayout_auto = QHBoxLayout()
         self.btnAutoPaint = QPushButton("Auto Creation")
@@ -191,6 +204,8 @@ class VertexSelector(QWidget):
         self.btnPaintWeights.clicked.connect(self.paintAllWeightsOne)
         self.btnSelObj.clicked.connect(self.selectObject)
         self.btnAutoPaint.clicked.connect(self.autoPaint)
+        for region, btn in self.regionButtons.items():
+            btn.clicked.connect(lambda x=0, r=region: self.createRegionSet(r))
     
 
     def createButtons(self, data: dict) -> list:
@@ -326,6 +341,34 @@ class VertexSelector(QWidget):
         self.lineEdit_selObj.setText(sel[-1].name())
 
 
+    def createRegionSet(self, region: str):
+        """ The vertices of the object in lineEdit_selObj,
+        in a region around the selected objects,
+        are saved under the name in lineEdit and selected.
+        radius, box, capsule or bone, see vertexRegion.regionVertices.
+         """
+        vertexName = self.lineEdit.text()
+        mesh = self.lineEdit_selObj.text()
+        objects = pm.ls(sl=True, type="transform")
+        if not vertexName:
+            pm.warning("Vertex name field is empty.")
+            return
+        if not mesh or not objects:
+            pm.warning("Select an object, and the objects of the region.")
+            return
+        try:
+            radius = float(self.lineEdit_radius.text() or 0)
+        except ValueError:
+            pm.warning("The radius is not a number.")
+            return
+        jsonPath = self.getJsonFilePath()
+        if not jsonPath:
+            return
+        indices = regionVertices(mesh, region, objects, radius)
+        storeRegion(jsonPath, vertexName, {mesh: indices})
+        self.refresh()
+
+
     def autoPaint(self):
         topLevelJoint = self.jointName[0]
         selObj = self.lineEdit_selObj.text()
@@ -455,22 +498,11 @@ class VertexSelector(QWidget):
 
 
     def getListsOfVertexNumber(self) -> dict:
-        """ Get vertex numbers only, strip others. """
-        sel = pm.ls(sl=True)
-        obj = pm.ls(sel, o=True)
-        shapes = set(obj)
-        result = {}
-        for shp in shapes:
-            pattern = r'\.vtx\[\d+(?::\d+)?\]'
-            vertexNumbers = []
-            for i in sel:
-                try:
-                    temp = re.search(pattern, i.name())
-                    vertexNumbers.append(temp.group())
-                except:
-                    continue
-            result[shp.getParent().name()] = vertexNumbers
-        return result
+        """ Get vertex numbers only, strip others.
+        Each mesh gets only its own vertices, as ranges.
+        >>> {'pSphere1': ['.vtx[3:5]', '.vtx[7]']}
+         """
+        return captureRanges("vtx")
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,193 @@
+import numpy as np
+from spatialIndex import KDTree
+
+
+# Only arrays, so it runs and can be checked without Maya.
+
+
+def safeDivide(a, b) -> np.ndarray:
+    b = np.asarray(b, dtype=float)
+    return np.asarray(a, dtype=float) / np.where(np.abs(b) < 1e-30, 1.0, b)
+
+
+def closestPointsOnTriangles(points, a, b, c) -> tuple:
+    """ The closest point of each triangle (a, b, c) to each point,
+    all arrays are (n, 3). Returns (closest, barycentric).
+    The regions are those of Ericson, Real-Time Collision Detection.
+     """
+    points, a, b, c = [np.asarray(i, dtype=float) for i in (points, a, b, c)]
+    ab, ac = b - a, c - a
+    dot = lambda u, v: np.einsum("ij,ij->i", u, v)
+    ap, bp, cp = points - a, points - b, points - c
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    zero, one = np.zeros_like(d1), np.ones_like(d1)
+    vAB = safeDivide(d1, d1 - d3)
+    wAC = safeDivide(d2, d2 - d6)
+    wBC = safeDivide(d4 - d3, (d4 - d3) + (d5 - d6))
+    denom = safeDivide(1.0, va + vb + vc)
+    v, w = vb * denom, vc * denom
+    conditions = [
+        (d1 <= 0) & (d2 <= 0),
+        (d3 >= 0) & (d4 <= d3),
+        (vc <= 0) & (d1 >= 0) & (d3 <= 0),
+        (d6 >= 0) & (d5 <= d6),
+        (vb <= 0) & (d2 >= 0) & (d6 <= 0),
+        (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+        ]
+    bary = np.stack([
+        np.select(conditions, [one, zero, 1 - vAB, zero, 1 - wAC, zero], \
+            1 - v - w),
+        np.select(conditions, [zero, one, vAB, zero, zero, 1 - wBC], v),
+        np.select(conditions, [zero, zero, zero, one, wAC, wBC], w),
+        ], axis=1)
+    closest = bary[:, :1] * a + bary[:, 1:2] * b + bary[:, 2:] * c
+    return closest, bary
+
+
+def nearestPairs(points, corners, boxes, bounds, pointPairs, \
+                 trianglePairs, result: tuple) -> None:
+    """ The nearest of the triangles paired with each point.
+    Pairs are grouped by point, every point of them is written.
+    A triangle whose box is farther than the bound of the point is skipped.
+     """
+    pts = points[pointPairs]
+    gap = np.maximum(boxes[0][trianglePairs] - pts, 0) \
+        + np.maximum(pts - boxes[1][trianglePairs], 0)
+    keep = np.einsum("ij,ij->i", gap, gap) <= bounds[pointPairs] ** 2
+    pointPairs, trianglePairs = pointPairs[keep], trianglePairs[keep]
+    tri = corners[trianglePairs]
+    closest, bary = closestPointsOnTriangles(points[pointPairs], \
+        tri[:, 0], tri[:, 1], tri[:, 2])
+    distance = np.linalg.norm(points[pointPairs] - closest, axis=1)
+    starts = np.flatnonzero(np.diff(pointPairs, prepend=-1) != 0)
+    counts = np.diff(np.append(starts, len(pointPairs)))
+    shortest = np.minimum.reduceat(distance, starts)
+    best = np.flatnonzero(distance == np.repeat(shortest, counts))
+    idx, first = np.unique(pointPairs[best], return_index=True)
+    best = best[first]
+    result[0][idx] = trianglePairs[best]
+    result[1][idx] = bary[best]
+    result[2][idx] = distance[best]
+
+
+def closestSurfacePoints(points, vertices, triangles, chunkSize: int=128, \
+                         batchSize: int=500000) -> tuple:
+    """ The closest point on the surface for every point.
+    Returns (triangle index, barycentric, distance).
+    Nearby points are handled together, a chunk at a time.
+    The nearest vertex of the triangles around a chunk
+    is as far as its closest surface point can be,
+    so the triangles within that reach are all it needs to test.
+    The pairs of many chunks are measured at once, batchSize at a time.
+    >>> closestSurfacePoints(targetPoints, sourcePoints, sourceTriangles)
+     """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    corners = vertices[triangles]
+    boxes = corners.min(axis=1), corners.max(axis=1)
+    tree = KDTree(*boxes)
+    size = vertices.max(axis=0) - vertices.min(axis=0)
+    first = np.linalg.norm(size) / 100 + 1e-6
+    result = (
+        np.zeros(len(points), dtype=np.int64),
+        np.zeros((len(points), 3)),
+        np.zeros(len(points)),
+        )
+    bounds = np.zeros(len(points))
+    pointPairs, trianglePairs, count = [], [], 0
+    for idx in KDTree(points, leafSize=chunkSize).leaves():
+        pts = points[idx]
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        reach = 0.0
+        found = tree.query(lo, hi)
+        while not len(found):
+            reach = max(reach * 2, first)
+            found = tree.query(lo - reach, hi + reach)
+        near = vertices[np.unique(triangles[found])]
+        distance = np.linalg.norm(pts[:, None] - near[None], axis=2)
+        bounds[idx] = distance.min(axis=1) * (1 + 1e-9) + 1e-12
+        reach = bounds[idx].max()
+        found = tree.query(lo - reach, hi + reach)
+        pointPairs.append(np.repeat(idx, len(found)))
+        trianglePairs.append(np.tile(found, len(idx)))
+        count += len(idx) * len(found)
+        if count >= batchSize:
+            nearestPairs(points, corners, boxes, bounds, \
+                np.concatenate(pointPairs), np.concatenate(trianglePairs), \
+                result)
+            pointPairs, trianglePairs, count = [], [], 0
+    if pointPairs:
+        nearestPairs(points, corners, boxes, bounds, \
+            np.concatenate(pointPairs), np.concatenate(trianglePairs), result)
+    return result
+
+
+def interpolateWeights(weights, triangles, triangleIndex, bary, \
+                       prune: float=1e-4, chunk: int=16384) -> np.ndarray:
+    """ The weights of the three corners blended by barycentric,
+    weights under prune are dropped and the rows normalized.
+    weights is (vertices, influences) of the source.
+     """
+    weights = np.asarray(weights, dtype=float)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    result = np.zeros((len(triangleIndex), weights.shape[1]))
+    for start in range(0, len(triangleIndex), chunk):
+        rows = slice(start, start + chunk)
+        corners = weights[triangles[triangleIndex[rows]]]
+        result[rows] = np.einsum("nk,nki->ni", bary[rows], corners)
+    result[result < prune] = 0.0
+    total = result.sum(axis=1, keepdims=True)
+    return result / np.where(total == 0, 1.0, total)
+
+
+def shortName(name: str) -> str:
+    return str(name).split("|")[-1].split(":")[-1]
+
+
+def remapInfluences(weights, sourceNames: list, targetNames: list, \
+                    influenceMap: dict={}) -> tuple:
+    """ The columns of source influences are moved to the target ones
+    of the same name, or of the name in influenceMap.
+    Names are also matched without namespace and path.
+    Returns (weights, missing source names), the rows are normalized
+    if weight was lost.
+    >>> remapInfluences(w, ["ns:Hips", "ns:Spine"], ["Spine", "Hips"])
+     """
+    weights = np.asarray(weights, dtype=float)
+    exact = {str(j): i for i, j in enumerate(targetNames)}
+    short = {shortName(j): i for i, j in enumerate(targetNames)}
+    result = np.zeros((len(weights), len(targetNames)))
+    missing = []
+    for col, name in enumerate(sourceNames):
+        name = influenceMap.get(str(name), str(name))
+        idx = exact.get(name, short.get(shortName(name)))
+        if idx is None:
+            missing.append(name)
+            continue
+        result[:, idx] += weights[:, col]
+    if missing:
+        total = result.sum(axis=1, keepdims=True)
+        result /= np.where(total == 0, 1.0, total)
+    return result, missing
+
+
+def redistributeWeights(weights, targets: dict) -> np.ndarray:
+    """ The columns in targets are emptied.
+    Their weights are added to the column targets[col],
+    or, where it is None, dropped and the rows normalized.
+    A target column must not be emptied itself.
+    >>> redistributeWeights(w, {3: 1, 5: None})
+     """
+    result = np.array(weights, dtype=float)
+    for col, target in targets.items():
+        if target is not None:
+            result[:, target] += result[:, col]
+        result[:, col] = 0.0
+    total = result.sum(axis=1, keepdims=True)
+    return result / np.where(total == 0, 1.0, total)
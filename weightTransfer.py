@@ -0,0 +1,181 @@
+import os
+import time
+import numpy as np
+import pymel.core as pm
+from weightMath import closestSurfacePoints, interpolateWeights, \
+    remapInfluences, shortName
+
+
+def getSkinCluster(mesh: str) -> str:
+    skin = pm.listHistory(mesh, type="skinCluster")
+    return skin[0].name() if skin else ""
+
+
+def meshDag(mesh: str):
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    sel.add(str(mesh))
+    dag = sel.getDagPath(0)
+    dag.extendToShape()
+    return dag
+
+
+def meshData(mesh: str) -> dict:
+    """ World points and triangles of a mesh, read in bulk. """
+    import maya.api.OpenMaya as om2
+    dag = meshDag(mesh)
+    fn = om2.MFnMesh(dag)
+    points = np.array(fn.getPoints(om2.MSpace.kWorld), dtype=float)[:, :3]
+    counts, vertices = fn.getTriangles()
+    return {
+        "dag": dag,
+        "points": points,
+        "triangles": np.array(vertices, dtype=np.int64).reshape(-1, 3),
+        }
+
+
+def vertexComponents(count: int, rows: list=None):
+    """ All count vertices, or only the rows. """
+    import maya.api.OpenMaya as om2
+    fn = om2.MFnSingleIndexedComponent()
+    components = fn.create(om2.MFn.kMeshVertComponent)
+    if rows is None:
+        fn.setCompleteData(count)
+    else:
+        fn.addElements(om2.MIntArray([int(i) for i in rows]))
+    return components
+
+
+def skinFn(skinCluster: str):
+    import maya.api.OpenMayaAnim as oma
+    import maya.api.OpenMaya as om2
+    sel = om2.MSelectionList()
+    sel.add(skinCluster)
+    return oma.MFnSkinCluster(sel.getDependNode(0))
+
+
+def readWeights(skinCluster: str, dag) -> tuple:
+    """ (influence names, (vertices, influences) weights) in one call.
+    dag is the path of the mesh shape.
+     """
+    import maya.api.OpenMaya as om2
+    fn = skinFn(skinCluster)
+    names = [i.partialPathName() for i in fn.influenceObjects()]
+    components = vertexComponents(om2.MFnMesh(dag).numVertices)
+    weights, count = fn.getWeights(dag, components)
+    return names, np.array(weights, dtype=float).reshape(-1, count)
+
+
+# The arguments of the next writeSkinWeights, see skinWeightsCommand.
+PENDING = []
+
+
+def writeWeights(skinCluster: str, dag, weights, rows: list=None, \
+                 columns: list=None, undoable: bool=True) -> None:
+    """ Every weight of the mesh, or with rows and columns only those,
+    weights is then (rows, columns).
+    Everything is written with one setWeights.
+    By default it runs in the writeSkinWeights command,
+    which keeps the old weights,
+    so Ctrl+Z brings them back with the rest of the build.
+    undoable=False calls setWeights directly, it is not on the undo queue.
+     """
+    import maya.api.OpenMaya as om2
+    import maya.cmds as cmds
+    fn = skinFn(skinCluster)
+    weights = np.asarray(weights, dtype=float)
+    if columns is None:
+        columns = range(weights.shape[1])
+    components = vertexComponents(len(weights), rows)
+    indices = om2.MIntArray([int(i) for i in columns])
+    values = om2.MDoubleArray(weights.ravel().tolist())
+    if not undoable:
+        fn.setWeights(dag, components, indices, values, False)
+        return
+    plugin = os.path.join(os.path.dirname(os.path.abspath(__file__)), \
+        "skinWeightsCommand.py")
+    if not cmds.pluginInfo(plugin, q=True, loaded=True):
+        cmds.loadPlugin(plugin, quiet=True)
+    PENDING.append((fn, dag, components, indices, values))
+    try:
+        cmds.writeSkinWeights()
+    finally:
+        PENDING.clear()
+
+
+def transferWeights(source: str, target: str, influenceMap: dict={}) -> dict:
+    """ The weights of source go to the closest points of target.
+    Without a skinCluster, target is bound to the source influences
+    that exist in the scene. Influences the target skinCluster is missing
+    are added. Source influences are matched by name, see remapInfluences.
+    Returns the missing influences and the seconds of each step.
+    >>> transferWeights("CC_Base_Body", "CC_Base_Body_proxy")
+    >>> {'missing': [], 'read': 0.3, 'closest': 2.1, 'write': 0.4}
+     """
+    timer = time.perf_counter()
+    result = {}
+    src = meshData(source)
+    tgt = meshData(target)
+    names, weights = readWeights(getSkinCluster(source), src["dag"])
+    mapped = [influenceMap.get(i, i) for i in names]
+    exists = [i for i in mapped if pm.objExists(i)]
+    skin = getSkinCluster(target)
+    if not skin:
+        skin = pm.skinCluster(exists, target, tsb=True, nw=1).name()
+    else:
+        influences = pm.skinCluster(skin, q=True, inf=True)
+        current = {shortName(i) for i in influences}
+        for i in exists:
+            if shortName(i) not in current:
+                pm.skinCluster(skin, e=True, ai=i, wt=0, lw=False)
+    targetNames = [str(i) for i in pm.skinCluster(skin, q=True, inf=True)]
+    result["read"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    tri, bary, _ = closestSurfacePoints(tgt["points"], src["points"], \
+        src["triangles"])
+    blended = interpolateWeights(weights, src["triangles"], tri, bary)
+    remapped, result["missing"] = remapInfluences(blended, names, \
+        targetNames, influenceMap)
+    result["closest"] = time.perf_counter() - timer
+    timer = time.perf_counter()
+    writeWeights(skin, tgt["dag"], remapped)
+    result["write"] = time.perf_counter() - timer
+    if result["missing"]:
+        pm.warning("Influences not found: ", result["missing"])
+    return result
+
+
+def transferSelectedWeights() -> dict:
+    """ Select the skinned source, then the targets. """
+    sel = pm.ls(sl=True)
+    if len(sel) < 2:
+        pm.warning("Select the source, then the targets.")
+        return {}
+    return {str(i): transferWeights(sel[0], i) for i in sel[1:]}
+
+
+def benchmarkTransfer(numberOfVertices: int=200000) -> dict:
+    """ A skinned plane of 10k vertices to one of 200k vertices.
+    >>> benchmarkTransfer()
+    >>> {'missing': [], 'read': 0.2, 'closest': 3.5, 'write': 0.5}
+     """
+    import maya.cmds as cmds
+    cmds.file(new=True, force=True)
+    joints = []
+    for i in range(4):
+        pm.select(cl=True)
+        joints.append(pm.joint(p=(i * 10 - 15, 0, 0), n=f"bench_jnt{i}"))
+    source = pm.polyPlane(n="bench_source", sx=99, sy=99, w=40, h=40, \
+        ch=False)[0]
+    skin = pm.skinCluster(joints, source, tsb=True, nw=1)
+    data = meshData(source)
+    x = data["points"][:, 0]
+    centers = np.array([i * 10 - 15 for i in range(4)], dtype=float)
+    weights = np.maximum(0.0, 1 - np.abs(x[:, None] - centers) / 10)
+    weights /= weights.sum(axis=1, keepdims=True)
+    writeWeights(skin.name(), data["dag"], weights, undoable=False)
+    side = int(np.sqrt(numberOfVertices)) - 1
+    pm.polyPlane(n="bench_target", sx=side, sy=side, w=40, h=40, ch=False)
+    result = transferWeights(source, "bench_target")
+    print(result)
+    return result
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+
+
+# The wheel expressions use 3.141, it is kept to give the same values.
+PI = 3.141
+
+
+def rollIncrement(previous, current, radius: float, orientRotY: float, \
+                  scale: float=1.0, auto: float=1.0) -> float:
+    """ The rotation added by the wheel expression in one frame.
+    It is the same arithmetic as Car.createExpression.
+    >>> rollIncrement((0, 0, 0), (0, 0, 10), 5, 90)
+    >>> 114.6...
+     """
+    distance = math.dist(previous, current)
+    circleLength = 2 * PI * radius
+    sinO = math.sin(math.radians(orientRotY))
+    result = (distance / circleLength) * 360 * auto * 1 * sinO / scale
+    return result
+
+
+def orientRotY(previous, current, heading: float) -> float:
+    """ The rotateY of the offsetOrient group.
+    offsetPrevious aims its X axis at the current position,
+    offsetOrient follows the heading of the offset group.
+    Both are read on the XZ plane.
+     """
+    dx = current[0] - previous[0]
+    dz = current[2] - previous[2]
+    aimY = math.degrees(math.atan2(-dz, dx))
+    return heading - aimY
+
+
+def simulateExpression(positions, headings, radius: float, \
+                       scale: float=1.0, auto: float=1.0) -> np.ndarray:
+    """ Play the expression frame by frame.
+    positions are the translates of the offset group per frame,
+    headings are its rotateY per frame.
+    Returns the rotateX of the locator per frame.
+     """
+    positions = np.asarray(positions, dtype=float)
+    result = np.zeros(len(positions))
+    for i in range(1, len(positions)):
+        prev, cur = positions[i - 1], positions[i]
+        if np.allclose(prev, cur):
+            result[i] = result[i - 1]
+            continue
+        rotY = orientRotY(prev, cur, headings[i])
+        step = rollIncrement(prev, cur, radius, rotY, scale, auto)
+        result[i] = result[i - 1] + step
+    return result
+
+
+def forwardAxis(heading) -> np.ndarray:
+    """ The Z axis rotated by the heading, rotateY in degrees.
+    >>> forwardAxis(90)
+    >>> array([1., 0., 0.])
+     """
+    heading = np.radians(np.asarray(heading, dtype=float))
+    result = np.stack(
+        [np.sin(heading), np.zeros_like(heading), np.cos(heading)], \
+        axis=-1)
+    return result
+
+
+def rollAngle(distance, radius, scale=1.0, auto=1.0):
+    """ The rotateX for rolling the distance. """
+    return distance / (2 * PI * radius) * 360 * auto / scale
+
+
+def verifyAutoRoll(count: int=200, frames: int=50, seed: int=0, \
+                   tolerance: float=1e-6) -> dict:
+    """ Plays random paths with the expression,
+    and checks the roll against the distance the wheel travelled.
+    straight drives back and forth along one heading,
+    turning drives forward while the heading changes every frame,
+    yawInPlace turns the car without moving it.
+    Returns the largest difference in degrees of each,
+    raises ValueError if one is over tolerance. Needs only numpy.
+    >>> verifyAutoRoll()
+    >>> {'straight': 1.4e-12, 'turning': 4.5e-12, 'yawInPlace': 0.0}
+     """
+    rng = np.random.default_rng(seed)
+    result = {"straight": 0.0, "turning": 0.0, "yawInPlace": 0.0}
+    for _ in range(count):
+        radius = rng.uniform(0.5, 5)
+        scale = rng.uniform(0.5, 2)
+        heading = rng.uniform(-180, 180)
+        yaw = heading + np.cumsum(rng.uniform(-10, 10, frames))
+        # Steps never go through zero,
+        # the expression skips a frame without movement.
+        signs = rng.choice([-1.0, 1.0], frames)
+        steps = signs * rng.uniform(0.1, 2, frames)
+        lengths = rng.uniform(0.1, 2, frames)
+        paths = {
+            "straight": (steps, np.full(frames, heading), steps),
+            "turning": (lengths, yaw, lengths),
+            "yawInPlace": (np.zeros(frames), yaw, np.zeros(frames)),
+            }
+        for key, (distances, headings, travelled) in paths.items():
+            moves = distances[:, None] * forwardAxis(headings)
+            positions = np.cumsum(moves, axis=0)
+            travelled = np.cumsum(travelled) - travelled[0]
+            expected = rollAngle(travelled, radius, scale)
+            expr = simulateExpression(positions, headings, radius, scale)
+            error = float(np.abs(expr - expected).max())
+            result[key] = max(result[key], error)
+    failed = {k: v for k, v in result.items() if v > tolerance}
+    if failed:
+        raise ValueError(f"The expression doesn't roll the distance: {failed}")
+    return result